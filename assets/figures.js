@@ -0,0 +1,96 @@
+//plotly div inside a dcc.Graph
+function get_plotly_graph(graph_id) {
+	var graph = document.querySelector("#" + graph_id + " .js-plotly-plot");
+	if (!graph || !graph.data || !graph.layout) {
+		return null;
+	}
+	return graph;
+}
+
+//changes of trace visibility and layout needed to match the hide unselected switch and the size sliders
+function get_figure_update(graph, hide_unselected_switch, width, height) {
+	var update = {visible: [], traces: [], layout: {}};
+
+	//hidden traces are removed from the legend and legend clicks are disabled
+	if (hide_unselected_switch) {
+		var hide_unselected = hide_unselected_switch.length === 1;
+		graph.data.forEach(function(trace, i) {
+			if (hide_unselected && trace.visible === "legendonly") {
+				update.visible.push(false);
+				update.traces.push(i);
+			} else if (!hide_unselected && trace.visible === false) {
+				update.visible.push("legendonly");
+				update.traces.push(i);
+			}
+		});
+		var itemclick = graph.layout.legend ? graph.layout.legend.itemclick : undefined;
+		if (hide_unselected && itemclick !== false) {
+			update.layout["legend.itemclick"] = false;
+			update.layout["legend.itemdoubleclick"] = false;
+		} else if (!hide_unselected && itemclick === false) {
+			update.layout["legend.itemclick"] = "toggle";
+			update.layout["legend.itemdoubleclick"] = "toggleothers";
+		}
+	}
+
+	//resize
+	if (width && graph.layout.width !== width) {
+		update.layout.width = width;
+	}
+	if (height && graph.layout.height !== height) {
+		update.layout.height = height;
+	}
+
+	return update;
+}
+
+//plotly update does not fire restyleData or relayoutData, so no server callback is triggered
+function apply_figure_update(graph, update) {
+	if (update.traces.length > 0) {
+		window.Plotly.update(graph, {visible: update.visible}, update.layout, update.traces);
+	} else if (Object.keys(update.layout).length > 0) {
+		window.Plotly.update(graph, {}, update.layout);
+	}
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+	figures: {
+		//hide unselected switch and size sliders change the figure in the browser, the store is only the required output
+		update_figure: function(hide_unselected_switch, width, height, graph_id) {
+			var graph = get_plotly_graph(graph_id);
+			if (graph) {
+				apply_figure_update(graph, get_figure_update(graph, hide_unselected_switch, width, height));
+			}
+			return window.dash_clientside.no_update;
+		},
+
+		//figures without size sliders
+		hide_unselected: function(hide_unselected_switch, graph_id) {
+			return window.dash_clientside.figures.update_figure(hide_unselected_switch, null, null, graph_id);
+		},
+
+		//boxplots also wrap the title when narrow and resize the div around the graph
+		update_boxplots: function(hide_unselected_switch, width, height, graph_id) {
+			if (!width) {
+				return window.dash_clientside.no_update;
+			}
+			var graph = get_plotly_graph(graph_id);
+			if (graph) {
+				var update = get_figure_update(graph, hide_unselected_switch, width, height);
+				if (width < 600 && graph.layout.title && graph.layout.title.text) {
+					var title = graph.layout.title.text;
+					if (title.indexOf("abundance") !== -1) {
+						title = title.replace(" abundance", "<br>abundance");
+					} else {
+						title = title.replace(" expression", "<br>expression");
+					}
+					if (title !== graph.layout.title.text) {
+						update.layout["title.text"] = title;
+					}
+				}
+				apply_figure_update(graph, update);
+			}
+			return {"width": width};
+		}
+	}
+});
@@ -0,0 +1,52 @@
+//clientside callbacks, dash loads every js file in assets
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+	mds: {
+		//count the samples inside the zoomed axes and write them in the subplot titles, without a server round trip
+		update_displayed_samples: function(relayoutData) {
+			var graph = document.querySelector("#mds_graph .js-plotly-plot");
+			if (!relayoutData || !graph || !graph.layout || !graph.layout.annotations) {
+				return window.dash_clientside.no_update;
+			}
+
+			//the titles changed below fire relayoutData too, only zoom and pan are handled
+			var axis_changed = Object.keys(relayoutData).some(function(key) {
+				return key.startsWith("xaxis") || key.startsWith("yaxis") || key === "autosize";
+			});
+			if (!axis_changed) {
+				return window.dash_clientside.no_update;
+			}
+
+			//plotly writes the autoranged ranges back in the layout
+			var x_range = graph.layout.xaxis.range;
+			var y_range = graph.layout.yaxis.range;
+
+			//parse only visible traces
+			var n_samples = 0;
+			graph.data.forEach(function(trace) {
+				if (trace.visible === true && ["na_continuous_trace", "Log2 expression", "Log2 abundance"].indexOf(trace.name) === -1) {
+					for (var i = 0; i < trace.x.length; i++) {
+						var x = trace.x[i];
+						var y = trace.y[i];
+						if (typeof x === "number" && typeof y === "number" && x > x_range[0] && x < x_range[1] && y > y_range[0] && y < y_range[1]) {
+							n_samples += 1;
+						}
+					}
+				}
+			});
+
+			//update titles only if the number changed
+			var update = {};
+			graph.layout.annotations.forEach(function(annotation, i) {
+				var text = annotation.text.replace(/n=\d+/, "n=") + n_samples;
+				if (text !== annotation.text) {
+					update["annotations[" + i + "].text"] = text;
+				}
+			});
+			if (Object.keys(update).length > 0) {
+				window.Plotly.relayout(graph, update);
+			}
+
+			return n_samples;
+		}
+	}
+});
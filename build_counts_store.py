@@ -0,0 +1,33 @@
+#import python packages
+import argparse
+#import modules
+import functions
+from functions import config, repos
+
+#datasets of an analysis with single feature counts files
+def get_counts_datasets(path):
+	datasets = []
+	for dataset in functions.get_content_from_github(path, "data"):
+		if "counts" in functions.get_content_from_github(path, "data/" + dataset):
+			datasets.append(dataset)
+
+	return datasets
+
+def main():
+	#command line options
+	parser = argparse.ArgumentParser(description="Pack the single feature counts files of an analysis into one matrix per dataset")
+	parser.add_argument("analysis", choices=repos, help="analysis name as written in config.yaml")
+	parser.add_argument("datasets", nargs="*", help="datasets to pack, all datasets with counts by default")
+	args = parser.parse_args()
+
+	path = config["repos"][args.analysis]["path"]
+	datasets = args.datasets
+	if len(datasets) == 0:
+		datasets = get_counts_datasets(path)
+
+	for dataset in datasets:
+		store_path = functions.build_counts_store(path, dataset)
+		print("{}: {}".format(dataset, store_path))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,23 @@
+#import python packages
+import argparse
+import os
+import json
+#import modules
+import data_sources
+
+#command line options
+parser = argparse.ArgumentParser(description="Write the manifest.json describing a local checkout of an analysis repo, to be committed with the data")
+parser.add_argument("checkout", help="local checkout of the analysis data repo")
+args = parser.parse_args()
+
+#the manifest does not describe itself
+source = data_sources.LocalDataSource(args.checkout)
+tree_index = data_sources.TreeIndex(source, float("inf"))
+manifest = data_sources.build_manifest(tree_index)
+if "manifest.json" in manifest["folders"]:
+	manifest["folders"].remove("manifest.json")
+
+manifest_path = os.path.join(source.directory, "manifest.json")
+with open(manifest_path, "w") as f:
+	json.dump(manifest, f, indent=1)
+print("manifest: {}".format(manifest_path))
@@ -0,0 +1,121 @@
+#import python packages
+import argparse
+import os
+import re
+import json
+import time
+import shutil
+import tempfile
+import pandas as pd
+#import modules
+import functions
+import data_sources
+from functions import config, repos
+
+#dge and go tables are stored parsed
+table_regex = re.compile(r"^data/[^/]+/.+/[^/]+\.(diffexp|merged_go)\.tsv$")
+
+#the app only reads tsv files, other files and hidden folders are left out of the snapshot
+def is_data_file(file_path):
+	return file_path.endswith(".tsv") and not any(part.startswith(".") for part in file_path.split("/"))
+
+#tree of the folders and data files of a checkout
+def get_data_tree(tree):
+	data_tree = {}
+	for folder, names in tree.items():
+		if any(part.startswith(".") for part in folder.split("/") if part != ""):
+			continue
+		data_tree[folder] = []
+		for name in names:
+			file_path = name if folder == "" else folder + "/" + name
+			if (file_path in tree and not name.startswith(".")) or is_data_file(file_path):
+				data_tree[folder].append(name)
+
+	return data_tree
+
+def main():
+	#command line options
+	parser = argparse.ArgumentParser(description="Compile a local checkout of an analysis repo into a snapshot the app can start from without network access")
+	parser.add_argument("analysis", choices=repos, help="analysis name as written in config.yaml")
+	parser.add_argument("checkout", help="local checkout of the analysis data repo")
+	parser.add_argument("--output", default=config["snapshot_directory"], help="folder where snapshots are written")
+	parser.add_argument("--version", default=time.strftime("%Y%m%d-%H%M%S"), help="snapshot version, the current time by default")
+	args = parser.parse_args()
+
+	#read the checkout through the same functions used by the app, the source is passed to them explicitly
+	path = config["repos"][args.analysis]["path"]
+	source = data_sources.LocalDataSource(args.checkout)
+	tree_index = data_sources.TreeIndex(source, config["cache"]["tree_index_ttl"])
+	tree = get_data_tree(source.tree())
+
+	#write in a temporary folder and rename it once complete
+	repo_folder = path.strip("/").replace("/", "_")
+	snapshots_path = os.path.join(args.output, repo_folder)
+	snapshot_path = os.path.join(snapshots_path, args.version)
+	if os.path.exists(snapshot_path):
+		parser.error("snapshot {} already exists".format(snapshot_path))
+	os.makedirs(snapshots_path, exist_ok=True)
+	temporary_path = tempfile.mkdtemp(dir=snapshots_path)
+	os.makedirs(os.path.join(temporary_path, "feature_labels"))
+
+	manifest = {
+		"analysis": args.analysis,
+		"path": path,
+		"version": args.version,
+		"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+		"counts": [],
+		"feature_labels": [],
+		"tables": [],
+		"tree": tree
+	}
+
+	#datasets, mds types, contrasts, stringencies, mofa contrasts and deconvolution files used by the app
+	manifest.update(data_sources.build_manifest(tree_index))
+	manifest["folders"] = [name for name in manifest["folders"] if name in tree[""]]
+
+	#counts and feature labels of each dataset
+	for dataset, dataset_manifest in manifest["datasets"].items():
+		dataset_folder = "data/" + dataset
+		if dataset_folder not in tree:
+			continue
+		feature_list_file = functions.get_feature_list_file(dataset)
+		if feature_list_file.split("/")[-1] in tree.get(dataset_folder + "/counts", []):
+			functions.build_counts_store(path, dataset, os.path.join(temporary_path, "counts", dataset), source)
+			manifest["counts"].append(dataset)
+			#plain labels, the app builds the feature index from them
+			with functions.download_from_github(path, feature_list_file, source) as f:
+				features = pd.read_csv(f, sep="\t", header=None, names=["feature"])
+			features["label"] = functions.get_feature_labels(dataset, features["feature"].tolist())
+			features.to_parquet(os.path.join(temporary_path, "feature_labels", dataset + ".parquet"), index=False)
+			manifest["feature_labels"].append(dataset)
+		print("{}: {} contrasts, {} stringencies".format(dataset, len(dataset_manifest["contrasts"]), len(dataset_manifest["stringencies"])))
+
+	#single feature counts are replaced by the counts store, they are not listed either
+	for dataset in manifest["counts"]:
+		counts_folder = "data/" + dataset + "/counts"
+		tree[counts_folder] = [name for name in tree[counts_folder] if name.endswith("_list.tsv")]
+
+	#data files copied, tables also in parquet
+	for folder, names in tree.items():
+		for name in names:
+			file_path = name if folder == "" else folder + "/" + name
+			if file_path in tree:
+				continue
+			if table_regex.match(file_path):
+				with functions.download_from_github(path, file_path, source) as f:
+					table = pd.read_csv(f, sep="\t", dtype=functions.get_tsv_schema(file_path))
+				table_path = os.path.join(temporary_path, "tables", file_path + ".parquet")
+				os.makedirs(os.path.dirname(table_path), exist_ok=True)
+				table.to_parquet(table_path, index=False)
+				manifest["tables"].append(file_path)
+			copy_path = os.path.join(temporary_path, "files", file_path)
+			os.makedirs(os.path.dirname(copy_path), exist_ok=True)
+			shutil.copyfile(source.get_full_path(file_path), copy_path)
+
+	with open(os.path.join(temporary_path, "manifest.json"), "w") as f:
+		json.dump(manifest, f, indent=1)
+	os.rename(temporary_path, snapshot_path)
+	print("snapshot: {}".format(snapshot_path))
+
+if __name__ == "__main__":
+	main()
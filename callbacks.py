@@ -3,7 +3,7 @@ import dash
 from dash import dcc, html
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State, ALL
+from dash.dependencies import Input, Output, State, ALL, ClientsideFunction
 from dash import dash_table
 from dash.dash_table.Format import Format, Scheme
 import pandas as pd
@@ -12,11 +12,9 @@ import re
 import os
 import plotly.graph_objects as go
 import plotly.express as px
-import plotly.figure_factory as ff
 from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 from functools import reduce
-from sklearn.preprocessing import scale
 import tempfile
 import scipy
 from itertools import combinations
@@ -61,9 +59,8 @@ def define_callbacks(app):
 	)
 	def update_analysis_related_data(path):
 		#metadata related elements
-		metadata = functions.download_from_github(path, "metadata.tsv")
-		metadata = pd.read_csv(metadata, sep = "\t")
-		metadata = metadata.replace("_", " ", regex=True)
+		analysis_metadata = functions.get_analysis_metadata(path)
+		metadata = analysis_metadata.get_metadata()
 		metadata_options = []
 		heatmap_annotation_options = []
 		discrete_metadata_options = []
@@ -72,14 +69,14 @@ def define_callbacks(app):
 		columns_to_keep = []
 		for column in metadata.columns:
 			#color by and heatmap annotation dropdowns
-			if column not in ["sample", "fq1", "fq2", "control", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
+			if column in analysis_metadata.columns:
 				#dict used for translating colnames
 				label_to_value[column] = column.capitalize().replace("_", " ")
 				metadata_options.append({"label": column.capitalize().replace("_", " "), "value": column})
 				if column != "condition":
 					heatmap_annotation_options.append({"label": column.capitalize().replace("_", " "), "value": column})
 				#discrete and continuous metadatas
-				if str(metadata.dtypes[column]) == "object":
+				if column in analysis_metadata.discrete_columns:
 					#condition should always be the first
 					if column == "condition":
 						discrete_metadata_options.insert(0, {"label": column.capitalize().replace("_", " "), "value": column})
@@ -174,11 +171,12 @@ def define_callbacks(app):
 		all_tabs = [metadata_tab, profiling_tab, differential_analysis_tab]
 
 		## additional tabs ##
-		main_folders = functions.get_content_from_github(path, "./")
+		manifest = functions.get_manifest(path)
+		main_folders = manifest["folders"]
 		#mofa
 		mofa_contrasts_options = []
 		if "mofa" in main_folders:
-			mofa_contrasts = functions.get_content_from_github(path, "mofa")
+			mofa_contrasts = manifest["mofa"]
 			for mofa_contrast in mofa_contrasts:
 				mofa_contrasts_options.append({"label": mofa_contrast.replace("-", " ").replace("_", " "), "value": mofa_contrast})
 
@@ -188,7 +186,7 @@ def define_callbacks(app):
 		#deconvolution
 		deconvolution_datasets_options = []
 		if "deconvolution" in main_folders:
-			deconvolution_datasets = functions.get_content_from_github(path, "deconvolution")
+			deconvolution_datasets = manifest["deconvolution"]
 
 			#deconvolution datasets
 			for deconvolution_dataset in deconvolution_datasets:
@@ -211,8 +209,7 @@ def define_callbacks(app):
 	)
 	def show_add_gsea_switch(expression_dataset, path):
 		if expression_dataset in ["human", "mouse"]:
-			folders = functions.get_content_from_github(path, "data/{}".format(expression_dataset))
-			if "gsea" in folders:
+			if functions.get_manifest(path)["datasets"][expression_dataset]["gsea"]:
 				hidden = False	
 			else:
 				hidden = True
@@ -304,7 +301,7 @@ def define_callbacks(app):
 				]
 
 				#add diversity tab when some species expression dataset is selected
-				main_folders = functions.get_content_from_github(path, "./")
+				main_folders = functions.get_manifest(path)["folders"]
 				if "species" in expression_dataset and "diversity" in main_folders:
 					tabs_children.append(dcc.Tab(id="diversity_tab", label="Species diversity", value="diversity_tab", style=tab_style, selected_style=tab_selected_style))
 				
@@ -459,8 +456,7 @@ def define_callbacks(app):
 	def show_target_prioritization_switch(feature_dataset, path):
 		hidden = True
 		if feature_dataset == "human":
-			github_content = functions.get_content_from_github(path, "")
-			if "opentargets.tsv" in github_content:
+			if "opentargets.tsv" in functions.get_manifest(path)["folders"]:
 				hidden = False
 		
 		return hidden
@@ -478,18 +474,22 @@ def define_callbacks(app):
 	)
 	def get_mds_type_for_dataset(mds_dataset, path):
 
-		mds_files = functions.get_content_from_github(path, "data/" + mds_dataset + "/mds")
+		mds_types = functions.get_manifest(path)["datasets"][mds_dataset]["mds"]
 		
 		options = []
-		for file in mds_files:
-			mds_type = file.split(".")[0]
+		for mds_type in mds_types:
 			if mds_type == "tsne":
 				label = "t-SNE"
 			else:
 				label = "UMAP"
 			options.append({"label": label, "value": mds_type})
 
-		if "umap.tsv" in mds_files:
+		#projections of the selected samples need the counts store
+		if functions.load_counts_store(path, mds_dataset) is not None:
+			options.append({"label": "PCA of selected samples", "value": "pca"})
+			options.append({"label": "t-SNE of selected samples", "value": "computed_tsne"})
+
+		if "umap" in mds_types:
 			value = "umap"
 		else:
 			value = "tsne"
@@ -519,9 +519,8 @@ def define_callbacks(app):
 						search_value = "data/" + expression_dataset + "/counts/lipid_list.tsv"
 					else:
 						search_value = "data/" + expression_dataset + "/counts/feature_list.tsv"
-				search_value = functions.download_from_github(path, search_value)
-				search_value = search_value.readline()
-				search_value = search_value.rstrip()
+				search_value = functions.read_tsv(path, search_value, header=None, names=["feature"])
+				search_value = search_value["feature"][0]
 		else:
 			repo = functions.get_repo_name_from_path(path, repos)
 			search_value = config["repos"][repo]["gene"]
@@ -586,9 +585,8 @@ def define_callbacks(app):
 							value = "data/" + expression_dataset + "/counts/lipid_list.tsv"
 						else:
 							value = "data/" + expression_dataset + "/counts/feature_list.tsv"
-					value = functions.download_from_github(path, value)
-					value = value.readline()
-					value = value.rstrip()
+					value = functions.read_tsv(path, value, header=None, names=["feature"])
+					value = value["feature"][0]
 			else:
 				repo = functions.get_repo_name_from_path(path, repos)
 				value = config["repos"][repo]["gene"]
@@ -640,7 +638,8 @@ def define_callbacks(app):
 	)
 	def update_feature_and_mds_datasets_dropdown(path):
 		#get all subdir to populate expression dataset
-		subdirs = functions.get_content_from_github(path, "data")
+		datasets = functions.get_manifest(path)["datasets"]
+		subdirs = list(datasets)
 		expression_datasets_options = []
 		mds_dataset_options = []
 		for dir in subdirs:
@@ -649,7 +648,7 @@ def define_callbacks(app):
 				expression_datasets_options.append({"label": dir.capitalize(), "value": dir})
 				mds_dataset_options.append({"label": dir.capitalize(), "value": dir})
 			else:
-				non_host_content = functions.get_content_from_github(path, "data/" + dir)
+				non_host_content = datasets[dir]["folders"]
 				if "lipid" in dir:
 					expression_datasets_options.append({"label": dir.capitalize().replace("_", " "), "value": dir})
 					if "mds" in non_host_content:
@@ -698,14 +697,10 @@ def define_callbacks(app):
 		#get which repo has been selected
 		repo = functions.get_repo_name_from_path(path, repos)
 
-		dge_folder = "data/" + expression_dataset + "/dge"
-		dge_files = functions.get_content_from_github(path, dge_folder)
 		contrasts = []
 		filtered_contrasts = []
-		#get dge files for getting all the contrasts
-		for dge_file in dge_files:
-			contrast = dge_file.split("/")[-1]
-			contrast = contrast.split(".")[0]
+		#get all the contrasts
+		for contrast in functions.get_manifest(path)["datasets"][expression_dataset]["contrasts"]:
 			
 			#try to use the best contrasts in the config
 			if boolean_best_comparisons_switch:
@@ -767,23 +762,22 @@ def define_callbacks(app):
 			raise PreventUpdate
 		
 		if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
-			folders = functions.get_content_from_github(path, "data/{}".format(expression_dataset))
+			stringencies = functions.get_manifest(path)["datasets"][expression_dataset]["stringencies"]
 			options = []
 			#get all dge analyisis performed
-			for folder in folders:
-				if folder not in ["counts", "dge", "mds", "gsea"]:
-					#strincecy type
-					stringency_type = folder.split("_")[0]
-					if stringency_type == "pvalue":
-						label = "P-value "
-					else:
-						label = "FDR "
-					#stringency value
-					stringency_value = folder.split("_")[1]
-					label += stringency_value
-					
-					#populate options
-					options.append({"label": label, "value": folder})
+			for folder in stringencies:
+				#strincecy type
+				stringency_type = folder.split("_")[0]
+				if stringency_type == "pvalue":
+					label = "P-value "
+				else:
+					label = "FDR "
+				#stringency value
+				stringency_value = folder.split("_")[1]
+				label += stringency_value
+				
+				#populate options
+				options.append({"label": label, "value": folder})
 		
 			#default value defined in config file
 			repo = functions.get_repo_name_from_path(path, repos)
@@ -1193,8 +1187,7 @@ def define_callbacks(app):
 			raise PreventUpdate
 		
 		#open metadata
-		metadata = functions.download_from_github(path, "metadata.tsv")
-		metadata = pd.read_csv(metadata, sep = "\t")
+		metadata = functions.get_analysis_metadata(path).metadata
 
 		#get hypotetical mofa contrast value from constrast dropdown
 		groups = []
@@ -1209,7 +1202,7 @@ def define_callbacks(app):
 
 		#search in github data the selected mofa contrast
 		group_contrast = "-vs-".join(groups)
-		mofa_contrasts = functions.get_content_from_github(path, "mofa")
+		mofa_contrasts = functions.get_manifest(path)["mofa"]
 		#try the opposite contrast
 		if not group_contrast in mofa_contrasts:
 			group_contrast = groups[1] + "-vs-" + groups[0]
@@ -1282,9 +1275,7 @@ def define_callbacks(app):
 	def downlaod_diffexp_table(button_click, path, dataset, contrast, stringency):
 
 		#download from GitHub
-		df = functions.download_from_github(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
-		#read the downloaded content and make a pandas dataframe
-		df = pd.read_csv(df, sep="\t")
+		df = functions.read_tsv(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
 		df = df[["Gene", "Geneid", "log2FoldChange", "lfcSE", "pvalue", "padj", "baseMean"]]
 
 		#clean features
@@ -1330,8 +1321,7 @@ def define_callbacks(app):
 	def downlaod_diffexp_table_partial(button_click, path, dataset, contrast, stringency, dropdown_values):
 		
 		#download from GitHub
-		df = functions.download_from_github(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
-		df = pd.read_csv(df, sep="\t")
+		df = functions.read_tsv(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
 		df = df[["Gene", "Geneid", "log2FoldChange", "lfcSE", "pvalue", "padj", "baseMean"]]
 
 		#filter selected genes
@@ -1409,16 +1399,14 @@ def define_callbacks(app):
 
 		#download from GitHub
 		if expression_dataset in ["human", "mouse"]:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
 		else:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
-		go_df = pd.read_csv(go_df, sep="\t")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
 		go_df = go_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 
 		#concatenate gsea results if the switch is true
 		if boolean_add_gsea_switch:
-			gsea_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
-			gsea_df = pd.read_csv(gsea_df, sep = "\t")
+			gsea_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
 			gsea_df = gsea_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 			go_df = pd.concat([go_df, gsea_df])
 		
@@ -1447,17 +1435,14 @@ def define_callbacks(app):
 
 		#define search query if present
 		if expression_dataset in ["human", "mouse"]:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
 		else:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
-		#open df
-		go_df = pd.read_csv(go_df, sep="\t")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
 		go_df = go_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 		
 		#concatenate gsea results if the switch is true
 		if boolean_add_gsea_switch:
-			gsea_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
-			gsea_df = pd.read_csv(gsea_df, sep = "\t")
+			gsea_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
 			gsea_df = gsea_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 			go_df = pd.concat([go_df, gsea_df])
 
@@ -1558,77 +1543,122 @@ def define_callbacks(app):
 		Output("dge_table_filtered", "columns"),
 		Output("dge_table_filtered", "data"),
 		Output("dge_table_filtered", "style_data_conditional"),
+		Output("dge_table_filtered", "page_count"),
+		Output("dge_table_filtered", "page_current"),
 		Output("filtered_dge_table_div", "hidden"),
 		Input("multi_gene_dge_table_dropdown", "value"),
 		Input("contrast_dropdown", "value"),
 		Input("feature_dataset_dropdown", "value"),
 		Input("stringency_dropdown", "value"),
 		Input("target_prioritization_switch", "value"),
+		Input("dge_table_filtered", "page_current"),
+		Input("dge_table_filtered", "page_size"),
+		Input("dge_table_filtered", "sort_by"),
+		Input("dge_table_filtered", "filter_query"),
 		State("analysis_dropdown", "value")
 	)
-	def display_filtered_dge_table(dropdown_values, contrast, dataset, fdr, target_prioritization, path):
+	def display_filtered_dge_table(dropdown_values, contrast, dataset, fdr, target_prioritization, page_current, page_size, sort_by, filter_query, path):
 		ctx = dash.callback_context
 		trigger_id = ctx.triggered[0]["prop_id"]
 
 		boolean_target_prioritization = functions.boolean_switch(target_prioritization)
+
+		#new rows start from the first page
+		if trigger_id not in ["dge_table_filtered.page_current", "dge_table_filtered.page_size", "dge_table_filtered.sort_by", "dge_table_filtered.filter_query"]:
+			page_current = 0
 		
 		if dropdown_values is None or dropdown_values == [] or trigger_id == "feature_dataset_dropdown.value":
 			hidden_div = True
 			columns = []
 			data = [{}]
 			style_data_conditional = []
+			page_count = 1
+			page_current = 0
 		else:
 			hidden_div = False
 			#open tsv
-			table = functions.download_from_github(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
-			table = pd.read_csv(table, sep = "\t")
+			table = functions.read_tsv(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv").copy()
 
 			#filter selected genes
 			if dataset not in ["human", "mouse"]:
-				table["Gene"] = [x.replace("_", " ").replace("[", "").replace("]", "") for x in table["Gene"]]
+				table["Gene"] = table["Gene"].str.replace("_", " ", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
 				dropdown_values = [value.replace("_", " ").replace("[", "").replace("]", "") for value in dropdown_values]
 			else:
 				dropdown_values = [value.replace("€", "/")for value in dropdown_values]
 			table = table[table["Gene"].isin(dropdown_values)]
 
-			columns, data, style_data_conditional = functions.dge_table_operations(table, dataset, fdr, boolean_target_prioritization, path)
+			#ranks are computed on the selected features only
+			if boolean_target_prioritization:
+				columns, table, style_data_conditional = functions.format_dge_table(table, dataset, fdr, boolean_target_prioritization, path)
+			#rows of the already formatted full table, which keeps the index of the tsv
+			else:
+				columns, formatted_table, style_data_conditional = functions.get_dge_table(path, dataset, contrast, fdr, boolean_target_prioritization)
+				table = formatted_table[formatted_table.index.isin(table.index)]
+
+			#only the visible page is sent
+			data, page_count, page_current = functions.get_table_page(table, page_current, page_size, sort_by, filter_query, ["P-value", "FDR"])
 
-		return columns, data, style_data_conditional, hidden_div
+		return columns, data, style_data_conditional, page_count, page_current, hidden_div
 
 	#dge table full
 	@app.callback(
 		Output("dge_table", "columns"),
 		Output("dge_table", "data"),
 		Output("dge_table", "style_data_conditional"),
+		Output("dge_table", "page_count"),
+		Output("dge_table", "page_current"),
 		Input("contrast_dropdown", "value"),
 		Input("feature_dataset_dropdown", "value"),
 		Input("stringency_dropdown", "value"),
 		Input("target_prioritization_switch", "value"),
+		Input("dge_table", "page_current"),
+		Input("dge_table", "page_size"),
+		Input("dge_table", "sort_by"),
+		Input("dge_table", "filter_query"),
 		State("analysis_dropdown", "value")
 	)
-	def display_dge_table(contrast, dataset, strincency, target_prioritization, path):
-		#open tsv
-		table = functions.download_from_github(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
-		table = pd.read_csv(table, sep = "\t")
-		
+	def display_dge_table(contrast, dataset, strincency, target_prioritization, page_current, page_size, sort_by, filter_query, path):
+		ctx = dash.callback_context
+		trigger_id = ctx.triggered[0]["prop_id"]
+
 		boolean_target_prioritization = functions.boolean_switch(target_prioritization)
+
+		#a new table starts from the first page
+		if trigger_id not in ["dge_table.page_current", "dge_table.page_size", "dge_table.sort_by", "dge_table.filter_query"]:
+			page_current = 0
 		
-		columns, data, style_data_conditional = functions.dge_table_operations(table, dataset, strincency, boolean_target_prioritization, path)
+		columns, table, style_data_conditional = functions.get_dge_table(path, dataset, contrast, strincency, boolean_target_prioritization)
+
+		#only the visible page is sent
+		data, page_count, page_current = functions.get_table_page(table, page_current, page_size, sort_by, filter_query, ["P-value", "FDR"])
 
-		return columns, data, style_data_conditional
+		return columns, data, style_data_conditional, page_count, page_current
 
 	#go table
 	@app.callback(
 		Output("go_table", "columns"),
 		Output("go_table", "data"),
+		Output("go_table", "page_count"),
+		Output("go_table", "page_current"),
 		Input("contrast_dropdown", "value"),
 		Input("stringency_dropdown", "value"),
 		Input("go_plot_filter_input", "value"),
 		Input("feature_dataset_dropdown", "value"),
 		Input("add_gsea_switch", "value"),
+		Input("go_table", "page_current"),
+		Input("go_table", "page_size"),
+		Input("go_table", "sort_by"),
+		Input("go_table", "filter_query"),
 		State("analysis_dropdown", "value")
 	)
-	def display_go_table(contrast, stringency, search_value, expression_dataset, add_gsea_switch, path):
+	def display_go_table(contrast, stringency, search_value, expression_dataset, add_gsea_switch, page_current, page_size, sort_by, filter_query, path):
+		ctx = dash.callback_context
+		trigger_id = ctx.triggered[0]["prop_id"]
+
+		#a new table starts from the first page
+		if trigger_id not in ["go_table.page_current", "go_table.page_size", "go_table.sort_by", "go_table.filter_query"]:
+			page_current = 0
+
 		if expression_dataset not in ["human", "mouse", "lipid", "lipid_category"]:
 			expression_dataset = "human"
 			repo = functions.get_repo_name_from_path(path, repos)
@@ -1642,15 +1672,13 @@ def define_callbacks(app):
 			expression_dataset = "lipid"
 		
 		if expression_dataset in ["human", "mouse"]:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
 		else:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
-		go_df = pd.read_csv(go_df, sep="\t")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
 		go_df = go_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 		#concatenate gsea results if the switch is true
 		if boolean_add_gsea_switch:
-			gsea_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
-			gsea_df = pd.read_csv(gsea_df, sep = "\t")
+			gsea_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
 			gsea_df = gsea_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 			gsea_df["Genes"] = gsea_df["Genes"].str.replace(";", "; ")
 			go_df = pd.concat([go_df, gsea_df])
@@ -1663,7 +1691,7 @@ def define_callbacks(app):
 
 		#add links to amigo for main organism or add spaces for lipids
 		if expression_dataset in ["human", "mouse"]:
-			go_df["Process~name"] = ["[{}](".format(process) + str("http://amigo.geneontology.org/amigo/term/") + process.split("~")[0] + ")" for process in go_df["Process~name"]]
+			go_df["Process~name"] = "[" + go_df["Process~name"] + "](http://amigo.geneontology.org/amigo/term/" + go_df["Process~name"].str.split("~").str[0] + ")"
 			process_column = "GO biological process"
 			feature_columm = "Genes"
 			up_or_down_column = "DGE"
@@ -1687,9 +1715,11 @@ def define_callbacks(app):
 			{"name": "Enrichment", "id":"Enrichment", "type": "numeric", "format": Format(precision=2, scheme=Scheme.fixed)},
 			{"name": "P-value", "id":"P-value", "type": "numeric", "format": Format(precision=2, scheme=Scheme.decimal_or_exponent)}
 			]
-		data = go_df.to_dict("records")
 
-		return columns, data
+		#only the visible page is sent
+		data, page_count, page_current = functions.get_table_page(go_df, page_current, page_size, sort_by, filter_query)
+
+		return columns, data, page_count, page_current
 
 	##### plots #####
 
@@ -1697,6 +1727,7 @@ def define_callbacks(app):
 	@app.callback(
 		Output("mds_graph", "figure"),
 		Output("mds_graph", "config"),
+		Output("mds_projection_interval", "disabled"),
 		Input("mds_dataset", "value"),
 		Input("mds_type", "value"),
 		Input("metadata_dropdown_mds", "value"),
@@ -1704,15 +1735,14 @@ def define_callbacks(app):
 		Input("feature_dropdown", "value"),
 		Input("contrast_dropdown", "value"),
 		Input("mds_graph", "restyleData"),
-		Input("mds_graph", "relayoutData"),
 		Input("comparison_only_mds_metadata_switch", "value"),
-		Input("hide_unselected_mds_metadata_switch", "value"),
+		Input("mds_projection_interval", "n_intervals"),
 		State("mds_graph", "figure"),
 		State("color_mapping", "data"),
 		State("label_to_value", "data"),
 		State("analysis_dropdown", "value")
 	)
-	def plot_mds(mds_dataset, mds_type, metadata, expression_dataset, feature, contrast, legend_click, zoom, comparison_only_switch, hide_unselected_switch, fig, color_mapping, label_to_value, path):
+	def plot_mds(mds_dataset, mds_type, metadata, expression_dataset, feature, contrast, legend_click, comparison_only_switch, projection_interval, fig, color_mapping, label_to_value, path):
 
 		#define contexts
 		ctx = dash.callback_context
@@ -1720,171 +1750,173 @@ def define_callbacks(app):
 
 		#boolean switches
 		boolean_comparison_only_switch = functions.boolean_switch(comparison_only_switch)
-		boolean_hide_unselected_switch = functions.boolean_switch(hide_unselected_switch)
 
 		#do not update the plot for change in contrast if the switch is off
 		if trigger_id == "contrast_dropdown.value" and boolean_comparison_only_switch is False:
 			raise PreventUpdate
 
-		#hide unselected legend items
-		if trigger_id == "hide_unselected_mds_metadata_switch.value" and fig is not None:
-			if boolean_hide_unselected_switch:
-				fig["layout"]["legend"]["itemclick"] = False
-				fig["layout"]["legend"]["itemdoubleclick"] = False
-				for trace in fig["data"]:
-					if trace["visible"] == "legendonly":
-						trace["visible"] = False
-			else:
-				fig["layout"]["legend"]["itemclick"] = "toggle"
-				fig["layout"]["legend"]["itemdoubleclick"] = "toggleothers"
-				for trace in fig["data"]:
-					if trace["visible"] is False:
-						trace["visible"] = "legendonly"
-		#update number of samples in subplot titles whenever you zoom
-		elif trigger_id == "mds_graph.relayoutData" and fig is not None:
-			for annotation in fig["layout"]["annotations"]:
-				annotation["text"] = re.sub("n=\d+", "n=", annotation["text"])
-				annotation["text"] += str(functions.get_displayed_samples(fig))
-		#new plot
-		else:
-			#open mds_df
-			mds_df = functions.download_from_github(path, "data/" + mds_dataset + "/mds/" + mds_type + ".tsv")
-			mds_df = pd.read_csv(mds_df, sep = "\t")
-
-			#comparison only will filter the samples
+		#open mds_df, computed projections only have the samples of the comparison
+		if mds_type in functions.computed_projection_columns:
 			if boolean_comparison_only_switch:
-				mds_df = mds_df[mds_df["condition"].isin(contrast.split("-vs-"))]
-
-			#parse old fig if the legend has been clicked
-			if trigger_id == "mds_graph.restyleData":
-				#get samples to keep
-				samples_to_keep = []
-				#save trace visibility
-				trace_visibility = {}
-				#parse metadata figure data 
-				for trace in fig["data"]:
-					if trace["name"] not in ["na_continuous_trace", "Log2 expression"]:
-						trace_visibility[trace["name"]] = trace["visible"]
-						if trace["visible"] is True:
-							for dot in trace["customdata"]:
-								#stores samples to keep after filtering
-								samples_to_keep.append(dot[0])
+				mds_projection = functions.get_computed_projection(path, mds_dataset, mds_type, contrast.split("-vs-"))
 			else:
-				samples_to_keep = mds_df["sample"].str.replace("_", " ").tolist()
-
-			#define x and y
-			if mds_type == "tsne":
-				x = "x"
-				y = "y"
-			elif mds_type == "umap":
-				x = "UMAP1"
-				y = "UMAP2"
-
-			#labels for graph title
-			if "lipid" in mds_dataset:
-				omics = "lipidome"
-				subdirs = functions.get_content_from_github(path, "data")
-				if "human" in subdirs:
-					mds_title = "human"
-				elif "mouse" in subdirs:
-					mds_title = "mouse"
-			else:
-				omics = "transcriptome"
-			if mds_dataset in ["human", "mouse"]:
-				mds_title = mds_dataset.capitalize()
-			else:
-				mds_title = mds_dataset.replace("_", " ").capitalize()
+				mds_projection = functions.get_computed_projection(path, mds_dataset, mds_type)
+			#the projection is computed in the worker processes, the interval draws the mds again until it is finished
+			if mds_projection is None:
+				fig = go.Figure()
+				fig.update_layout(title_text="Computing the " + mds_type.replace("computed_tsne", "t-SNE").replace("pca", "PCA") + " of the selected samples", title_x=0.5, font_family="Arial", xaxis_visible=False, yaxis_visible=False, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+				return fig, dash.no_update, False
+		else:
+			mds_projection = functions.get_mds_projection(path, mds_dataset, mds_type)
+		mds_df = mds_projection.mds_df
+
+		#comparison only will filter the samples
+		if boolean_comparison_only_switch:
+			mds_df = mds_df[mds_df["condition"].isin(contrast.split("-vs-"))]
+
+		#parse old fig if the legend has been clicked
+		if trigger_id == "mds_graph.restyleData":
+			#get samples to keep
+			samples_to_keep = []
+			#save trace visibility
+			trace_visibility = {}
+			#parse metadata figure data 
+			for trace in fig["data"]:
+				if trace["name"] not in ["na_continuous_trace", "Log2 expression"]:
+					trace_visibility[trace["name"]] = trace["visible"]
+					if trace["visible"] is True:
+						for dot in trace["customdata"]:
+							#stores samples to keep after filtering
+							samples_to_keep.append(dot[0])
+		else:
+			samples_to_keep = mds_df["sample"].str.replace("_", " ").tolist()
+
+		#define x and y
+		if mds_type == "tsne":
+			x = "x"
+			y = "y"
+		elif mds_type == "umap":
+			x = "UMAP1"
+			y = "UMAP2"
+		else:
+			x, y = functions.computed_projection_columns[mds_type]
 
-			#titles for subplots
-			left_title = mds_title + " " + omics + " MDS<br>colored by " + metadata.replace("_", " ") + " n="
-			if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
-				expression_or_abundance = " expression"
-			else:
-				expression_or_abundance = " abundance"
-			if "genes" in expression_dataset:
-				feature_gene = feature.split("@")[0]
-				feature_beast = feature.split("@")[1]
-				feature_beast = feature_beast.replace("_", " ")
-				feature_clean = feature_gene + " - " + feature_beast
-				right_title = mds_title + " " + omics + " MDS colored by<br>" + feature_clean + expression_or_abundance + " n="
-			else:
-				right_title = mds_title + " " + omics + " MDS<br>colored by " + feature.replace("_", " ").replace("[", "").replace("]", "").replace("€", "/") + expression_or_abundance + " n="
-
-			#operations on mds_df
-			mds_df = mds_df.sort_values(by=[metadata])
-			mds_df[metadata] = mds_df[metadata].fillna("NA")
-			mds_df = mds_df.rename(columns=label_to_value)
-			mds_df = mds_df.replace("_", " ", regex=True)
-			mds_df = mds_df.rename(columns=label_to_value)
-			metadata_original = metadata
-			metadata = label_to_value[metadata]
-
-			#create fig, figure layout will change based on which metadata is plotted
-			if str(mds_df.dtypes[metadata]) == "object":
-				plot_rows = 2
-				horizontal_spacing=0.1
-				specs = [[{}, {}], [None, None]]
-				colorbar_len = 0.6
-				row_heights = [0.7, 0.3]
-				height = 690
-			else:
-				plot_rows = 1
-				horizontal_spacing=0.2
-				specs = [[{}, {}]]
-				colorbar_len = 1
-				row_heights = [1]
-				height = 440
-			fig = make_subplots(plot_rows, 2, column_titles=[left_title, right_title], horizontal_spacing=horizontal_spacing, specs=specs, row_heights=row_heights)
-			
-			#discrete or continuous metadata
-			if str(mds_df.dtypes[metadata]) == "object":
-				fig = functions.plot_mds_discrete(mds_df, color_mapping, x, y, metadata, fig, label_to_value, path)
-			else:
-				variable_to_plot = [metadata]
-				color = functions.get_color(color_mapping, metadata_original, "continuous")
-				fig = functions.plot_mds_continuous(mds_df, x, y, variable_to_plot, color, fig, label_to_value, path, colorbar_len)
+		#labels for graph title
+		if "lipid" in mds_dataset:
+			omics = "lipidome"
+			subdirs = list(functions.get_manifest(path)["datasets"])
+			if "human" in subdirs:
+				mds_title = "human"
+			elif "mouse" in subdirs:
+				mds_title = "mouse"
+		else:
+			omics = "transcriptome"
+		if mds_dataset in ["human", "mouse"]:
+			mds_title = mds_dataset.capitalize()
+		else:
+			mds_title = mds_dataset.replace("_", " ").capitalize()
 
-			#apply old trace visibility if needed
-			if trigger_id == "mds_graph.restyleData":
-				for trace in fig["data"]:
-					trace["visible"] = trace_visibility[trace["name"]]
-
-			#setup variables for plotting
-			variable_to_plot = [expression_dataset, feature, samples_to_keep]
-			#filter samples
-			mds_df = mds_df[mds_df["Sample"].isin(samples_to_keep)]
-			#get color
-			color = functions.get_color(color_mapping, "Log2 expression", "continuous")
-			#add traces
+		#titles for subplots
+		left_title = mds_title + " " + omics + " MDS<br>colored by " + metadata.replace("_", " ") + " n="
+		if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
+			expression_or_abundance = " expression"
+		else:
+			expression_or_abundance = " abundance"
+		if "genes" in expression_dataset:
+			feature_gene = feature.split("@")[0]
+			feature_beast = feature.split("@")[1]
+			feature_beast = feature_beast.replace("_", " ")
+			feature_clean = feature_gene + " - " + feature_beast
+			right_title = mds_title + " " + omics + " MDS colored by<br>" + feature_clean + expression_or_abundance + " n="
+		else:
+			right_title = mds_title + " " + omics + " MDS<br>colored by " + feature.replace("_", " ").replace("[", "").replace("]", "").replace("€", "/") + expression_or_abundance + " n="
+
+		#operations on mds_df
+		mds_df = mds_projection.get_plot_df(mds_df, metadata, label_to_value)
+		metadata_original = metadata
+		metadata = label_to_value[metadata]
+
+		#create fig, figure layout will change based on which metadata is plotted
+		if str(mds_df.dtypes[metadata]) == "object":
+			plot_rows = 2
+			horizontal_spacing=0.1
+			specs = [[{}, {}], [None, None]]
+			colorbar_len = 0.6
+			row_heights = [0.7, 0.3]
+			height = 690
+		else:
+			plot_rows = 1
+			horizontal_spacing=0.2
+			specs = [[{}, {}]]
+			colorbar_len = 1
+			row_heights = [1]
+			height = 440
+		fig = make_subplots(plot_rows, 2, column_titles=[left_title, right_title], horizontal_spacing=horizontal_spacing, specs=specs, row_heights=row_heights)
+		
+		#discrete or continuous metadata
+		if str(mds_df.dtypes[metadata]) == "object":
+			fig = functions.plot_mds_discrete(mds_df, color_mapping, x, y, metadata, fig, label_to_value, path)
+		else:
+			variable_to_plot = [metadata]
+			color = functions.get_color(color_mapping, metadata_original, "continuous")
 			fig = functions.plot_mds_continuous(mds_df, x, y, variable_to_plot, color, fig, label_to_value, path, colorbar_len)
 
-			#update_layout
-			fig.update_layout(height=height, legend_title_text=metadata.capitalize().replace("_", " "), legend_orientation="h", legend_itemsizing="constant", legend_tracegroupgap=0.05, legend_title_side="top", legend_font_size=12, legend_yanchor="top", legend_y=0.3, font_family="Arial", margin_t=65, margin_l=0, margin_b=10, xaxis_title_text=x, yaxis_title_text=y, xaxis2_title_text=x, yaxis2_title_text=y)
-			
-			#synch zoom
-			fig.update_xaxes(matches="x")
-			fig.update_yaxes(matches="y")
+		#apply old trace visibility if needed
+		if trigger_id == "mds_graph.restyleData":
+			for trace in fig["data"]:
+				trace["visible"] = trace_visibility[trace["name"]]
+
+		#setup variables for plotting
+		variable_to_plot = [expression_dataset, feature, samples_to_keep]
+		#filter samples
+		mds_df = mds_df[mds_df["Sample"].isin(samples_to_keep)]
+		#get color
+		color = functions.get_color(color_mapping, "Log2 expression", "continuous")
+		#add traces
+		fig = functions.plot_mds_continuous(mds_df, x, y, variable_to_plot, color, fig, label_to_value, path, colorbar_len)
+
+		#update_layout
+		fig.update_layout(height=height, legend_title_text=metadata.capitalize().replace("_", " "), legend_orientation="h", legend_itemsizing="constant", legend_tracegroupgap=0.05, legend_title_side="top", legend_font_size=12, legend_yanchor="top", legend_y=0.3, font_family="Arial", margin_t=65, margin_l=0, margin_b=10, xaxis_title_text=x, yaxis_title_text=y, xaxis2_title_text=x, yaxis2_title_text=y)
+		
+		#synch zoom
+		fig.update_xaxes(matches="x")
+		fig.update_yaxes(matches="y")
 
-			#update subplot titles
-			for annotation in fig["layout"]["annotations"]:
-				annotation["font"]["size"] = 14
-				annotation["text"] += str(functions.get_displayed_samples(fig))
+		#update subplot titles
+		displayed_samples = functions.get_displayed_samples(fig)
+		for annotation in fig["layout"]["annotations"]:
+			annotation["font"]["size"] = 14
+			annotation["text"] += str(displayed_samples)
 
-			#transparent background
-			fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
-			fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
-			fig["layout"]["legend_bgcolor"] = "rgba(0,0,0,0)"
+		#transparent background
+		fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
+		fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
+		fig["layout"]["legend_bgcolor"] = "rgba(0,0,0,0)"
 
 		##### CONFIG OPTIONS ####
 		config_fig = {"modeBarButtonsToRemove": ["select2d", "lasso2d", "hoverClosestCartesian", "hoverCompareCartesian", "resetScale2d", "toggleSpikelines"], "toImageButtonOptions": {"format": "png", "scale": 5, "filename": f"mds_{mds_dataset}_colored_by_{metadata}_and_{feature}"}, "edits": {"legendPosition": True, "annotationText": True}, "doubleClickDelay": 1000}
 
-		return fig, config_fig
+		return fig, config_fig, True
+
+	#update number of samples in mds subplot titles whenever you zoom, in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="mds", function_name="update_displayed_samples"),
+		Output("mds_displayed_samples", "data"),
+		Input("mds_graph", "relayoutData")
+	)
+
+	#hide unselected legend items in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="hide_unselected"),
+		Output("mds_figure_update", "data"),
+		Input("hide_unselected_mds_metadata_switch", "value"),
+		State("mds_graph", "id")
+	)
 
 	#boxplots
 	@app.callback(
 		Output("boxplots_graph", "figure"),
 		Output("boxplots_graph", "config"),
-		Output("boxplot_div", "style"),
 		Output("x_filter_dropdown_div", "hidden"),
 		Output("comparison_only_boxplots_switch", "value"),
 		Output("best_conditions_boxplots_switch", "value"),
@@ -1905,23 +1937,20 @@ def define_callbacks(app):
 		#switches
 		Input("comparison_only_boxplots_switch", "value"),
 		Input("best_conditions_boxplots_switch", "value"),
-		Input("hide_unselected_boxplot_switch", "value"),
 		Input("show_as_boxplot_switch", "value"),
 		Input("stats_boxplots_switch", "value"),
-		#sliders
-		Input("boxplots_width_slider", "value"),
-		Input("boxplots_height_slider", "value"),
 		#states
+		State("boxplots_width_slider", "value"),
+		State("boxplots_height_slider", "value"),
 		State("feature_dataset_dropdown", "value"),
 		State("boxplots_graph", "figure"),
 		State("x_filter_dropdown_div", "hidden"),
 		State("stats_boxplots_switch", "options"),
 		State("boxplots_graph", "config"),
-		State("boxplot_div", "style"),
 		State("color_mapping", "data"),
 		State("analysis_dropdown", "value")
 	)
-	def plot_boxplots(feature, contrast, stringency, legend_click, x_metadata, selected_x_values, group_by_metadata, y_metadata, comparison_only_switch, best_conditions_switch, hide_unselected_switch, show_as_boxplot, stats_switch, width, height, expression_dataset, box_fig, x_filter_div_hidden, stats_switch_options, config_boxplots, plot_div_style, color_mapping, path):
+	def plot_boxplots(feature, contrast, stringency, legend_click, x_metadata, selected_x_values, group_by_metadata, y_metadata, comparison_only_switch, best_conditions_switch, show_as_boxplot, stats_switch, width, height, expression_dataset, box_fig, x_filter_div_hidden, stats_switch_options, config_boxplots, color_mapping, path):
 		#define contexts
 		ctx = dash.callback_context
 		trigger_id = ctx.triggered[0]["prop_id"]
@@ -1929,7 +1958,6 @@ def define_callbacks(app):
 		#boolean switch
 		boolean_comparison_only_switch = functions.boolean_switch(comparison_only_switch)
 		boolean_best_conditions_switch = functions.boolean_switch(best_conditions_switch)
-		boolean_hide_unselected_switch = functions.boolean_switch(hide_unselected_switch)
 		boolean_show_as_boxplot = functions.boolean_switch(show_as_boxplot)
 		boolean_stats_switch = functions.boolean_switch(stats_switch)
 
@@ -1940,16 +1968,7 @@ def define_callbacks(app):
 		#new plot
 		if trigger_id in ["feature_dropdown.value", "contrast_dropdown.value", "x_boxplot_dropdown.value", "x_filter_boxplot_dropdown.value", "group_by_boxplot_dropdown.value", "y_boxplot_dropdown.value", "comparison_only_boxplots_switch.value", "best_conditions_boxplots_switch.value", "stats_boxplots_switch.value", "stringency_dropdown.value"]:
 			#open metadata
-			metadata_df = functions.download_from_github(path, "metadata.tsv")
-			metadata_df = pd.read_csv(metadata_df, sep = "\t")
-
-			#clean metadata
-			metadata_df = metadata_df.fillna("NA")
-			metadata_df = metadata_df.replace("_", " ", regex=True)
-
-			#reset hide unselected switch
-			hide_unselected_switch = []
-			boolean_hide_unselected_switch = False
+			analysis_metadata = functions.get_analysis_metadata(path)
 			
 			#default reset dimension values
 			if box_fig is None:
@@ -1974,7 +1993,7 @@ def define_callbacks(app):
 			repo = functions.get_repo_name_from_path(path, repos)
 			if boolean_comparison_only_switch:
 				contrast = contrast.replace("_", " ")
-				metadata_df = metadata_df[metadata_df["condition"].isin(contrast.split("-vs-"))]
+				metadata_df = analysis_metadata.get_metadata(analysis_metadata.get_condition_mask(contrast.split("-vs-")), with_NA=True)
 			elif boolean_best_conditions_switch:
 				best_contrasts = config["repos"][repo]["best_comparisons"]
 				best_conditions = []
@@ -1984,7 +2003,9 @@ def define_callbacks(app):
 					for best_condition in best_conditions_in_best_contrast:
 						if best_condition not in best_conditions:
 							best_conditions.append(best_condition)
-				metadata_df = metadata_df[metadata_df["condition"].isin(best_conditions)]				
+				metadata_df = analysis_metadata.get_metadata(analysis_metadata.get_condition_mask(best_conditions), with_NA=True)
+			else:
+				metadata_df = analysis_metadata.get_metadata(with_NA=True)
 
 			#labels
 			if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
@@ -1996,13 +2017,11 @@ def define_callbacks(app):
 
 			#counts as y need external file with count values
 			if y_metadata in ["log2_expression", "log2_abundance"]:
-				counts = functions.download_from_github(path, "data/" + expression_dataset + "/counts/" + feature + ".tsv")
-				counts = pd.read_csv(counts, sep = "\t")
+				counts = functions.get_counts(path, expression_dataset, [feature], layer="log2")
+				counts = counts.rename(columns={feature: log2_expression_or_abundance})
 				counts = counts.replace("_", " ", regex=True)
-				#merge and compute log2 and replace inf with 0
+				#merge with log2 values
 				metadata_df = metadata_df.merge(counts, how="inner", on="sample")
-				metadata_df[log2_expression_or_abundance] = np.log2(metadata_df["counts"])
-				metadata_df[log2_expression_or_abundance].replace(to_replace = -np.inf, value = 0, inplace=True)
 
 				#clean metatranscriptomic genes
 				if "genes" in expression_dataset:
@@ -2028,8 +2047,7 @@ def define_callbacks(app):
 
 				#user defined list of condition
 				if x_metadata == "condition" and config["repos"][repo]["sorted_conditions"]  and boolean_comparison_only_switch is False and boolean_best_conditions_switch is False:
-					metadata_fields_ordered = config["repos"][repo]["condition_list"]
-					metadata_fields_ordered = [condition.replace("_", " ") for condition in metadata_fields_ordered]
+					metadata_fields_ordered = analysis_metadata.conditions.copy()
 				else:
 					metadata_fields_ordered = metadata_df[x_metadata].unique().tolist()
 					metadata_fields_ordered.sort()
@@ -2072,20 +2090,19 @@ def define_callbacks(app):
 					y_axis_title = y_metadata.replace("_", " ").capitalize()
 				x_values = filtered_metadata[x_metadata]
 
-				#create hovertext
-				filtered_metadata["hovertext"] = ""
-				for column in filtered_metadata.columns:
-					if column not in ["control", "counts", "hovertext", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
-						filtered_metadata["hovertext"] = filtered_metadata["hovertext"] + column.replace("_", " ").capitalize() + ": " + filtered_metadata[column].astype(str) + "<br>"
-				hovertext = filtered_metadata["hovertext"].tolist()
+				#hover data of the samples with their log2 values
+				if y_metadata in ["log2_expression", "log2_abundance"]:
+					custom_data, hovertemplate = analysis_metadata.get_hover_data(filtered_metadata["sample"], log2_expression_or_abundance)
+				else:
+					custom_data, hovertemplate = analysis_metadata.get_hover_data(filtered_metadata["sample"])
 
 				#create traces
 				marker_color = functions.get_color(color_mapping, column_for_filtering, metadata)
 				
 				if boolean_show_as_boxplot: 
-					box_fig.add_trace(go.Box(y=y_values, x=x_values, name=metadata, marker_color=marker_color, boxpoints="all", hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=True))
+					box_fig.add_trace(go.Box(y=y_values, x=x_values, name=metadata, marker_color=marker_color, boxpoints="all", customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=True))
 				else:
-					box_fig.add_trace(go.Violin(y=y_values, x=x_values, name=metadata, marker_color=marker_color, hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=True, points="all", spanmode="hard"))
+					box_fig.add_trace(go.Violin(y=y_values, x=x_values, name=metadata, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=True, points="all", spanmode="hard"))
 
 			#figure layout
 			if boolean_show_as_boxplot:
@@ -2126,50 +2143,19 @@ def define_callbacks(app):
 				if y_metadata in ["log2_expression", "log2_abundance"]:
 
 					#get contrasts which have both conditions in the selected conditions in the plot
-					contrasts_df_list = []
-					dge_folder = "data/" + expression_dataset + "/dge"
-					dge_files = functions.get_content_from_github(path, dge_folder)
-					for dge_file in dge_files:
-						contrast = dge_file.split("/")[-1]
-						contrast = contrast.split(".")[0]
+					dge_index = functions.get_dge_index(path, expression_dataset)
+					contrasts_in_plot = []
+					for contrast in dge_index.contrasts:
 						conditions_in_contrast = contrast.split("-vs-")
 						condition_1 = conditions_in_contrast[0]
 						condition_2 = conditions_in_contrast[1]
 						#see if both conditions in contrasts are in the contrast
 						if condition_1.replace("_", " ") in metadata_fields_ordered and condition_2.replace("_", " ") in metadata_fields_ordered:
-							dge_table = functions.download_from_github(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv")
-							dge_table = pd.read_csv(dge_table, sep = "\t")
-							
-							#since feature names are clean, to filter the dge table we need to clean it
-							dge_table = dge_table.dropna(subset=["Gene"])
-							if expression_dataset in ["human", "mouse"]:
-								dge_table["clean_feature"] = [x.replace("€", "/") for x in dge_table["Gene"]]
-							else:
-								if "lipid" in expression_dataset:
-									dge_table["clean_feature"] = dge_table["Gene"]
-								elif "genes" in expression_dataset:
-									clean_gen_column_name = []
-									for x in dge_table["Gene"]:
-										gene_x = x.split("@")[0]
-										beast_x = x.split("@")[1]
-										beast_x = beast_x.replace("_", " ")
-										x = gene_x + " - " + beast_x
-										clean_gen_column_name.append(x)
-									dge_table["clean_feature"] = clean_gen_column_name.copy()
-								else:
-									dge_table["clean_feature"] = [x.replace("_", " ").replace("[", "").replace("]", "") for x in dge_table["Gene"]]
-
-							#use only the selected gene in the table
-							dge_table = dge_table[dge_table["clean_feature"] == feature]
-							dge_table["Comparison"] = contrast.replace("-", " ").replace("_", " ")
-							contrasts_df_list.append(dge_table)
-
-					#concat all dfs
-					if len(contrasts_df_list) > 1:
-						merged_df = pd.concat(contrasts_df_list)
-					#no need to concat
-					elif len(contrasts_df_list) == 1:
-						merged_df = dge_table
+							contrasts_in_plot.append(contrast)
+
+					#rows of the selected gene, feature names in the index are already clean
+					if len(contrasts_in_plot) > 0:
+						merged_df = dge_index.get_rows([feature], contrasts_in_plot)
 					#any contrast for the selected conditions: create mock df
 					else:
 						if expression_dataset in ["human", "mouse"]:
@@ -2295,32 +2281,20 @@ def define_callbacks(app):
 			box_fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
 			box_fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
 			box_fig["layout"]["legend_bgcolor"] = "rgba(0,0,0,0)"
-
-			#plot_div_style
-			plot_div_style = {"width": width}
 		#take old fig
 		else:
 			box_fig = go.Figure(box_fig)
 
-			#slider resize
-			if trigger_id in ["boxplots_height_slider.value", "boxplots_width_slider.value"]:
-				box_fig["layout"]["height"] = height
-				box_fig["layout"]["width"] = width
-				plot_div_style = {"width": width}
-				if width < 600:
-					if "abundance" in box_fig["layout"]["title"]["text"]:
-						box_fig["layout"]["title"]["text"] = box_fig["layout"]["title"]["text"].replace(" abundance", "<br>abundance")
-					else:
-						box_fig["layout"]["title"]["text"] = box_fig["layout"]["title"]["text"].replace(" expression", "<br>expression")
 			#transform to boxplots or violins
-			elif trigger_id == "show_as_boxplot_switch.value":
+			if trigger_id == "show_as_boxplot_switch.value":
 				new_traces = []
 				for trace in box_fig["data"]:
 					y_values = trace["y"]
 					x_values = trace["x"]
 					metadata = trace["name"]
 					marker_color = trace["marker"]["color"]
-					hovertext = trace["hovertext"]
+					custom_data = trace["customdata"]
+					hovertemplate = trace["hovertemplate"]
 					visible = trace["visible"]
 					#no need to change statistics lines
 					if "mode" in trace:
@@ -2328,9 +2302,9 @@ def define_callbacks(app):
 					#change trace type
 					else:
 						if boolean_show_as_boxplot:
-							new_traces.append(go.Box(y=y_values, x=x_values, name=metadata, marker_color=marker_color, boxpoints="all", hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=visible))
+							new_traces.append(go.Box(y=y_values, x=x_values, name=metadata, marker_color=marker_color, boxpoints="all", customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=visible))
 						else:
-							new_traces.append(go.Violin(y=y_values, x=x_values, name=metadata, marker_color=marker_color, hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=visible, points="all", spanmode="hard"))
+							new_traces.append(go.Violin(y=y_values, x=x_values, name=metadata, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=visible, points="all", spanmode="hard"))
 				box_fig["data"] = None
 				box_fig.add_traces(new_traces)
 
@@ -2343,18 +2317,6 @@ def define_callbacks(app):
 					box_fig.update_layout(boxmode=boxmode)
 				else:
 					box_fig.update_layout(violinmode=boxmode)
-			#hide unselected traces
-			elif trigger_id == "hide_unselected_boxplot_switch.value":
-				if boolean_hide_unselected_switch:
-					box_fig.update_layout(legend_itemclick=False, legend_itemdoubleclick=False)
-					for trace in box_fig["data"]:
-						if trace["visible"] == "legendonly":
-							trace["visible"] = False
-				else:
-					box_fig.update_layout(legend_itemclick="toggle", legend_itemdoubleclick="toggleothers")
-					for trace in box_fig["data"]:
-						if trace["visible"] is False:
-							trace["visible"] = "legendonly"
 			#legend click when statistics switch is on
 			elif trigger_id == "boxplots_graph.restyleData" and boolean_stats_switch:
 				#parse figure data to get all the necessary infos
@@ -2425,7 +2387,17 @@ def define_callbacks(app):
 				box_fig["layout"]["annotations"] = None
 				box_fig.update_layout(annotations=updated_annotations)
 
-		return box_fig, config_boxplots, plot_div_style, x_filter_div_hidden, comparison_only_switch, best_conditions_switch, stats_switch, stats_switch_options, width, height
+		return box_fig, config_boxplots, x_filter_div_hidden, comparison_only_switch, best_conditions_switch, stats_switch, stats_switch_options, width, height
+
+	#hide unselected traces and resize the boxplots in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="update_boxplots"),
+		Output("boxplot_div", "style"),
+		Input("hide_unselected_boxplot_switch", "value"),
+		Input("boxplots_width_slider", "value"),
+		Input("boxplots_height_slider", "value"),
+		State("boxplots_graph", "id")
+	)
 
 	#MA-plot
 	@app.callback(
@@ -2479,8 +2451,7 @@ def define_callbacks(app):
 				expression_or_abundance = gene_or_species + " abundance"
 
 			#read table
-			table = functions.download_from_github(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv")
-			table = pd.read_csv(table, sep = "\t")
+			table = functions.read_tsv(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv").copy()
 			table["Gene"] = table["Gene"].fillna("NA")
 
 			#log2 base mean
@@ -2696,8 +2667,7 @@ def define_callbacks(app):
 			disabled = True
 			
 			#open deconvolution df
-			deconvolution_df = functions.download_from_github(path, f"deconvolution/{deconvolution_dataset}")
-			deconvolution_df = pd.read_csv(deconvolution_df, sep = "\t", low_memory=False)
+			deconvolution_df = functions.read_tsv(path, f"deconvolution/{deconvolution_dataset}", low_memory=False).copy()
 
 			#if there is no file, do not plot
 			if deconvolution_df.empty:
@@ -2714,8 +2684,8 @@ def define_callbacks(app):
 			deconvolution_df = deconvolution_df.dropna(subset=split_by_columns)
 
 			#group by
-			grouped_df = deconvolution_df.groupby(split_by_columns).sum()
-			grouped_df = pd.DataFrame({"proportion_sum": grouped_df["Proportion"]})
+			grouped_df = deconvolution_df.groupby(split_by_columns, observed=True)["Proportion"].sum()
+			grouped_df = pd.DataFrame({"proportion_sum": grouped_df})
 			grouped_df = grouped_df.reset_index()
 
 			#create x_values column with the variables
@@ -2736,9 +2706,9 @@ def define_callbacks(app):
 				filtered_df = deconvolution_df[deconvolution_df["x_values"] == x_value]
 				filtered_df["relative_proportion"] = filtered_df["Proportion"] / sum_value
 				#sum values of the same Cell type
-				filtered_df = filtered_df.groupby(["Cell type"]).sum()
+				filtered_df = filtered_df.groupby(["Cell type"], observed=True)["relative_proportion"].sum()
 				#reconstruct df
-				filtered_df = pd.DataFrame({"relative_proportion": filtered_df["relative_proportion"]})
+				filtered_df = pd.DataFrame({"relative_proportion": filtered_df})
 				filtered_df["x_values"] = x_value
 				filtered_df = filtered_df.reset_index()
 				#append to list
@@ -2833,7 +2803,7 @@ def define_callbacks(app):
 					showlegend = False
 
 			#get host for title
-			host = functions.get_content_from_github(path, "data")
+			host = list(functions.get_manifest(path)["datasets"])
 			if "human" in host:
 				host = "human"
 			else:
@@ -2893,16 +2863,14 @@ def define_callbacks(app):
 
 		#open df
 		if expression_dataset in ["human", "mouse"]:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + stringency + "/" + contrast + ".merged_go.tsv")
 		else:
-			go_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
-		go_df = pd.read_csv(go_df, sep = "\t")
+			go_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
 		go_df = go_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 		
 		#concatenate gsea results if the switch is true
 		if boolean_add_gsea_switch:
-			gsea_df = functions.download_from_github(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
-			gsea_df = pd.read_csv(gsea_df, sep = "\t")
+			gsea_df = functions.read_tsv(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv").copy()
 			gsea_df["Genes"] = [gene.replace(";", "; ") for gene in gsea_df["Genes"]]
 			gsea_df = gsea_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 			go_df = pd.concat([go_df, gsea_df])
@@ -3159,10 +3127,8 @@ def define_callbacks(app):
 	)
 	def plot_sankey(tab_value, path):
 		#open dfs
-		df = functions.download_from_github(path, "sankey.tsv")
-		df = pd.read_csv(df, sep = "\t")
-		labels = functions.download_from_github(path, "sankey_dict.tsv")
-		labels = pd.read_csv(labels, sep = "\t")
+		df = functions.read_tsv(path, "sankey.tsv")
+		labels = functions.read_tsv(path, "sankey_dict.tsv")
 		labels = labels.replace("_", " ", regex=True)
 		
 		#create figure
@@ -3201,22 +3167,17 @@ def define_callbacks(app):
 		Input("clustered_heatmap_switch", "value"),
 		Input("comparison_only_heatmap_switch", "value"),
 		Input("best_conditions_heatmap_switch", "value"),
-		Input("hide_unselected_heatmap_switch", "value"),
-		Input("hetamap_height_slider", "value"),
-		Input("hetamap_width_slider", "value"),
+		State("hide_unselected_heatmap_switch", "value"),
 		State("feature_heatmap_dropdown", "value"),
 		State("heatmap_annotation_dropdown", "value"),
 		State("feature_dataset_dropdown", "value"),
 		State("heatmap_graph", "figure"),
 		State("contrast_dropdown", "value"),
-		#resize
-		State("hetamap_height_slider", "max"),
-		State("hetamap_width_slider", "max"),
 		State("analysis_dropdown", "value"),
 		State("label_to_value", "data"),
 		State("color_mapping", "data")
 	)
-	def plot_heatmap(n_clicks, clustered_switch, comparison_only_switch, best_conditions_switch, hide_unselected_switch, height, width, features, annotations, expression_dataset, old_figure, contrast, max_height, width_max, path, label_to_value, color_mapping):
+	def plot_heatmap(n_clicks, clustered_switch, comparison_only_switch, best_conditions_switch, hide_unselected_switch, features, annotations, expression_dataset, old_figure, contrast, path, label_to_value, color_mapping):
 		# jak1 jak2 jak3 stat3 stat4 stat5a stat5b
 
 		#define contexts
@@ -3233,438 +3194,417 @@ def define_callbacks(app):
 		if trigger_id == "contrast_dropdown.value" and boolean_comparison_only_switch is False:
 			raise PreventUpdate
 
-		#resize
-		if trigger_id in ["hetamap_height_slider.value", "hetamap_width_slider.value"]:
-			if height <= max_height and height >= 200 and width <= width_max and width >= 200:
-				old_figure["layout"]["height"] = height
-				old_figure["layout"]["width"] = width
-				height_fig = height
-				width_fig = width
-				if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
-					colorbar_title = "gene expression"
-				else:
-					colorbar_title = expression_dataset.replace("_", " ") + " abundance"
-				if functions.boolean_switch(clustered_switch):
-					clustered_or_sorted = ", hierarchically clustered"
-				else:
-					clustered_or_sorted = ", sorted by condition"
-				
-				config_filename_title = colorbar_title + " heatmap" + clustered_or_sorted
-				fig = old_figure
-				disabled = False
-			else:
-				raise PreventUpdate
-		#plot
+		#coerce features to list
+		if features is None:
+			features = []
+		#annotations will have always condition by default and these will be at the top of the other annotations
+		if annotations == None or annotations == []:
+			annotations = ["condition"]
 		else:
-			#coerce features to list
-			if features is None:
-				features = []
-			#annotations will have always condition by default and these will be at the top of the other annotations
-			if annotations == None or annotations == []:
-				annotations = ["condition"]
+			annotations.insert(0, "condition")
+
+		#plot only if at least 2 features are present
+		if len(features) >= 2:
+			#get log2 counts scaled by feature
+			counts = functions.get_counts(path, expression_dataset, features, layer="zscore")
+			clean_features = {}
+			for feature in features:
+				if "genes" in expression_dataset:
+					feature_gene = feature.split("@")[0]
+					featre_beast = feature.split("@")[1]
+					featre_beast = featre_beast.replace("_", " ")
+					clean_features[feature] = feature_gene + " - " + featre_beast
+				else:
+					clean_features[feature] = feature.replace("€", "/")
+			counts = counts.rename(columns=clean_features)
+			counts = counts.replace("_", " ", regex=True)
+			counts = counts.set_index("sample")
+
+			#open metadata
+			analysis_metadata = functions.get_analysis_metadata(path)
+			#remove samples for which we don't have counts
+			samples_with_counts = analysis_metadata.get_sample_mask(counts.index)
+			metadata = analysis_metadata.get_metadata(samples_with_counts).set_index("sample")
+			metadata_with_NA = analysis_metadata.get_metadata(samples_with_counts, with_NA=True).set_index("sample")
+			
+			#get repo
+			repo = functions.get_repo_name_from_path(path, repos)
+
+			#by default all conditions are visible
+			if config["repos"][repo]["sorted_conditions"]:
+				conditions = analysis_metadata.conditions.copy()
 			else:
-				annotations.insert(0, "condition")
-
-			#plot only if at least 2 features are present
-			if len(features) >= 2:
-				#get counts dfs
-				counts_df_list = []
-				for feature in features:
-					df = functions.download_from_github(path, "data/" + expression_dataset + "/counts/" + feature + ".tsv")
-					df = pd.read_csv(df, sep = "\t")
-					if "genes" in expression_dataset:
-						feature_gene = feature.split("@")[0]
-						featre_beast = feature.split("@")[1]
-						featre_beast = featre_beast.replace("_", " ")
-						feature = feature_gene + " - " + featre_beast
-					else:
-						feature = feature.replace("€", "/")
-					df = df.rename(columns={"counts": feature})
-					df = df[["sample", feature]]
-					counts_df_list.append(df)
-				
-				#merge all counts
-				counts = reduce(lambda x, y: pd.merge(x, y, on = "sample"), counts_df_list)
-				counts = counts.replace("_", " ", regex=True)
-				counts = counts.set_index("sample")
-				#log 2 and row scaling
-				counts = np.log2(counts)
-				counts = counts.replace(to_replace = -np.inf, value = 0)
-				counts = pd.DataFrame(scale(counts), index=counts.index, columns=counts.columns)
+				conditions = metadata["condition"].unique().tolist()
+				conditions.sort()
 
-				#open metadata
-				metadata = functions.download_from_github(path, "metadata.tsv")
-				metadata = pd.read_csv(metadata, sep="\t")
-				metadata = metadata.replace("_", " ", regex=True)
-				#remove samples for which we don't have counts
-				metadata = metadata[metadata["sample"].isin(counts.index)]
-				metadata = metadata.set_index("sample")
-				metadata_with_NA = metadata.fillna("NA")
-				
-				#get repo
-				repo = functions.get_repo_name_from_path(path, repos)
+			#comparison only and best conditions switches are mutually exclusive
+			if trigger_id == "comparison_only_heatmap_switch.value" and boolean_best_conditions_switch is True:
+				best_conditions_switch = []
+				boolean_best_conditions_switch = False
+			elif trigger_id == "best_conditions_heatmap_switch.value" and boolean_comparison_only_switch is True:
+				comparison_only_switch = []
+				boolean_comparison_only_switch = False
 
-				#by default all conditions are visible
-				if config["repos"][repo]["sorted_conditions"]:
-					sorted_conditions = config["repos"][repo]["condition_list"]
-					conditions = [condition.replace("_", " ") for condition in sorted_conditions]
+			#parse old figure if present to get conditions to plot
+			if old_figure is None or len(old_figure["data"]) == 0 or trigger_id in ["comparison_only_heatmap_switch.value", "best_conditions_heatmap_switch.value"]:
+				if boolean_comparison_only_switch:
+					contrast = contrast.replace("_", " ")
+					conditions_to_keep = contrast.split("-vs-")
+				elif boolean_best_conditions_switch:
+					best_contrasts = config["repos"][repo]["best_comparisons"]
+					conditions_to_keep = []
+					for best_contrast in best_contrasts:
+						best_contrast = best_contrast.replace("_", " ")
+						best_conditions_in_best_contrast = best_contrast.split("-vs-")
+						for best_condition in best_conditions_in_best_contrast:
+							if best_condition not in conditions_to_keep:
+								conditions_to_keep.append(best_condition)
 				else:
-					conditions = metadata["condition"].unique().tolist()
-					conditions.sort()
+					conditions_to_keep = conditions
+			else:
+				#filter samples according to legend status or swithces
+				conditions_to_keep = []
 
-				#comparison only and best conditions switches are mutually exclusive
-				if trigger_id == "comparison_only_heatmap_switch.value" and boolean_best_conditions_switch is True:
-					best_conditions_switch = []
-					boolean_best_conditions_switch = False
-				elif trigger_id == "best_conditions_heatmap_switch.value" and boolean_comparison_only_switch is True:
-					comparison_only_switch = []
-					boolean_comparison_only_switch = False
+				#find out if some conditions have to be removed
+				for trace in old_figure["data"]:
+					#only traces with a name are legend traces
+					if "name" in trace.keys():
+						if trace["visible"] is True:
+							conditions_to_keep.append(trace["name"])
 
-				#parse old figure if present to get conditions to plot
-				if old_figure is None or len(old_figure["data"]) == 0 or trigger_id in ["comparison_only_heatmap_switch.value", "best_conditions_heatmap_switch.value"]:
-					if boolean_comparison_only_switch:
-						contrast = contrast.replace("_", " ")
-						conditions_to_keep = contrast.split("-vs-")
-					elif boolean_best_conditions_switch:
-						best_contrasts = config["repos"][repo]["best_comparisons"]
-						conditions_to_keep = []
-						for best_contrast in best_contrasts:
-							best_contrast = best_contrast.replace("_", " ")
-							best_conditions_in_best_contrast = best_contrast.split("-vs-")
-							for best_condition in best_conditions_in_best_contrast:
-								if best_condition not in conditions_to_keep:
-									conditions_to_keep.append(best_condition)
-					else:
-						conditions_to_keep = conditions
-				else:
-					#filter samples according to legend status or swithces
-					conditions_to_keep = []
+				#deactivate comparison switch if the elements are different
+				if boolean_comparison_only_switch:
+					contrast = contrast.replace("_", " ")
+					comparison_only_conditions = contrast.split("-vs-")
+					
+					#sort and compare the lists
+					conditions_to_keep.sort()
+					comparison_only_conditions.sort()
+					if conditions_to_keep != comparison_only_conditions:
+						boolean_comparison_only_switch = False
+						comparison_only_switch = []
+
+				#deactivate best conditions switch if the elements are different
+				elif boolean_best_conditions_switch:
+					best_contrasts = config["repos"][repo]["best_comparisons"]
+					best_conditions = []
+					for best_contrast in best_contrasts:
+						best_contrast = best_contrast.replace("_", " ")
+						best_conditions_in_best_contrast = best_contrast.split("-vs-")
+						for best_condition in best_conditions_in_best_contrast:
+							if best_condition not in best_conditions:
+								best_conditions.append(best_condition)
+					conditions_to_keep.sort()
+					best_conditions.sort()
 
-					#find out if some conditions have to be removed
-					for trace in old_figure["data"]:
-						#only traces with a name are legend traces
-						if "name" in trace.keys():
-							if trace["visible"] is True:
-								conditions_to_keep.append(trace["name"])
+					#sort and compare the lists
+					if conditions_to_keep != best_conditions:
+						boolean_best_conditions_switch = False
+						best_conditions_switch = []
 
-					#deactivate comparison switch if the elements are different
-					if boolean_comparison_only_switch:
-						contrast = contrast.replace("_", " ")
-						comparison_only_conditions = contrast.split("-vs-")
-						
-						#sort and compare the lists
-						conditions_to_keep.sort()
-						comparison_only_conditions.sort()
-						if conditions_to_keep != comparison_only_conditions:
-							boolean_comparison_only_switch = False
-							comparison_only_switch = []
-
-					#deactivate best conditions switch if the elements are different
-					elif boolean_best_conditions_switch:
-						best_contrasts = config["repos"][repo]["best_comparisons"]
-						best_conditions = []
-						for best_contrast in best_contrasts:
-							best_contrast = best_contrast.replace("_", " ")
-							best_conditions_in_best_contrast = best_contrast.split("-vs-")
-							for best_condition in best_conditions_in_best_contrast:
-								if best_condition not in best_conditions:
-									best_conditions.append(best_condition)
-						conditions_to_keep.sort()
-						best_conditions.sort()
-
-						#sort and compare the lists
-						if conditions_to_keep != best_conditions:
-							boolean_best_conditions_switch = False
-							best_conditions_switch = []
-
-				#filter metadata and get remaining samples
-				metadata = metadata[metadata["condition"].isin(conditions_to_keep)]
-				samples_to_keep = metadata.index.tolist()
-				#filter counts for these samples
-				counts = counts[counts.index.isin(samples_to_keep)]
-
-				#create df with features as columns
-				feature_df = counts
-				#create df with samples as columns
-				sample_df = counts.T
-
-				#get a list of features and samples
-				features = list(sample_df.index)
-				samples = list(sample_df.columns)
-
-				#dendrogram colors
-				blacks = ["#676969", "#676969", "#676969", "#676969", "#676969", "#676969", "#676969", "#676969"]
-
-				#the number of yaxis will be the number of annotations + 2 (main heatmap and dendrogram), keep track of the number of annotations
-				number_of_annotations = len(annotations)
-
-				#setup figure
-				fig = go.Figure()
+			#filter metadata and get remaining samples
+			metadata = metadata[metadata["condition"].isin(conditions_to_keep)]
+			samples_to_keep = metadata.index.tolist()
+			#filter counts for these samples
+			counts = counts[counts.index.isin(samples_to_keep)]
 
-				#top dendrogram (samples) only if switch is true
-				if boolean_clustering_switch:
-					dendro_top = ff.create_dendrogram(feature_df, orientation="bottom", labels=samples, colorscale=blacks)
-					#set as the last yaxis
-					dendro_top.update_traces(yaxis="y" + str(number_of_annotations + 2), showlegend=False)
-					
-					#save top dendro yaxis
-					top_dendro_yaxis = "yaxis" + str(number_of_annotations + 2)
-					
-					#add top dendrogram traces to figure
-					for trace in dendro_top["data"]:
-						fig.add_trace(trace)
-					
-					#get clustered samples
-					clustered_samples = dendro_top["layout"]["xaxis"]["ticktext"]
-				#sort samples by condition
-				else:
-					#custom sorting
-					if config["repos"][repo]["sorted_conditions"]:
-						df_slices = []
-						for condition in conditions:
-							df_slice = metadata[metadata["condition"] == condition]
-							df_slices.append(df_slice)
-						metadata = pd.concat(df_slices)
-					#alphabetical sort
-					else:
-						metadata = metadata.sort_values(by=["condition"])
-					clustered_samples = metadata.index.tolist()
-
-				#right dengrogram (features)
-				dendro_side = ff.create_dendrogram(sample_df.values, orientation="left", labels=features, colorscale=blacks)
-				#set as xaxis2
-				dendro_side.update_traces(xaxis="x2", showlegend=False)
-				#add right dendrogram data to figure
-				for data in dendro_side["data"]:
-					fig.add_trace(data)
-
-				#add annotations
-				y_axis_number = 2
-				all_annotations_yaxis = []
-				for annotation in annotations:
-					
-					#y axis for condition annotation
-					if annotation == "condition":
-						#condition must be the annotation closer to the dendrogram
-						current_y_axis_number = number_of_annotations + 1
-						
-						#save the yaxis for condition annotation
-						condition_annotation_yaxis = "yaxis" + str(current_y_axis_number)
+			#create df with features as columns
+			feature_df = counts
+			#create df with samples as columns
+			sample_df = counts.T
 
-						#get elements with clustered order
-						clustered_features = dendro_side["layout"]["yaxis"]["ticktext"]
-					#y axis for any other annotation
-					else:
-						current_y_axis_number = y_axis_number
-						#save all additional annotation yaxis in a list
-						all_annotations_yaxis.append("yaxis" + str(current_y_axis_number))
+			#dendrogram color
+			dendrogram_color = "#676969"
 
-					#get clustered annotation
-					clustered_annotations = []
-					for sample in clustered_samples:
-						clustered_annotations.append(metadata_with_NA.loc[sample, annotation])
-					
-					#discrete annotation
-					if str(metadata.dtypes[annotation]) == "object":
-						hovertemplate = "{annotation}: ".format(annotation=annotation.capitalize()) + "%{customdata}<Br>Sample: %{x}<extra></extra>"
-						if annotation == "condition" and config["repos"][repo]["sorted_conditions"]:
-							values_for_discrete_color_mapping = conditions
-						else:
-							values_for_discrete_color_mapping = metadata_with_NA[annotation].unique().tolist()
-							values_for_discrete_color_mapping.sort()
+			#the number of yaxis will be the number of annotations + 2 (main heatmap and dendrogram), keep track of the number of annotations
+			number_of_annotations = len(annotations)
 
-						#color mapping
-						annotation_colors = []
-						#link between condition and number for discrete color mapping
-						annotation_number_mapping = {}
-						i = 0
-						for value in values_for_discrete_color_mapping:
-							#give a number to the condition
-							annotation_number_mapping[value] = i
-							#map a color to this number
-							annotation_colors.append(functions.get_color(color_mapping, annotation, value))
-							#increase incrementals
-							i += 1
-
-						#translate clustered conditions in numbers
-						z = []
-						for value in clustered_annotations:
-							z.append(annotation_number_mapping[value])
-						zmin = 0
-						zmax = i-1
-						if zmax == 0:
-							zmax = 1
-							annotation_colors = annotation_colors + annotation_colors
-					#continuous annotation
-					else:
-						hovertemplate = "{annotation}: ".format(annotation=annotation.capitalize()) + "%{z}<Br>Sample: %{x}<extra></extra>"
-						annotation_colors = ["#FFFFFF", functions.get_color(color_mapping, annotation, "continuous")]
-						z = []
-						for sample in clustered_samples:
-							z.append(metadata.loc[sample, annotation])
-						zmin = min(z)
-						zmax = max(z)
-
-					#create annotation heatmap
-					annotation_heatmap = go.Heatmap(z=[z], x=clustered_samples, y=[label_to_value[annotation]], colorscale=annotation_colors, customdata=[clustered_annotations], showscale=False, hovertemplate=hovertemplate, hoverlabel_bgcolor="lightgrey", zmin=zmin, zmax=zmax)
-					if boolean_clustering_switch:
-						annotation_heatmap["x"] = dendro_top["layout"]["xaxis"]["tickvals"]
-						
-					annotation_heatmap["yaxis"] = "y" + str(current_y_axis_number)
-					fig.add_trace(annotation_heatmap)
+			#setup figure
+			fig = go.Figure()
 
-					# increase count only when not condition
-					if annotation != "condition":
-						y_axis_number += 1
+			#top dendrogram (samples) only if switch is true
+			if boolean_clustering_switch:
+				dendro_top = functions.get_dendrogram(path, expression_dataset, "zscore", feature_df)
 				
-				#reorder sample df with clustered items
-				heat_data = sample_df
-				heat_data = heat_data.reindex(columns=clustered_samples)
-				heat_data = heat_data.reindex(index=clustered_features)
-
-				#dataset specific variables
-				if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
-					feature = "Gene"
-					colorbar_title = "gene expression"
-					space_for_legend = 80
+				#save top dendro yaxis
+				top_dendro_yaxis = "yaxis" + str(number_of_annotations + 2)
+				
+				#add top dendrogram traces to figure, set as the last yaxis
+				fig.add_traces(dendro_top.get_traces("bottom", dendrogram_color, "x", "y" + str(number_of_annotations + 2)))
+				
+				#get clustered samples
+				clustered_samples = dendro_top.labels
+				clustered_samples_tickvals = dendro_top.get_tickvals("bottom")
+			#sort samples by condition
+			else:
+				#custom sorting
+				if config["repos"][repo]["sorted_conditions"]:
+					df_slices = []
+					for condition in conditions:
+						df_slice = metadata[metadata["condition"] == condition]
+						df_slices.append(df_slice)
+					metadata = pd.concat(df_slices)
+				#alphabetical sort
+				else:
+					metadata = metadata.sort_values(by=["condition"])
+				clustered_samples = metadata.index.tolist()
+
+			#large feature sets are not clustered, they are drawn without the features dendrogram and with their rows averaged in bins
+			large_heatmap = len(sample_df) > config["heatmap_max_rows"]
+			if large_heatmap:
+				clustered_features = functions.get_principal_component_order(sample_df)
+			#right dengrogram (features)
+			else:
+				dendro_side = functions.get_dendrogram(path, expression_dataset, "zscore", sample_df)
+				clustered_features = dendro_side.labels
+				clustered_features_tickvals = dendro_side.get_tickvals("left")
+				#add right dendrogram data to figure, set as xaxis2
+				fig.add_traces(dendro_side.get_traces("left", dendrogram_color, "x2", "y"))
+
+			#add annotations
+			y_axis_number = 2
+			all_annotations_yaxis = []
+			for annotation in annotations:
+				
+				#y axis for condition annotation
+				if annotation == "condition":
+					#condition must be the annotation closer to the dendrogram
+					current_y_axis_number = number_of_annotations + 1
+					
+					#save the yaxis for condition annotation
+					condition_annotation_yaxis = "yaxis" + str(current_y_axis_number)
+				#y axis for any other annotation
 				else:
-					feature = expression_dataset.replace("_", " ").capitalize()
-					colorbar_title = expression_dataset.replace("_", " ") + " abundance"
-					space_for_legend = 200
+					current_y_axis_number = y_axis_number
+					#save all additional annotation yaxis in a list
+					all_annotations_yaxis.append("yaxis" + str(current_y_axis_number))
+
+				#get clustered annotation
+				clustered_annotations = []
+				for sample in clustered_samples:
+					clustered_annotations.append(metadata_with_NA.loc[sample, annotation])
+				
+				#discrete annotation
+				if str(metadata.dtypes[annotation]) == "object":
+					hovertemplate = "{annotation}: ".format(annotation=annotation.capitalize()) + "%{customdata}<Br>Sample: %{x}<extra></extra>"
+					if annotation == "condition" and config["repos"][repo]["sorted_conditions"]:
+						values_for_discrete_color_mapping = conditions
+					else:
+						values_for_discrete_color_mapping = metadata_with_NA[annotation].unique().tolist()
+						values_for_discrete_color_mapping.sort()
 
-				#create main heatmap
-				heatmap = go.Heatmap(x=clustered_samples, y=clustered_features, z=heat_data, colorscale="Reds", hovertemplate="Sample: %{{x}}<br>{feature}: %{{y}}<extra></extra>".format(feature=feature), hoverlabel_bgcolor="lightgrey", colorbar_title="Row scaled " + colorbar_title, colorbar_title_side="right", colorbar_title_font_family="Arial", colorbar_thicknessmode="pixels", colorbar_thickness=20, colorbar_lenmode="pixels", colorbar_len=100)
-				if boolean_clustering_switch:
-					heatmap["x"] = dendro_top["layout"]["xaxis"]["tickvals"]
-				heatmap["y"] = dendro_side["layout"]["yaxis"]["tickvals"]
-				heatmap["yaxis"] = "y"
-				fig.add_trace(heatmap)
+					#color mapping
+					annotation_colors = []
+					#link between condition and number for discrete color mapping
+					annotation_number_mapping = {}
+					i = 0
+					for value in values_for_discrete_color_mapping:
+						#give a number to the condition
+						annotation_number_mapping[value] = i
+						#map a color to this number
+						annotation_colors.append(functions.get_color(color_mapping, annotation, value))
+						#increase incrementals
+						i += 1
+
+					#translate clustered conditions in numbers
+					z = []
+					for value in clustered_annotations:
+						z.append(annotation_number_mapping[value])
+					zmin = 0
+					zmax = i-1
+					if zmax == 0:
+						zmax = 1
+						annotation_colors = annotation_colors + annotation_colors
+				#continuous annotation
+				else:
+					hovertemplate = "{annotation}: ".format(annotation=annotation.capitalize()) + "%{z}<Br>Sample: %{x}<extra></extra>"
+					annotation_colors = ["#FFFFFF", functions.get_color(color_mapping, annotation, "continuous")]
+					z = []
+					for sample in clustered_samples:
+						z.append(metadata.loc[sample, annotation])
+					zmin = min(z)
+					zmax = max(z)
 
-				##update layout
+				#create annotation heatmap
+				annotation_heatmap = go.Heatmap(z=[z], x=clustered_samples, y=[label_to_value[annotation]], colorscale=annotation_colors, customdata=[clustered_annotations], showscale=False, hovertemplate=hovertemplate, hoverlabel_bgcolor="lightgrey", zmin=zmin, zmax=zmax)
 				if boolean_clustering_switch:
-					dendro_top_height = 75
-				else:
-					dendro_top_height = 0
-
-				#the height and the width will be adaptive to features and samples
-				heigth_multiplier = 30
-				width_multiplier = 30
-				height_fig = heigth_multiplier*len(clustered_features) + heigth_multiplier*number_of_annotations + dendro_top_height + 50
-				if height_fig < 245:
-					height_fig = 245
-				width_fig = width_multiplier*len(clustered_samples) + 75 + space_for_legend
-
-				#max height
-				max_height = dendro_top_height + 50*30 + heigth_multiplier*number_of_annotations + 50
-				if height_fig > max_height:
-					height_fig = max_height
-					max_height_flag = True
-				else:
-					max_height_flag = False
-				#max width
-				if width_fig > 885:
-					width_fig = 885
+					annotation_heatmap["x"] = clustered_samples_tickvals
+					
+				annotation_heatmap["yaxis"] = "y" + str(current_y_axis_number)
+				fig.add_trace(annotation_heatmap)
 
-				### xaxis ###
-				dendro_x_left_domain = 0.95 - (75/width_fig)
-				#xaxis (x heatmap)
-				fig.update_layout(xaxis={"domain": [0, dendro_x_left_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "ticks":""})
-				#xaxis2 (x dendrogram side)
-				fig.update_layout(xaxis2={"domain": [dendro_x_left_domain, 0.95], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": False, "ticks":""})
+				# increase count only when not condition
+				if annotation != "condition":
+					y_axis_number += 1
+			
+			#reorder sample df with clustered items
+			heat_data = sample_df
+			heat_data = heat_data.reindex(columns=clustered_samples)
+			heat_data = heat_data.reindex(index=clustered_features)
+			if large_heatmap:
+				heat_data = functions.bin_heatmap_rows(heat_data, config["heatmap_max_rows"])
+			#values are only shown as colors, 2 decimals keep the figure small
+			heat_data = heat_data.round(2)
+
+			#dataset specific variables
+			if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
+				feature = "Gene"
+				colorbar_title = "gene expression"
+				space_for_legend = 80
+			else:
+				feature = expression_dataset.replace("_", " ").capitalize()
+				colorbar_title = expression_dataset.replace("_", " ") + " abundance"
+				space_for_legend = 200
+
+			#create main heatmap
+			heatmap = go.Heatmap(x=clustered_samples, y=clustered_features, z=heat_data, colorscale="Reds", hovertemplate="Sample: %{{x}}<br>{feature}: %{{y}}<extra></extra>".format(feature=feature), hoverlabel_bgcolor="lightgrey", colorbar_title="Row scaled " + colorbar_title, colorbar_title_side="right", colorbar_title_font_family="Arial", colorbar_thicknessmode="pixels", colorbar_thickness=20, colorbar_lenmode="pixels", colorbar_len=100)
+			if boolean_clustering_switch:
+				heatmap["x"] = clustered_samples_tickvals
+			#bins are categories, the first one at the top
+			if large_heatmap:
+				heatmap["y"] = heat_data.index[::-1].tolist()
+				heatmap["z"] = heat_data.values[::-1]
+			else:
+				heatmap["y"] = clustered_features_tickvals
+			heatmap["yaxis"] = "y"
+			fig.add_trace(heatmap)
 
-				### yaxis ###
+			##update layout
+			if boolean_clustering_switch:
+				dendro_top_height = 75
+			else:
+				dendro_top_height = 0
+
+			#the height and the width will be adaptive to features and samples
+			heigth_multiplier = 30
+			width_multiplier = 30
+			height_fig = heigth_multiplier*len(clustered_features) + heigth_multiplier*number_of_annotations + dendro_top_height + 50
+			if height_fig < 245:
+				height_fig = 245
+			width_fig = width_multiplier*len(clustered_samples) + 75 + space_for_legend
+
+			#max height
+			max_height = dendro_top_height + 50*30 + heigth_multiplier*number_of_annotations + 50
+			if height_fig > max_height:
+				height_fig = max_height
+				max_height_flag = True
+			else:
+				max_height_flag = False
+			#max width
+			if width_fig > 885:
+				width_fig = 885
 
-				#the last yaxis is the dendrogram
-				if boolean_clustering_switch:
-					bottom_dendro_domain = 0.95-(dendro_top_height/height_fig)
-					fig["layout"][top_dendro_yaxis] = {"domain":[bottom_dendro_domain, 0.95], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": False, "ticks":""}
-					top_condition_annotation_domain = bottom_dendro_domain
-					bot_condition_annotation_domain = 0.95-((dendro_top_height + heigth_multiplier)/height_fig)
-				#the last yaxis is the condition annotation
-				else:
-					top_condition_annotation_domain = 0.95
-					bot_condition_annotation_domain = 0.95-(heigth_multiplier/height_fig)
-				#update domain for condition annotation yaxis
-				fig["layout"][condition_annotation_yaxis] = {"domain":[bot_condition_annotation_domain, top_condition_annotation_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks":""}
-
-				#additional annotations
-				if len(all_annotations_yaxis) > 0:
-					additional_annotation_area = heigth_multiplier/height_fig
-					#start from the top annotation
-					all_annotations_yaxis.reverse()
-					#at the beginning use condition annotation domain as starting point
-					annotation_top_domain = bot_condition_annotation_domain
-					annotation_bot_domain = bot_condition_annotation_domain - additional_annotation_area
-					#add additional annotations
-					for annotation_yaxis in all_annotations_yaxis:
-						fig["layout"][annotation_yaxis] = {"domain":[annotation_bot_domain, annotation_top_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks":""}
-						#reassign domain for next yaxis
-						annotation_top_domain = annotation_bot_domain
-						annotation_bot_domain = annotation_bot_domain - additional_annotation_area
-					annotation_bot_domain += additional_annotation_area
-				#start heatmap from condition annotation domain
-				else:
-					annotation_bot_domain = bot_condition_annotation_domain
+			### xaxis ###
+			dendro_x_left_domain = 0.95 - (75/width_fig)
+			#xaxis (x heatmap)
+			fig.update_layout(xaxis={"domain": [0, dendro_x_left_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "ticks":""})
+			#xaxis2 (x dendrogram side)
+			fig.update_layout(xaxis2={"domain": [dendro_x_left_domain, 0.95], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": False, "ticks":""})
+
+			### yaxis ###
+
+			#the last yaxis is the dendrogram
+			if boolean_clustering_switch:
+				bottom_dendro_domain = 0.95-(dendro_top_height/height_fig)
+				fig["layout"][top_dendro_yaxis] = {"domain":[bottom_dendro_domain, 0.95], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": False, "ticks":""}
+				top_condition_annotation_domain = bottom_dendro_domain
+				bot_condition_annotation_domain = 0.95-((dendro_top_height + heigth_multiplier)/height_fig)
+			#the last yaxis is the condition annotation
+			else:
+				top_condition_annotation_domain = 0.95
+				bot_condition_annotation_domain = 0.95-(heigth_multiplier/height_fig)
+			#update domain for condition annotation yaxis
+			fig["layout"][condition_annotation_yaxis] = {"domain":[bot_condition_annotation_domain, top_condition_annotation_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks":""}
+
+			#additional annotations
+			if len(all_annotations_yaxis) > 0:
+				additional_annotation_area = heigth_multiplier/height_fig
+				#start from the top annotation
+				all_annotations_yaxis.reverse()
+				#at the beginning use condition annotation domain as starting point
+				annotation_top_domain = bot_condition_annotation_domain
+				annotation_bot_domain = bot_condition_annotation_domain - additional_annotation_area
+				#add additional annotations
+				for annotation_yaxis in all_annotations_yaxis:
+					fig["layout"][annotation_yaxis] = {"domain":[annotation_bot_domain, annotation_top_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks":""}
+					#reassign domain for next yaxis
+					annotation_top_domain = annotation_bot_domain
+					annotation_bot_domain = annotation_bot_domain - additional_annotation_area
+				annotation_bot_domain += additional_annotation_area
+			#start heatmap from condition annotation domain
+			else:
+				annotation_bot_domain = bot_condition_annotation_domain
 
-				#main heatmap yaxis
-				fig.update_layout(yaxis={"domain": [0, annotation_bot_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks": ""})
-				
-				if max_height_flag:
-					fig["layout"]["yaxis"]["showticklabels"] = False
-				#add feature labels
-				fig["layout"]["yaxis"]["tickvals"] = dendro_side["layout"]["yaxis"]["tickvals"]
+			#main heatmap yaxis
+			fig.update_layout(yaxis={"domain": [0, annotation_bot_domain], "mirror": False, "showgrid": False, "showline": False, "zeroline": False, "showticklabels": True, "ticks": ""})
+			
+			if max_height_flag or large_heatmap:
+				fig["layout"]["yaxis"]["showticklabels"] = False
+			#add feature labels
+			if large_heatmap is False:
+				fig["layout"]["yaxis"]["tickvals"] = clustered_features_tickvals
 				fig["layout"]["yaxis"]["ticktext"] = [clustered_feature.replace("_", " ").replace("[", "").replace("]", "") for clustered_feature in clustered_features]
-				#add sample labels and define title
-				if boolean_clustering_switch:
-					fig["layout"]["xaxis"]["tickvals"] = dendro_top["layout"]["xaxis"]["tickvals"]
-					clustered_or_sorted = ", hierarchically clustered"
-				else:
-					clustered_or_sorted = ", sorted by condition"
-				fig["layout"]["xaxis"]["ticktext"] = clustered_samples
-				fig["layout"]["xaxis"]["showticklabels"] = False
-
-				#legend click behaviour
-				if boolean_hide_unselected_switch:
-					legend_itemclick = False
-					legend_itemdoubleclick = False
+			#add sample labels and define title
+			if boolean_clustering_switch:
+				fig["layout"]["xaxis"]["tickvals"] = clustered_samples_tickvals
+				clustered_or_sorted = ", hierarchically clustered"
+			else:
+				clustered_or_sorted = ", sorted by condition"
+			fig["layout"]["xaxis"]["ticktext"] = clustered_samples
+			fig["layout"]["xaxis"]["showticklabels"] = False
+
+			#legend click behaviour
+			if boolean_hide_unselected_switch:
+				legend_itemclick = False
+				legend_itemdoubleclick = False
+			else:
+				legend_itemclick = "toggle"
+				legend_itemdoubleclick = "toggleothers"
+			#add traces for legend
+			for condition in conditions:
+				if condition in conditions_to_keep:
+					visible = True
 				else:
-					legend_itemclick = "toggle"
-					legend_itemdoubleclick = "toggleothers"
-				#add traces for legend
-				for condition in conditions:
-					if condition in conditions_to_keep:
-						visible = True
+					if boolean_hide_unselected_switch:
+						visible = False
 					else:
-						if boolean_hide_unselected_switch:
-							visible = False
-						else:
-							visible = "legendonly"
-					fig.add_trace(go.Scatter(x=[None], y=[None], marker_color=functions.get_color(color_mapping, "condition", condition), marker_size=8, mode="markers", showlegend=True, name=condition, visible=visible))
+						visible = "legendonly"
+				fig.add_trace(go.Scatter(x=[None], y=[None], marker_color=functions.get_color(color_mapping, "condition", condition), marker_size=8, mode="markers", showlegend=True, name=condition, visible=visible))
 
-				#update layout
-				fig.update_layout(title_text=colorbar_title.capitalize() + " heatmap" + clustered_or_sorted, title_font_family="arial", title_font_size=14, title_x=0.5, title_y = 0.98, plot_bgcolor="rgba(0,0,0,0)", legend_title="Condition", legend_title_side="top", legend_orientation="h", legend_tracegroupgap=0.05, margin_t=30, margin_b=0, margin_l=0, margin_r=0, legend_x=0, legend_y=0, legend_yanchor="top", legend_xanchor="left", legend_itemclick=legend_itemclick, legend_itemdoubleclick=legend_itemdoubleclick, width=width_fig, height=height_fig)
-				
-				config_filename_title = colorbar_title + " heatmap" + clustered_or_sorted
-				disabled = False
-				max_height = height_fig + 200
-				
-				fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
-				fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
-				fig["layout"]["legend_bgcolor"] = "rgba(0,0,0,0)"
-			else:
-				fig = go.Figure()
-				fig.add_annotation(text="Please select at least two features to plot the heatmap.", showarrow=False)
-				width_fig = 885
-				height_fig = 450
-				max_height = height_fig
-				config_filename_title = "empty_heatmap"
-				fig.update_layout(xaxis_linecolor="rgb(255,255,255)", yaxis_linecolor="rgb(255,255,255)", xaxis_showticklabels=False, yaxis_showticklabels=False, xaxis_fixedrange=True, yaxis_fixedrange=True, xaxis_ticks="", yaxis_ticks="")
-				disabled = True
+			#update layout
+			fig.update_layout(title_text=colorbar_title.capitalize() + " heatmap" + clustered_or_sorted, title_font_family="arial", title_font_size=14, title_x=0.5, title_y = 0.98, plot_bgcolor="rgba(0,0,0,0)", legend_title="Condition", legend_title_side="top", legend_orientation="h", legend_tracegroupgap=0.05, margin_t=30, margin_b=0, margin_l=0, margin_r=0, legend_x=0, legend_y=0, legend_yanchor="top", legend_xanchor="left", legend_itemclick=legend_itemclick, legend_itemdoubleclick=legend_itemdoubleclick, width=width_fig, height=height_fig)
+			
+			config_filename_title = colorbar_title + " heatmap" + clustered_or_sorted
+			disabled = False
+			max_height = height_fig + 200
+			
+			fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
+			fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
+			fig["layout"]["legend_bgcolor"] = "rgba(0,0,0,0)"
+		else:
+			fig = go.Figure()
+			fig.add_annotation(text="Please select at least two features to plot the heatmap.", showarrow=False)
+			width_fig = 885
+			height_fig = 450
+			max_height = height_fig
+			config_filename_title = "empty_heatmap"
+			fig.update_layout(xaxis_linecolor="rgb(255,255,255)", yaxis_linecolor="rgb(255,255,255)", xaxis_showticklabels=False, yaxis_showticklabels=False, xaxis_fixedrange=True, yaxis_fixedrange=True, xaxis_ticks="", yaxis_ticks="")
+			disabled = True
 
-		config_fig = {"doubleClickDelay": 1000, "modeBarButtonsToRemove": ["select2d", "lasso2d", "hoverClosestCartesian", "hoverCompareCartesian", "resetScale2d", "toggleSpikelines"], "toImageButtonOptions": {"format": "png", "width": width_fig, "height": height_fig, "scale": 5, "filename": config_filename_title}, "edits": {"colorbarPosition": True, "legendPosition": True, "titleText": True}}
+		config_fig = {"doubleClickDelay": 1000, "modeBarButtonsToRemove": ["select2d", "lasso2d", "hoverClosestCartesian", "hoverCompareCartesian", "resetScale2d", "toggleSpikelines"], "toImageButtonOptions": {"format": "png", "scale": 5, "filename": config_filename_title}, "edits": {"colorbarPosition": True, "legendPosition": True, "titleText": True}}
 
 		return fig, config_fig, height_fig, max_height, width_fig, disabled, disabled, comparison_only_switch, best_conditions_switch
 
+	#hide unselected conditions and resize the heatmap in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="update_figure"),
+		Output("heatmap_figure_update", "data"),
+		Input("hide_unselected_heatmap_switch", "value"),
+		Input("hetamap_width_slider", "value"),
+		Input("hetamap_height_slider", "value"),
+		State("heatmap_graph", "id")
+	)
+
 	#heatmap annotation legend
 	@app.callback(
 		Output("heatmap_legend_div", "children"),
@@ -3685,9 +3625,7 @@ def define_callbacks(app):
 		else:
 			hidden = False
 			#open metadata
-			metadata = functions.download_from_github(path, "metadata.tsv")
-			metadata = pd.read_csv(metadata, sep="\t")
-			metadata = metadata.replace("_", " ", regex=True)
+			analysis_metadata = functions.get_analysis_metadata(path)
 
 			#filter metadata for selected conditions in the heatmap condition legend
 			if len(heatmap_fig["data"]) > 0:
@@ -3698,10 +3636,13 @@ def define_callbacks(app):
 						if trace["visible"] is True:
 							conditions_to_keep.append(trace["name"])
 				#filter
-				metadata = metadata[metadata["condition"].isin(conditions_to_keep)]
+				mask = analysis_metadata.get_condition_mask(conditions_to_keep)
+			else:
+				mask = None
+			metadata = analysis_metadata.get_metadata(mask)
 
 			#create metadata with NA strings
-			metadata_with_NA = metadata.fillna("NA")
+			metadata_with_NA = analysis_metadata.get_metadata(mask, with_NA=True)
 
 			#setup subplots
 			legends_to_plot = len(annotations)
@@ -3871,13 +3812,12 @@ def define_callbacks(app):
 		#swithces
 		Input("comparison_only_multiboxplots_switch", "value"),
 		Input("best_conditions_multiboxplots_switch", "value"),
-		Input("hide_unselected_multiboxplots_switch", "value"),
 		Input("show_as_multiboxplot_switch", "value"),
 		Input("stats_multiboxplots_switch", "value"),
-		#sliders
-		Input("multiboxplots_height_slider", "value"),
-		Input("multiboxplots_width_slider", "value"),
 		## states
+		State("hide_unselected_multiboxplots_switch", "value"),
+		State("multiboxplots_height_slider", "value"),
+		State("multiboxplots_width_slider", "value"),
 		State("contrast_dropdown", "value"),
 		State("feature_multi_boxplots_dropdown", "value"),
 		State("feature_dataset_dropdown", "value"),
@@ -3892,7 +3832,7 @@ def define_callbacks(app):
 		State("stats_multixoplots_table", "data"),
 		State("stats_multixoplots_table", "columns")
 	)
-	def plot_multiboxplots(n_clicks_multiboxplots, legend_click, stringency, x_metadata, group_by_metadata, plot_per_row, selected_x_values, comparison_only_switch, best_conditions_switch, hide_unselected_switch, show_as_boxplot_switch, stats_switch, height, width, contrast, selected_features, expression_dataset, box_fig, config_multi_boxplots, show_stats_switch_options, x_filter_div_hidden, path, color_mapping, stats_div_hidden, style_data_conditional, statistics_table_data, statistics_table_columns):
+	def plot_multiboxplots(n_clicks_multiboxplots, legend_click, stringency, x_metadata, group_by_metadata, plot_per_row, selected_x_values, comparison_only_switch, best_conditions_switch, show_as_boxplot_switch, stats_switch, hide_unselected_switch, height, width, contrast, selected_features, expression_dataset, box_fig, config_multi_boxplots, show_stats_switch_options, x_filter_div_hidden, path, color_mapping, stats_div_hidden, style_data_conditional, statistics_table_data, statistics_table_columns):
 		# MEN1; CIT; NDC80; AURKA; PPP1R12A; XRCC2; ENSA; AKAP8; BUB1B; TADA3; DCTN3; JTB; RECQL5; YEATS4; CDK11B; RRM1; CDC25B; CLIP1; NUP214; CETN2
 		
 		##### FIGURE #####		
@@ -3904,7 +3844,6 @@ def define_callbacks(app):
 		#boolean swithces
 		boolean_comparison_only_switch = functions.boolean_switch(comparison_only_switch)
 		boolean_best_conditions_switch = functions.boolean_switch(best_conditions_switch)
-		boolean_hide_unselected_switch = functions.boolean_switch(hide_unselected_switch)
 		boolean_show_as_boxplot_switch = functions.boolean_switch(show_as_boxplot_switch)
 		boolean_stats_switch = functions.boolean_switch(stats_switch)
 
@@ -3944,16 +3883,10 @@ def define_callbacks(app):
 							trace_visibility[trace["name"]] = trace["visible"]
 				
 				#open metadata
-				metadata_df_full = functions.download_from_github(path, "metadata.tsv")
-				metadata_df_full = pd.read_csv(metadata_df_full, sep = "\t")
-
-				#clean metadata
-				metadata_df_full = metadata_df_full.fillna("NA")
-				metadata_df_full = metadata_df_full.replace("_", " ", regex=True)
+				analysis_metadata = functions.get_analysis_metadata(path)
 				
 				#if there is a change in the plot, hide unselected must be false
 				hide_unselected_switch = []
-				boolean_hide_unselected_switch = False
 
 				#comparison only and best conditions switches are mutually exclusive
 				if trigger_id == "comparison_only_multiboxplots_switch.value" and boolean_best_conditions_switch is True:
@@ -3966,7 +3899,7 @@ def define_callbacks(app):
 				#filter samples for comparison or for best conditions
 				if boolean_comparison_only_switch:
 					contrast = contrast.replace("_", " ")
-					metadata_df_full = metadata_df_full[metadata_df_full["condition"].isin(contrast.split("-vs-"))]
+					metadata_df_full = analysis_metadata.get_metadata(analysis_metadata.get_condition_mask(contrast.split("-vs-")), with_NA=True)
 				elif boolean_best_conditions_switch:
 					repo = functions.get_repo_name_from_path(path, repos)
 					best_contrasts = config["repos"][repo]["best_comparisons"]
@@ -3977,7 +3910,9 @@ def define_callbacks(app):
 						for best_condition in best_conditions_in_best_contrast:
 							if best_condition not in best_conditions:
 								best_conditions.append(best_condition)
-					metadata_df_full = metadata_df_full[metadata_df_full["condition"].isin(best_conditions)]
+					metadata_df_full = analysis_metadata.get_metadata(analysis_metadata.get_condition_mask(best_conditions), with_NA=True)
+				else:
+					metadata_df_full = analysis_metadata.get_metadata(with_NA=True)
 
 				#create figure
 				box_fig = go.Figure()
@@ -4043,15 +3978,14 @@ def define_callbacks(app):
 				working_row = 1
 				working_col = 1
 				showlegend = True
-				for feature in selected_features:
+				#counts of all features downloaded together
+				counts_list = functions.get_counts_many(path, expression_dataset, selected_features, layer="log2")
+				for feature, counts in zip(selected_features, counts_list):
 					#get counts
-					counts = functions.download_from_github(path, "data/" + expression_dataset + "/counts/" + feature + ".tsv")
-					counts = pd.read_csv(counts, sep = "\t")
+					counts = counts.rename(columns={feature: log2_expression_or_abundance})
 					counts = counts.replace("_", " ", regex=True)
-					#merge and compute log2 and replace inf with 0
+					#merge with log2 values
 					metadata_df = metadata_df_full.merge(counts, how="inner", on="sample")
-					metadata_df[log2_expression_or_abundance] = np.log2(metadata_df["counts"])
-					metadata_df[log2_expression_or_abundance].replace(to_replace = -np.inf, value = 0, inplace=True)
 
 					#setup traces
 					if x_metadata == group_by_metadata:
@@ -4061,8 +3995,7 @@ def define_callbacks(app):
 						
 						#user defined list of traces
 						if x_metadata == "condition" and config["repos"][repo]["sorted_conditions"] and boolean_comparison_only_switch is False and boolean_best_conditions_switch is False:
-							metadata_fields_ordered = config["repos"][repo]["condition_list"]
-							metadata_fields_ordered = [condition.replace("_", " ") for condition in metadata_fields_ordered]
+							metadata_fields_ordered = analysis_metadata.conditions.copy()
 						else:
 							metadata_fields_ordered = metadata_df[x_metadata].unique().tolist()
 							metadata_fields_ordered.sort()
@@ -4104,19 +4037,15 @@ def define_callbacks(app):
 						x_values = filtered_metadata[x_metadata]
 						y_values = filtered_metadata[log2_expression_or_abundance]
 
-						#create hovertext
-						filtered_metadata["hovertext"] = ""
-						for column in filtered_metadata.columns:
-							if column not in ["control", "counts", "hovertext", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
-								filtered_metadata["hovertext"] = filtered_metadata["hovertext"] + column.replace("_", " ").capitalize() + ": " + filtered_metadata[column].astype(str) + "<br>"
-						hovertext = filtered_metadata["hovertext"].tolist()
+						#hover data of the samples with their log2 values
+						custom_data, hovertemplate = analysis_metadata.get_hover_data(filtered_metadata["sample"], log2_expression_or_abundance)
 
 						#create traces
 						marker_color = functions.get_color(color_mapping, column_for_filtering, metadata)
 						if boolean_show_as_boxplot_switch:
-							box_fig.add_trace(go.Box(x=x_values, y=y_values, name=metadata, marker_color=marker_color, boxpoints="all", hovertext=hovertext, hoverinfo="text", legendgroup=metadata, showlegend=showlegend, offsetgroup=metadata, marker_size=3, line_width=4, visible=trace_visibility[metadata]), row=working_row, col=working_col)
+							box_fig.add_trace(go.Box(x=x_values, y=y_values, name=metadata, marker_color=marker_color, boxpoints="all", customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", legendgroup=metadata, showlegend=showlegend, offsetgroup=metadata, marker_size=3, line_width=4, visible=trace_visibility[metadata]), row=working_row, col=working_col)
 						else:
-							box_fig.add_trace(go.Violin(x=x_values, y=y_values, name=metadata, marker_color=marker_color, points="all", hovertext=hovertext, hoverinfo="text", legendgroup=metadata, showlegend=showlegend, offsetgroup=metadata, marker_size=3, line_width=4, visible=trace_visibility[metadata], spanmode="hard"), row=working_row, col=working_col)
+							box_fig.add_trace(go.Violin(x=x_values, y=y_values, name=metadata, marker_color=marker_color, points="all", customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", legendgroup=metadata, showlegend=showlegend, offsetgroup=metadata, marker_size=3, line_width=4, visible=trace_visibility[metadata], spanmode="hard"), row=working_row, col=working_col)
 
 					#just one legend for trece showed is enough
 					if showlegend is True:
@@ -4163,48 +4092,18 @@ def define_callbacks(app):
 								conditions.append(trace["name"])
 					
 					#get contrasts which have both conditions in the selected conditions in the plot
-					contrasts_df_list = []
-					dge_folder = "data/" + expression_dataset + "/dge"
-					dge_files = functions.get_content_from_github(path, dge_folder)
-					for dge_file in dge_files:
-						contrast = dge_file.split("/")[-1]
-						contrast = contrast.split(".")[0]
+					dge_index = functions.get_dge_index(path, expression_dataset)
+					contrasts_in_plot = []
+					for contrast in dge_index.contrasts:
 						conditions_in_contrast = contrast.split("-vs-")
 						condition_1 = conditions_in_contrast[0]
 						condition_2 = conditions_in_contrast[1]
 						if condition_1.replace("_", " ") in conditions and condition_2.replace("_", " ") in conditions:
-							dge_table = functions.download_from_github(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv")
-							dge_table = pd.read_csv(dge_table, sep = "\t")
-							dge_table = dge_table.dropna(subset=["Gene"])
-							
-							#since feature names are clean, to filter the dge table we need to clean it
-							if expression_dataset in ["human", "mouse"]:
-								dge_table["clean_feature"] = [x.replace("€", "/") for x in dge_table["Gene"]]
-							else:
-								if "lipid" in expression_dataset:
-									dge_table["clean_feature"] = dge_table["Gene"]
-								elif "genes" in expression_dataset:
-									clean_gen_column_name = []
-									for x in dge_table["Gene"]:
-										gene_x = x.split("@")[0]
-										beast_x = x.split("@")[1]
-										beast_x = beast_x.replace("_", " ")
-										x = gene_x + " - " + beast_x
-										clean_gen_column_name.append(x)
-									dge_table["clean_feature"] = clean_gen_column_name.copy()
-								else:
-									dge_table["clean_feature"] = [x.replace("_", " ").replace("[", "").replace("]", "") for x in dge_table["Gene"]]
-
-							dge_table = dge_table[dge_table["clean_feature"].isin(genes)]
-							dge_table["Comparison"] = contrast.replace("-", " ").replace("_", " ")
-							contrasts_df_list.append(dge_table)
-
-					#concat all dfs
-					if len(contrasts_df_list) > 1:
-						merged_df = pd.concat(contrasts_df_list)
-					#no need to concat
-					elif len(contrasts_df_list) == 1:
-						merged_df = dge_table
+							contrasts_in_plot.append(contrast)
+
+					#rows of the plotted genes, feature names in the index are already clean
+					if len(contrasts_in_plot) > 0:
+						merged_df = dge_index.get_rows(genes, contrasts_in_plot)
 					#no any contrast for the selected conditions: create mock df
 					else:
 						if expression_dataset in ["human", "mouse"]:
@@ -4405,11 +4304,8 @@ def define_callbacks(app):
 					else:
 						box_fig = make_subplots(figure=box_fig, rows=n_rows, cols=plot_per_row, vertical_spacing=(0.2/(n_rows)))
 
-				#resize fig
-				if trigger_id in ["multiboxplots_height_slider.value", "multiboxplots_width_slider.value"]:
-					box_fig.update_layout(height=height, width=width)
 				#transform to boxplots or violins
-				elif trigger_id == "show_as_multiboxplot_switch.value":
+				if trigger_id == "show_as_multiboxplot_switch.value":
 					new_traces = {}
 					for trace in box_fig["data"]:
 						y_values = trace["y"]
@@ -4418,7 +4314,8 @@ def define_callbacks(app):
 						legendgroup = trace["legendgroup"]
 						showlegend = trace["showlegend"]
 						marker_color = trace["marker"]["color"]
-						hovertext = trace["hovertext"]
+						custom_data = trace["customdata"]
+						hovertemplate = trace["hovertemplate"]
 						visible = trace["visible"]
 						xaxis = trace["xaxis"]
 						if xaxis not in new_traces:
@@ -4429,9 +4326,9 @@ def define_callbacks(app):
 						#change trace type
 						else:
 							if boolean_show_as_boxplot_switch:
-								new_traces[xaxis].append(go.Box(y=y_values, x=x_values, name=name, legendgroup=legendgroup, showlegend=showlegend, marker_color=marker_color, boxpoints="all", hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=visible, xaxis=xaxis))
+								new_traces[xaxis].append(go.Box(y=y_values, x=x_values, name=name, legendgroup=legendgroup, showlegend=showlegend, marker_color=marker_color, boxpoints="all", customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=visible, xaxis=xaxis))
 							else:
-								new_traces[xaxis].append(go.Violin(y=y_values, x=x_values, name=name, legendgroup=legendgroup, marker_color=marker_color, hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, visible=visible, xaxis=xaxis, points="all", spanmode="hard"))
+								new_traces[xaxis].append(go.Violin(y=y_values, x=x_values, name=name, legendgroup=legendgroup, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, visible=visible, xaxis=xaxis, points="all", spanmode="hard"))
 					
 					#clear data and add new traces in the right place
 					box_fig["data"] = None
@@ -4456,18 +4353,6 @@ def define_callbacks(app):
 						box_fig.update_layout(boxmode=boxmode)
 					else:
 						box_fig.update_layout(violinmode=boxmode)
-				#hide unselected traces
-				elif trigger_id == "hide_unselected_multiboxplots_switch.value":
-					if boolean_hide_unselected_switch:
-						box_fig.update_layout(legend_itemclick=False, legend_itemdoubleclick=False)
-						for trace in box_fig["data"]:
-							if trace["visible"] == "legendonly":
-								trace["visible"] = False
-					else:
-						box_fig.update_layout(legend_itemclick="toggle", legend_itemdoubleclick="toggleothers")
-						for trace in box_fig["data"]:
-							if trace["visible"] is False:
-								trace["visible"] = "legendonly"
 				#legend click when statistics switch is on
 				elif trigger_id == "multi_boxplots_graph.restyleData" and boolean_stats_switch:
 					#parse figure data to get all the necessary infos
@@ -4571,6 +4456,16 @@ def define_callbacks(app):
 					box_fig.update_layout(annotations=updated_annotations)
 
 		return box_fig, config_multi_boxplots, plot_hidden_status, x_filter_div_hidden, comparison_only_switch, best_conditions_switch, hide_unselected_switch, height, width, show_stats_switch_options, stats_switch, stats_div_hidden, style_data_conditional, statistics_table_data, statistics_table_columns
+
+	#hide unselected traces and resize the multiboxplots in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="update_figure"),
+		Output("multiboxplots_figure_update", "data"),
+		Input("hide_unselected_multiboxplots_switch", "value"),
+		Input("multiboxplots_width_slider", "value"),
+		Input("multiboxplots_height_slider", "value"),
+		State("multi_boxplots_graph", "id")
+	)
 	
 	#correlation plot
 	@app.callback(
@@ -4585,19 +4480,16 @@ def define_callbacks(app):
 		Input("group_by_correlation_dropdown", "value"),
 		Input("comparison_only_correlation_switch", "value"),
 		Input("contrast_dropdown", "value"),
-		Input("hide_unselected_correlation_switch", "value"),
-		Input("correlation_width_slider", "value"),
-		Input("correlation_height_slider", "value"),
+		State("hide_unselected_correlation_switch", "value"),
 		State("x_dataset_correlation_dropdown", "value"),
 		State("y_dataset_correlation_dropdown", "value"),
 		State("color_mapping", "data"),
-		State("feature_correlation_plot", "figure"),
 		State("hide_unselected_correlation_switch", "options"),
 		State("correletion_stats", "data"),
 		State("label_to_value", "data"),
 		State("analysis_dropdown", "value")
 	)
-	def plot_feature_correlation(x, y, group_by_column, comparison_only_switch, contrast, hide_unselected_switch, width_fig, height_fig, dataset_x, dataset_y, color_mapping, fig, hide_unselected_switch_options, statistics_data, label_to_value, path):
+	def plot_feature_correlation(x, y, group_by_column, comparison_only_switch, contrast, hide_unselected_switch, dataset_x, dataset_y, color_mapping, hide_unselected_switch_options, statistics_data, label_to_value, path):
 		#x = "TNF"
 		#y = "ALOX5"
 		#group_by_column = "condition"
@@ -4613,184 +4505,178 @@ def define_callbacks(app):
 		if trigger_id == "contrast_dropdown.value" and boolean_comparison_only_switch is False:
 			raise PreventUpdate
 		
-		#size changes
-		if trigger_id in ["correlation_width_slider.value", "correlation_height_slider.value"]:
-			fig["layout"]["height"] = height_fig
-			fig["layout"]["width"] = width_fig
-		#new plot
+		#open metadata
+		analysis_metadata = functions.get_analysis_metadata(path)
+		#comparison only will filter the samples
+		if boolean_comparison_only_switch:
+			metadata_df = analysis_metadata.get_metadata(analysis_metadata.get_mask("condition", contrast.split("-vs-")))
 		else:
-			#open metadata
-			metadata_df = functions.download_from_github(path, "metadata.tsv")
-			metadata_df = pd.read_csv(metadata_df, sep = "\t")
-			#comparison only will filter the samples
-			if boolean_comparison_only_switch:
-				metadata_df = metadata_df[metadata_df["condition"].isin(contrast.split("-vs-"))]
-			metadata_df = metadata_df.replace("_", " ", regex=True)
+			metadata_df = analysis_metadata.get_metadata()
+		
+		#empty plot
+		if x is None or y is None:
+			fig = go.Figure()
+			fig.add_annotation(text="Please select x and y", showarrow=False, font_size=16)
+			width_fig = 600
+			height_fig = 450
+			config_filename_title = "empty_correlation"
+			fig.update_layout(xaxis_linecolor="rgb(255,255,255)", yaxis_linecolor="rgb(255,255,255)", xaxis_showticklabels=False, yaxis_showticklabels=False, xaxis_fixedrange=True, yaxis_fixedrange=True, xaxis_ticks="", yaxis_ticks="")
+		#plot
+		else:
+			#same feature on x an y
+			if x == y:
+				counts = functions.get_counts(path, dataset_x, [x])
+				counts = counts.rename(columns={x: "counts"})
 			
-			#empty plot
-			if x is None or y is None:
-				fig = go.Figure()
-				fig.add_annotation(text="Please select x and y", showarrow=False, font_size=16)
-				width_fig = 600
-				height_fig = 450
-				config_filename_title = "empty_correlation"
-				fig.update_layout(xaxis_linecolor="rgb(255,255,255)", yaxis_linecolor="rgb(255,255,255)", xaxis_showticklabels=False, yaxis_showticklabels=False, xaxis_fixedrange=True, yaxis_fixedrange=True, xaxis_ticks="", yaxis_ticks="")
-			#plot
-			else:
-				#same feature on x an y
-				if x == y:
-					counts = functions.download_from_github(path, "data/" + dataset_x + "/counts/" + x + ".tsv")
-					counts = pd.read_csv(counts, sep = "\t")
-				
-					#expression or abundance for x
-					if dataset_x in ["human", "mouse"] or "genes" in dataset_x:
-						expression_or_abundance = "expression"
-						x = x.replace("€", "/")
-					else:
-						expression_or_abundance = "abundance"
-						x = x.replace("_", " ").replace("[", "").replace("]", "")
-					expression_or_abundance_x = f"Log2 {expression_or_abundance} {x}"
+				#expression or abundance for x
+				if dataset_x in ["human", "mouse"] or "genes" in dataset_x:
+					expression_or_abundance = "expression"
+					x = x.replace("€", "/")
+				else:
+					expression_or_abundance = "abundance"
+					x = x.replace("_", " ").replace("[", "").replace("]", "")
+				expression_or_abundance_x = f"Log2 {expression_or_abundance} {x}"
 
-					#log2
-					counts[expression_or_abundance_x] = np.log2(counts["counts"])
-					merged_df = counts.rename(columns={"Gene": f"{x}"})
+				#log2
+				counts[expression_or_abundance_x] = np.log2(counts["counts"])
+				merged_df = counts.rename(columns={"Gene": f"{x}"})
 
-					#x and y are the same
-					expression_or_abundance_y = expression_or_abundance_x
+				#x and y are the same
+				expression_or_abundance_y = expression_or_abundance_x
 
-				#different features on x and y
+			#different features on x and y
+			else:
+				#get counts
+				counts_x = functions.get_counts(path, dataset_x, [x])
+				counts_x = counts_x.rename(columns={x: "counts"})
+				#expression or abundance for x
+				if dataset_x in ["human", "mouse"] or "genes" in dataset_x:
+					expression_or_abundance = "expression"
+					x = x.replace("€", "/")
 				else:
-					#get counts
-					counts_x = functions.download_from_github(path, "data/" + dataset_x + "/counts/" + x + ".tsv")
-					counts_x = pd.read_csv(counts_x, sep = "\t")
-					#expression or abundance for x
-					if dataset_x in ["human", "mouse"] or "genes" in dataset_x:
-						expression_or_abundance = "expression"
-						x = x.replace("€", "/")
-					else:
-						expression_or_abundance = "abundance"
-						x = x.replace("_", " ").replace("[", "").replace("]", "")
-					expression_or_abundance_x = f"Log2 {expression_or_abundance} {x}"
-					#log2
-					counts_x[expression_or_abundance_x] = np.log2(counts_x["counts"])
-					counts_x = counts_x.rename(columns={"Gene": f"{x}"})
-
-					counts_y = functions.download_from_github(path, "data/" + dataset_y + "/counts/" + y + ".tsv")
-					counts_y = pd.read_csv(counts_y, sep = "\t")
-					#expression or abundance for y
-					if dataset_y in ["human", "mouse"] or "genes" in dataset_y:
-						expression_or_abundance = "expression"
-						y = y.replace("€", "/")
-					else:
-						expression_or_abundance = "abundance"
-						y = y.replace("_", " ").replace("[", "").replace("]", "")
-					expression_or_abundance_y = f"Log2 {expression_or_abundance} {y}"
-					#log2
-					counts_y[expression_or_abundance_y] = np.log2(counts_y["counts"])
-					counts_y = counts_y.rename(columns={"Gene": f"{y}"})
-
-					#merge counts
-					merged_df = counts_x.merge(counts_y, how="inner", on="sample")
-
-				#merge with metadata
-				merged_df = merged_df.merge(metadata_df, how="inner", on="sample")
+					expression_or_abundance = "abundance"
+					x = x.replace("_", " ").replace("[", "").replace("]", "")
+				expression_or_abundance_x = f"Log2 {expression_or_abundance} {x}"
+				#log2
+				counts_x[expression_or_abundance_x] = np.log2(counts_x["counts"])
+				counts_x = counts_x.rename(columns={"Gene": f"{x}"})
+
+				counts_y = functions.get_counts(path, dataset_y, [y])
+				counts_y = counts_y.rename(columns={y: "counts"})
+				#expression or abundance for y
+				if dataset_y in ["human", "mouse"] or "genes" in dataset_y:
+					expression_or_abundance = "expression"
+					y = y.replace("€", "/")
+				else:
+					expression_or_abundance = "abundance"
+					y = y.replace("_", " ").replace("[", "").replace("]", "")
+				expression_or_abundance_y = f"Log2 {expression_or_abundance} {y}"
+				#log2
+				counts_y[expression_or_abundance_y] = np.log2(counts_y["counts"])
+				counts_y = counts_y.rename(columns={"Gene": f"{y}"})
+
+				#merge counts
+				merged_df = counts_x.merge(counts_y, how="inner", on="sample")
+
+			#merge with metadata
+			merged_df = merged_df.merge(metadata_df, how="inner", on="sample")
+			
+			#prepare for hover data
+			metadata_columns = []
+			for column in label_to_value:
+				metadata_columns.append(label_to_value[column])
+			merged_df = merged_df.rename(columns=label_to_value)
+			merged_df[metadata_columns] = merged_df[metadata_columns].fillna("NA")
+
+			#plot figure without group by
+			if group_by_column is None:
+				fig = px.scatter(merged_df, x=expression_or_abundance_x, y=expression_or_abundance_y, hover_data=metadata_columns, trendline="ols", trendline_color_override="black")
+				fig.update_traces(marker_color="darkgray")
+
+				#get statistics
+				statistics_results = px.get_trendline_results(fig)
+				#format scientific notation for pvalue
+				pvalue_f = f"{statistics_results.px_fit_results.iloc[0].f_pvalue:.1e}".replace("e-0", "e-")
+				if float(pvalue_f) <= 0.05:
+					pvalue_f += "*"
+				#get rsquared
+				r_squared = round(statistics_results.px_fit_results.iloc[0].rsquared, 1)
+
+				#check if the slope is negative
+				line_slope = re.match(r".+\s=\s(.+)\s\*", fig["data"][1]["hovertemplate"]).group(1)
+				if float(line_slope) < 0:
+					r_squared = -r_squared
+
+				#add annotation and change hovertemplate
+				correlation_statistics = f"R<sup>2</sup>={r_squared} p={pvalue_f}"
+				fig.add_annotation(text=correlation_statistics, showarrow=False, font=dict(family="Arial", size=12, color="black"), xref="paper", yref="paper", x=0.1, y=0.1)
+				fig["data"][0]["hovertemplate"] = fig["data"][0]["hovertemplate"].replace("=", ": ")
+				fig["data"][1]["hovertemplate"] = correlation_statistics
+			
+			#plot figure with group by
+			else:
+				original_group_by_column = group_by_column
+				group_by_column = label_to_value[group_by_column]
+				#find out if some of the groups have only 1 sample, which make it impossible to compute correlation
+				group_count = merged_df[group_by_column].value_counts()
+				group_count = pd.DataFrame(group_count)
+				group_count = group_count[group_count[group_by_column] != 1]
+				#filter keep good groups
+				merged_df = merged_df[merged_df[group_by_column].isin(list(group_count.index))]
 				
-				#prepare for hover data
-				metadata_columns = []
-				for column in label_to_value:
-					metadata_columns.append(label_to_value[column])
-				merged_df = merged_df.rename(columns=label_to_value)
-				merged_df[metadata_columns] = merged_df[metadata_columns].fillna("NA")
-
-				#plot figure without group by
-				if group_by_column is None:
-					fig = px.scatter(merged_df, x=expression_or_abundance_x, y=expression_or_abundance_y, hover_data=metadata_columns, trendline="ols", trendline_color_override="black")
-					fig.update_traces(marker_color="darkgray")
-
-					#get statistics
-					statistics_results = px.get_trendline_results(fig)
-					#format scientific notation for pvalue
-					pvalue_f = f"{statistics_results.px_fit_results.iloc[0].f_pvalue:.1e}".replace("e-0", "e-")
-					if float(pvalue_f) <= 0.05:
-						pvalue_f += "*"
-					#get rsquared
-					r_squared = round(statistics_results.px_fit_results.iloc[0].rsquared, 1)
-
-					#check if the slope is negative
-					line_slope = re.match(r".+\s=\s(.+)\s\*", fig["data"][1]["hovertemplate"]).group(1)
-					if float(line_slope) < 0:
-						r_squared = -r_squared
-
-					#add annotation and change hovertemplate
-					correlation_statistics = f"R<sup>2</sup>={r_squared} p={pvalue_f}"
-					fig.add_annotation(text=correlation_statistics, showarrow=False, font=dict(family="Arial", size=12, color="black"), xref="paper", yref="paper", x=0.1, y=0.1)
-					fig["data"][0]["hovertemplate"] = fig["data"][0]["hovertemplate"].replace("=", ": ")
-					fig["data"][1]["hovertemplate"] = correlation_statistics
+				#sort metadata by group column
+				merged_df = merged_df.sort_values(by=[group_by_column])
 				
-				#plot figure with group by
-				else:
-					original_group_by_column = group_by_column
-					group_by_column = label_to_value[group_by_column]
-					#find out if some of the groups have only 1 sample, which make it impossible to compute correlation
-					group_count = merged_df[group_by_column].value_counts()
-					group_count = pd.DataFrame(group_count)
-					group_count = group_count[group_count[group_by_column] != 1]
-					#filter keep good groups
-					merged_df = merged_df[merged_df[group_by_column].isin(list(group_count.index))]
-					
-					#sort metadata by group column
-					merged_df = merged_df.sort_values(by=[group_by_column])
-					
-					#get colors from metadata
-					groups = merged_df[group_by_column].unique().tolist()
-					group_colors = []
-					for group in groups:
-						group_colors.append(functions.get_color(color_mapping, original_group_by_column, group))
-					
-					#same feature on both axis
-					fig = px.scatter(merged_df, x=expression_or_abundance_x, y=expression_or_abundance_y, color=group_by_column, color_discrete_sequence=group_colors, trendline="ols", hover_data=metadata_columns,)
-					fig.update_traces(visible=True)
-					fig.update_layout(legend_title=group_by_column.capitalize(), legend_orientation="h", legend_yanchor="top", legend_y=-0.2)
-
-					#add statistics to plot
-					statistics_results = px.get_trendline_results(fig)
-
-					#save correlation statistics, check slope and update line hovertemplate
-					statistics_data = {}
-					for trace in fig["data"]:
-						if trace["mode"] == "lines":
-							#get group
-							group = trace["name"]
-							
-							#extract results
-							group_results = statistics_results.query(f"{group_by_column} == '{group}'").px_fit_results.iloc[0]
-							#format scientific notation for pvalue
-							pvalue_f = f"{group_results.f_pvalue:.1e}".replace("e-0", "e-")
-							if float(pvalue_f) <= 0.05:
-								pvalue_f += "*"
-							#get rsquared
-							r_squared = round(group_results.rsquared, 1)
-
-							#check if the slope is negative
-							line_slope = re.match(r".+\s=\s(.+)\s\*", trace["hovertemplate"]).group(1)
-							if float(line_slope) < 0:
-								r_squared = -r_squared
-
-							#save annotation text so that it can be used again later on legend update
-							annotation_text = f"R<sup>2</sup>={r_squared} p={pvalue_f}"
-							statistics_data[group] = annotation_text
-
-							#update hover template for line
-							trace["hovertemplate"] = statistics_data[group]
-						#update hover template for markers
-						elif trace["mode"] == "markers":
-							trace["hovertemplate"] = trace["hovertemplate"].replace("=", ": ")
-
-				#update layout and config variables
-				width_fig = 400
-				height_fig = 450
-				fig.update_layout(font_family="Arial", title_text="Pearson correlation", title_xanchor="center", title_x=0.5, width=width_fig, height=height_fig, margin_r=0)
-		
+				#get colors from metadata
+				groups = merged_df[group_by_column].unique().tolist()
+				group_colors = []
+				for group in groups:
+					group_colors.append(functions.get_color(color_mapping, original_group_by_column, group))
+				
+				#same feature on both axis
+				fig = px.scatter(merged_df, x=expression_or_abundance_x, y=expression_or_abundance_y, color=group_by_column, color_discrete_sequence=group_colors, trendline="ols", hover_data=metadata_columns,)
+				fig.update_traces(visible=True)
+				fig.update_layout(legend_title=group_by_column.capitalize(), legend_orientation="h", legend_yanchor="top", legend_y=-0.2)
+
+				#add statistics to plot
+				statistics_results = px.get_trendline_results(fig)
+
+				#save correlation statistics, check slope and update line hovertemplate
+				statistics_data = {}
+				for trace in fig["data"]:
+					if trace["mode"] == "lines":
+						#get group
+						group = trace["name"]
+						
+						#extract results
+						group_results = statistics_results.query(f"{group_by_column} == '{group}'").px_fit_results.iloc[0]
+						#format scientific notation for pvalue
+						pvalue_f = f"{group_results.f_pvalue:.1e}".replace("e-0", "e-")
+						if float(pvalue_f) <= 0.05:
+							pvalue_f += "*"
+						#get rsquared
+						r_squared = round(group_results.rsquared, 1)
+
+						#check if the slope is negative
+						line_slope = re.match(r".+\s=\s(.+)\s\*", trace["hovertemplate"]).group(1)
+						if float(line_slope) < 0:
+							r_squared = -r_squared
+
+						#save annotation text so that it can be used again later on legend update
+						annotation_text = f"R<sup>2</sup>={r_squared} p={pvalue_f}"
+						statistics_data[group] = annotation_text
+
+						#update hover template for line
+						trace["hovertemplate"] = statistics_data[group]
+					#update hover template for markers
+					elif trace["mode"] == "markers":
+						trace["hovertemplate"] = trace["hovertemplate"].replace("=", ": ")
+
+			#update layout and config variables
+			width_fig = 400
+			height_fig = 450
+			fig.update_layout(font_family="Arial", title_text="Pearson correlation", title_xanchor="center", title_x=0.5, width=width_fig, height=height_fig, margin_r=0)
+	
 		#transparent background
 		fig["layout"]["paper_bgcolor"] = "rgba(0,0,0,0)"
 		fig["layout"]["plot_bgcolor"] = "rgba(0,0,0,0)"
@@ -4820,6 +4706,16 @@ def define_callbacks(app):
 
 		return fig, config_fig, statistics_data, hide_unselected_switch_options, width_fig, height_fig
 
+	#hide unselected groups and resize the correlation plot in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="update_figure"),
+		Output("correlation_figure_update", "data"),
+		Input("hide_unselected_correlation_switch", "value"),
+		Input("correlation_width_slider", "value"),
+		Input("correlation_height_slider", "value"),
+		State("feature_correlation_plot", "id")
+	)
+
 	#statistics correlation plot
 	@app.callback(
 		Output("statistics_feature_correlation_plot", "figure"),
@@ -4897,16 +4793,15 @@ def define_callbacks(app):
 		Output("statistics_diversity_switch", "options"),
 		Input("diversity_graph", "restyleData"),
 		Input("group_by_diversity_dropdown", "value"),
-		Input("hide_unselected_diversity_switch", "value"),
 		Input("statistics_diversity_switch", "value"),
+		State("hide_unselected_diversity_switch", "value"),
 		State("statistics_diversity_switch", "options"),
 		State("feature_dataset_dropdown", "value"),
 		State("diversity_graph", "figure"),
-		State("diversity_graph", "config"),
 		State("color_mapping", "data"),
 		State("analysis_dropdown", "value")
 	)
-	def plot_species_diversity(legend_click, group_by, hide_unselected_switch, statistics_switch_value, statistics_switch_options, expression_dataset, fig, config, color_mapping, path):
+	def plot_species_diversity(legend_click, group_by, statistics_switch_value, hide_unselected_switch, statistics_switch_options, expression_dataset, fig, color_mapping, path):
 		#define contexts
 		ctx = dash.callback_context
 		trigger_id = ctx.triggered[0]["prop_id"]
@@ -4919,138 +4814,126 @@ def define_callbacks(app):
 		#plots = ["Species diversity<br>by Shannon index", "Species dominance<br>by Simpson index", "Species dominance<br>by Inverse Simpson index"]
 		#fig = make_subplots(rows=1, cols=3, subplot_titles=plots, y_title="Index")
 		
-		#create new plot
-		if trigger_id in ["group_by_diversity_dropdown.value", ".", "diversity_graph.restyleData", "statistics_diversity_switch.value"]:
-			
-			#parse figure to get visible groups
-			if fig is not None and trigger_id != "group_by_diversity_dropdown.value":
-				#get the name of visible traces
-				visible_groups = []
-				for trace in fig["data"]:
-					if "mode" not in trace and trace["visible"] is True and trace["name"] not in visible_groups:
-						visible_groups.append(trace["name"])
-			else:
-				visible_groups = "all"
+		#parse figure to get visible groups
+		if fig is not None and trigger_id != "group_by_diversity_dropdown.value":
+			#get the name of visible traces
+			visible_groups = []
+			for trace in fig["data"]:
+				if "mode" not in trace and trace["visible"] is True and trace["name"] not in visible_groups:
+					visible_groups.append(trace["name"])
+		else:
+			visible_groups = "all"
 
-			expression_dataset_for_plot_title = expression_dataset.replace("_", " ").capitalize()
-			plots = [f"{expression_dataset_for_plot_title} diversity<br>by Shannon index", f"{expression_dataset_for_plot_title} dominance<br>by Simpson index"]
-			fig = make_subplots(rows=1, cols=2, subplot_titles=plots, y_title="Index")
+		expression_dataset_for_plot_title = expression_dataset.replace("_", " ").capitalize()
+		plots = [f"{expression_dataset_for_plot_title} diversity<br>by Shannon index", f"{expression_dataset_for_plot_title} dominance<br>by Simpson index"]
+		fig = make_subplots(rows=1, cols=2, subplot_titles=plots, y_title="Index")
 
-			#populate subplots
-			col = 1
-			showlegend = True
-			for plot in plots:
-
-				#define which file to open
-				if plot == f"{expression_dataset_for_plot_title} diversity<br>by Shannon index":
-					file_name = "shannon"
-					index_column = "Shannon_index"
-				elif plot == f"{expression_dataset_for_plot_title} dominance<br>by Simpson index":
-					file_name = "simpson"
-					index_column = "Simpson_index"
-				#elif plot == "Species dominance<br>by Inverse Simpson index":
-					#file_name = "invsimpson"
-					#index_column = "Inversed_Simpson_index"
-
-				#open df
-				diversity_df = functions.download_from_github(path, f"diversity/{expression_dataset}/{file_name}.tsv")
-				diversity_df = pd.read_csv(diversity_df, sep = "\t")
-				diversity_df = diversity_df.replace("_", " ", regex=True)
-				diversity_df = diversity_df.fillna("NA")
-
-				#get x values
-				x_values = diversity_df[group_by].unique().tolist()
-				x_values.sort()
-
-				#statistics switch can't be clicked if there is only one element on x
-				if len(x_values) < 2:
-					statistics_switch_value = []
-					statistics_switch_options = [{"label": "", "value": 1, "disabled": True}]
-					boolean_statistics_switch_value = False
-				else:
-					statistics_switch_options = [{"label": "", "value": 1, "disabled": False}]
-
-				#save data for statistics
-				if boolean_statistics_switch_value:
-					#legend click filter out x_values
-					if trigger_id == "diversity_graph.restyleData":
-						x_values_for_comparisons = []
-						for x_value in x_values:
-							if x_value in visible_groups:
-								x_values_for_comparisons.append(x_value)
-					else:
-						x_values_for_comparisons = x_values
-						visible_groups = visible_groups
-					
-					data_for_statistics = {}
-					#get all cominations for elements in x_axis
-					all_combinations = list(combinations(x_values_for_comparisons, 2))
-					for combination in all_combinations:
-						#filter df
-						values = []
-						for group in combination:
-							df = diversity_df[diversity_df[group_by] == group]
-							values.append(df[index_column])
-						#execute test
-						mw_results = scipy.stats.mannwhitneyu(x=values[0], y=values[1])
-						if mw_results.pvalue <= 0.05:
-							data_for_statistics["-vs-".join(combination)] = round(mw_results.pvalue, 3)
+		#populate subplots
+		col = 1
+		showlegend = True
+		for plot in plots:
+
+			#define which file to open
+			if plot == f"{expression_dataset_for_plot_title} diversity<br>by Shannon index":
+				file_name = "shannon"
+				index_column = "Shannon_index"
+			elif plot == f"{expression_dataset_for_plot_title} dominance<br>by Simpson index":
+				file_name = "simpson"
+				index_column = "Simpson_index"
+			#elif plot == "Species dominance<br>by Inverse Simpson index":
+				#file_name = "invsimpson"
+				#index_column = "Inversed_Simpson_index"
+
+			#open df
+			diversity_df = functions.widen_float32_columns(functions.read_tsv(path, f"diversity/{expression_dataset}/{file_name}.tsv"))
+			diversity_df = diversity_df.replace("_", " ", regex=True)
+			diversity_df = diversity_df.fillna("NA")
+
+			#get x values
+			x_values = diversity_df[group_by].unique().tolist()
+			x_values.sort()
 
-				#add traces for each x value
-				max_y = None
-				for x_value in x_values:
-					filtered_diversity_df = diversity_df[diversity_df[group_by] == x_value]
-					marker_color = functions.get_color(color_mapping, group_by, x_value)
-
-					#create hovertext
-					filtered_diversity_df["hovertext"] = ""
-					for column in filtered_diversity_df.columns:
-						if column not in ["control", "counts", "hovertext", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
-							filtered_diversity_df["hovertext"] = filtered_diversity_df["hovertext"] + column.replace("_", " ").capitalize() + ": " + filtered_diversity_df[column].astype(str) + "<br>"
-					hovertext = filtered_diversity_df["hovertext"].tolist()
-
-					#save and update max_y
-					if x_value in visible_groups or visible_groups == "all":
-						if max_y is None or filtered_diversity_df[index_column].max() > max_y:
-							max_y = filtered_diversity_df[index_column].max()
-
-					#add traces
-					if visible_groups == "all":
-						visible = True
-					else:	
+			#statistics switch can't be clicked if there is only one element on x
+			if len(x_values) < 2:
+				statistics_switch_value = []
+				statistics_switch_options = [{"label": "", "value": 1, "disabled": True}]
+				boolean_statistics_switch_value = False
+			else:
+				statistics_switch_options = [{"label": "", "value": 1, "disabled": False}]
+
+			#save data for statistics
+			if boolean_statistics_switch_value:
+				#legend click filter out x_values
+				if trigger_id == "diversity_graph.restyleData":
+					x_values_for_comparisons = []
+					for x_value in x_values:
 						if x_value in visible_groups:
-							visible = True
-						else:
-							visible = "legendonly"
-					fig.add_trace(go.Violin(x=filtered_diversity_df[group_by], y=filtered_diversity_df[index_column], name=x_value, marker_color=marker_color, hoverinfo="text", marker_size=3, line_width=4, hovertext=hovertext, legendgroup=x_value, showlegend=showlegend, points="all", spanmode="hard", visible=visible), row=1, col=col)
+							x_values_for_comparisons.append(x_value)
+				else:
+					x_values_for_comparisons = x_values
+					visible_groups = visible_groups
 				
-				#add bar and * to plot
-				if boolean_statistics_switch_value:
-					#compute y and its increase
-					y = max_y * 1.1
-					y_increase = y - max_y
-					for comparison in data_for_statistics:
-						conditions = comparison.split("-vs-")
-						fig.add_trace(go.Scatter(x=conditions, y=[y, y], mode="lines", line_width=1, marker_color="black", hoverinfo="none", showlegend=False), row=1, col=col)
-						fig.add_annotation(x=conditions[0], y=y, yshift=5, text="*", font_family="Calibri", font_size=32, showarrow=False, hovertext=data_for_statistics[comparison], row=1, col=col)
+				data_for_statistics = {}
+				#get all cominations for elements in x_axis
+				all_combinations = list(combinations(x_values_for_comparisons, 2))
+				for combination in all_combinations:
+					#filter df
+					values = []
+					for group in combination:
+						df = diversity_df[diversity_df[group_by] == group]
+						values.append(df[index_column])
+					#execute test
+					mw_results = scipy.stats.mannwhitneyu(x=values[0], y=values[1])
+					if mw_results.pvalue <= 0.05:
+						data_for_statistics["-vs-".join(combination)] = round(mw_results.pvalue, 3)
+
+			#add traces for each x value
+			max_y = None
+			for x_value in x_values:
+				filtered_diversity_df = diversity_df[diversity_df[group_by] == x_value]
+				marker_color = functions.get_color(color_mapping, group_by, x_value)
 
-						#increase y
-						y += y_increase
+				custom_data, hovertemplate = functions.get_hover_data(filtered_diversity_df)
 
-				#next subplot
-				if showlegend:
-					showlegend=False
-				col += 1
+				#save and update max_y
+				if x_value in visible_groups or visible_groups == "all":
+					if max_y is None or filtered_diversity_df[index_column].max() > max_y:
+						max_y = filtered_diversity_df[index_column].max()
 
-			#update final layout
-			fig.update_layout(legend_orientation="h", height=450, legend_yanchor="bottom", legend_y=1.25)
-			fig.update_xaxes(tickangle=-90)
+				#add traces
+				if visible_groups == "all":
+					visible = True
+				else:	
+					if x_value in visible_groups:
+						visible = True
+					else:
+						visible = "legendonly"
+				fig.add_trace(go.Violin(x=filtered_diversity_df[group_by], y=filtered_diversity_df[index_column], name=x_value, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, legendgroup=x_value, showlegend=showlegend, points="all", spanmode="hard", visible=visible), row=1, col=col)
+			
+			#add bar and * to plot
+			if boolean_statistics_switch_value:
+				#compute y and its increase
+				y = max_y * 1.1
+				y_increase = y - max_y
+				for comparison in data_for_statistics:
+					conditions = comparison.split("-vs-")
+					fig.add_trace(go.Scatter(x=conditions, y=[y, y], mode="lines", line_width=1, marker_color="black", hoverinfo="none", showlegend=False), row=1, col=col)
+					fig.add_annotation(x=conditions[0], y=y, yshift=5, text="*", font_family="Calibri", font_size=32, showarrow=False, hovertext=data_for_statistics[comparison], row=1, col=col)
+
+					#increase y
+					y += y_increase
+
+			#next subplot
+			if showlegend:
+				showlegend=False
+			col += 1
 
-			#add tab with figure
-			config = {"modeBarButtonsToRemove": ["select2d", "lasso2d", "hoverClosestCartesian", "hoverCompareCartesian", "resetScale2d", "toggleSpikelines"], "toImageButtonOptions": {"format": "png", "scale": 5, "filename": f"{expression_dataset}_diversity"}, "edits": {"legendPosition": True, "annotationText": True}}
-		#use the old one
-		else:
-			fig = go.Figure(fig)
+		#update final layout
+		fig.update_layout(legend_orientation="h", height=450, legend_yanchor="bottom", legend_y=1.25)
+		fig.update_xaxes(tickangle=-90)
+
+		#add tab with figure
+		config = {"modeBarButtonsToRemove": ["select2d", "lasso2d", "hoverClosestCartesian", "hoverCompareCartesian", "resetScale2d", "toggleSpikelines"], "toImageButtonOptions": {"format": "png", "scale": 5, "filename": f"{expression_dataset}_diversity"}, "edits": {"legendPosition": True, "annotationText": True}}
 
 		#hide unselected traces from legend
 		if boolean_hide_unselected_switch:
@@ -5065,6 +4948,14 @@ def define_callbacks(app):
 					trace["visible"] = "legendonly"
 
 		return fig, config, statistics_switch_value, statistics_switch_options
+
+	#hide unselected groups in the browser
+	app.clientside_callback(
+		ClientsideFunction(namespace="figures", function_name="hide_unselected"),
+		Output("diversity_figure_update", "data"),
+		Input("hide_unselected_diversity_switch", "value"),
+		State("diversity_graph", "id")
+	)
 	
 	##### mofa callbacks #####
 
@@ -5087,8 +4978,7 @@ def define_callbacks(app):
 		groups = group_contrast.split("-vs-")
 
 		#open df
-		data_overview_df = functions.download_from_github(path, f"mofa/{group_contrast}/data_overview.tsv")
-		data_overview_df = pd.read_csv(data_overview_df, sep = "\t")
+		data_overview_df = functions.read_tsv(path, f"mofa/{group_contrast}/data_overview.tsv")
 
 		##get titles
 		subplot_titles = []
@@ -5175,8 +5065,7 @@ def define_callbacks(app):
 		groups = [group.replace("_", " ") for group in groups]
 
 		#open df
-		variance_heatmap_df = functions.download_from_github(path, f"mofa/{group_contrast}/variance_explained_heatmap.tsv")
-		variance_heatmap_df = pd.read_csv(variance_heatmap_df, sep = "\t")
+		variance_heatmap_df = functions.widen_float32_columns(functions.read_tsv(path, f"mofa/{group_contrast}/variance_explained_heatmap.tsv"))
 		variance_heatmap_df = variance_heatmap_df.replace([np.inf, -np.inf], None)
 		variance_heatmap_df = variance_heatmap_df.replace("_", " ", regex=True)
 		variance_heatmap_df.columns = variance_heatmap_df.columns.str.replace("_", " ")
@@ -5255,8 +5144,7 @@ def define_callbacks(app):
 
 		#default plot is the one which explain more variance
 		if trigger_id == "mofa_comparison_dropdown.value":
-			variance_heatmap_df = functions.download_from_github(path, f"mofa/{group_contrast}/variance_explained_heatmap.tsv")
-			variance_heatmap_df = pd.read_csv(variance_heatmap_df, sep = "\t")
+			variance_heatmap_df = functions.read_tsv(path, f"mofa/{group_contrast}/variance_explained_heatmap.tsv")
 			
 			#get max variance explained
 			max_variance = None
@@ -5278,8 +5166,7 @@ def define_callbacks(app):
 			view = view.replace(" ", "_")
 
 		#open weights df
-		weights_df = functions.download_from_github(path, f"mofa/{group_contrast}/weights.tsv")
-		weights_df = pd.read_csv(weights_df, sep = "\t")
+		weights_df = functions.read_tsv(path, f"mofa/{group_contrast}/weights.tsv")
 		
 		#filter by factor and value and then sort by value
 		weights_df = weights_df[weights_df["factor"] == factor]
@@ -5366,8 +5253,7 @@ def define_callbacks(app):
 		groups = group_contrast.split("-vs-")
 
 		#open weights df
-		factors_df = functions.download_from_github(path, f"mofa/{group_contrast}/factors.tsv")
-		factors_df = pd.read_csv(factors_df, sep = "\t")
+		factors_df = functions.widen_float32_columns(functions.read_tsv(path, f"mofa/{group_contrast}/factors.tsv"))
 		factors_df = factors_df.replace("_", " ", regex=True)
 
 		#get all factors
@@ -5389,18 +5275,15 @@ def define_callbacks(app):
 			#add groups violins
 			for group in groups:
 				group_df = filtered_factor_df[filtered_factor_df[metadata_column] == group]
+				#only 2 decimals
+				group_df = group_df.round(2)
 				x_values = group_df[metadata_column].tolist()
 				y_values = group_df["value"].tolist()
 				marker_color = functions.get_color(color_mapping, metadata_column, group)
 
-				#create hovertext
-				group_df["hovertext"] = ""
-				for column in group_df.columns:
-					if column not in ["control", "counts", "hovertext", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
-						group_df["hovertext"] = group_df["hovertext"] + column.replace("_", " ").capitalize() + ": " + group_df[column].astype(str) + "<br>"
-				hovertext = group_df["hovertext"].tolist()
+				custom_data, hovertemplate = functions.get_hover_data(group_df)
 
-				fig.add_trace(go.Violin(x=x_values, y=y_values, name=group, marker_color=marker_color, hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, points="all", showlegend=False, spanmode="hard"), row=1, col=col)
+				fig.add_trace(go.Violin(x=x_values, y=y_values, name=group, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, points="all", showlegend=False, spanmode="hard"), row=1, col=col)
 				if col == 1:
 					fig.update_yaxes(title_text="Factor score", title_standoff=5, row=1, col=col)
 
@@ -5457,8 +5340,7 @@ def define_callbacks(app):
 			log2_expression_or_abundance = "Log2 abundance"
 
 		#get features and their clean version
-		features_df = functions.download_from_github(path, features_df)
-		features_df = pd.read_csv(features_df, sep = "\t", header=None, names=["feature"])
+		features_df = functions.read_tsv(path, features_df, header=None, names=["feature"]).copy()
 		features_df["clean_feature"] = features_df["feature"].str.replace("_", " ", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False).str.replace("€", "/", regex=False)
 
 		#setup
@@ -5478,26 +5360,19 @@ def define_callbacks(app):
 		feature = feature["feature"].tolist()
 		feature = feature[0]
 
-		counts = functions.download_from_github(path, "data/" + level + "/counts/" + feature + ".tsv")
-		counts = pd.read_csv(counts, sep = "\t")
+		counts = functions.get_counts(path, level, [feature], layer="log2")
+		counts = counts.rename(columns={feature: log2_expression_or_abundance})
 		counts = counts.replace("_", " ", regex=True)
 		
 		#open metadata
-		metadata = functions.download_from_github(path, "metadata.tsv")
-		metadata = pd.read_csv(metadata, sep = "\t")
+		analysis_metadata = functions.get_analysis_metadata(path)
 
 		#filter metadata, keep only conditions which contain the groups
 		groups = group_contrast.split("-vs-")
-		metadata = metadata[metadata["group"].isin(groups)]
-
-		#clean metadata
-		metadata = metadata.fillna("NA")
-		metadata = metadata.replace("_", " ", regex=True)
+		metadata = analysis_metadata.get_metadata(analysis_metadata.get_mask("group", groups), with_NA=True)
 
-		#merge and compute log2 and replace inf with 0
+		#merge with log2 values
 		metadata = metadata.merge(counts, how="inner", on="sample")
-		metadata[log2_expression_or_abundance] = np.log2(metadata["counts"])
-		metadata[log2_expression_or_abundance].replace(to_replace = -np.inf, value = 0, inplace=True)
 
 		#plot per condition
 		conditions = metadata[metadata_column].unique().tolist()
@@ -5507,20 +5382,17 @@ def define_callbacks(app):
 		fig = go.Figure()
 		for condition in conditions:
 			filtered_df = metadata[metadata[metadata_column] == condition]
+			#only 2 decimals
+			filtered_df = filtered_df.round(2)
 
 			x_values = filtered_df[metadata_column].tolist()
 			y_values = filtered_df[log2_expression_or_abundance].tolist()
 			marker_color = functions.get_color(color_mapping, metadata_column, condition)
 
-			#create hovertext
-			filtered_df["hovertext"] = ""
-			for column in filtered_df.columns:
-				if column not in ["control", "counts", "hovertext", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]:
-					filtered_df["hovertext"] = filtered_df["hovertext"] + column.replace("_", " ").capitalize() + ": " + filtered_df[column].astype(str) + "<br>"
-			hovertext = filtered_df["hovertext"].tolist()
+			custom_data, hovertemplate = functions.get_hover_data(filtered_df)
 
 			#add trace
-			fig.add_trace(go.Violin(x=x_values, y=y_values, name=condition, marker_color=marker_color, hovertext=hovertext, hoverinfo="text", marker_size=3, line_width=4, points="all", spanmode="hard"))
+			fig.add_trace(go.Violin(x=x_values, y=y_values, name=condition, marker_color=marker_color, customdata=custom_data, hovertemplate=hovertemplate, hoveron="points", marker_size=3, line_width=4, points="all", spanmode="hard"))
 
 		#update layout
 		fig.update_layout(title={"text": f"{clean_feature}", "font_size": 16, "x": 0.5, "xanchor": "center"}, yaxis_title=log2_expression_or_abundance, height=142, margin_t=30, margin_b=0, margin_l=0)
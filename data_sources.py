@@ -0,0 +1,586 @@
+import os
+import io
+import re
+import json
+import pandas as pd
+import numpy as np
+import tarfile
+import zipfile
+import threading
+import time
+import hashlib
+import tempfile
+
+#clean a path relative to the root of an analysis repo
+def normalize_path(file_path):
+	file_path = file_path.replace("\\", "/")
+	while file_path.startswith("./"):
+		file_path = file_path[2:]
+	file_path = file_path.strip("/")
+	if file_path == ".":
+		file_path = ""
+
+	return file_path
+
+#base data source, every backend reads files and lists folders of an analysis repo
+class DataSource:
+	type = None
+
+	#read a file and return its raw content as bytes
+	def read(self, file_path):
+		raise NotImplementedError
+
+	#binary file object with the raw content of a file, backends which can stream avoid holding the whole file
+	def open(self, file_path):
+		return io.BytesIO(self.read(file_path))
+
+	#list file and folder names inside a folder
+	def list(self, folder_path):
+		raise NotImplementedError
+
+	#content of every folder of the repo as {folder: [names]}, None if the backend can not list everything at once
+	def tree(self):
+		return None
+
+	#already parsed table of a tsv file, None if the backend only has the raw file
+	def read_table(self, file_path):
+		return None
+
+	#folder of the consolidated counts of a dataset, None if the backend does not ship them
+	def get_counts_store_path(self, expression_dataset):
+		return None
+
+	#features of a dataset with their cleaned dropdown labels, None if the backend does not ship them
+	def read_feature_labels(self, expression_dataset):
+		return None
+
+	#manifest of the repo written by a builder, None if the backend does not ship it
+	def read_manifest(self):
+		return None
+
+	#modification time of a file, None if the backend can not tell it without reading the file
+	def get_mtime(self, file_path):
+		return None
+
+#group file paths by folder, parent folders are added to their own parent
+def build_tree(file_paths):
+	folders = {"": set()}
+	for file_path in file_paths:
+		parts = normalize_path(file_path).split("/")
+		for i in range(len(parts)):
+			folder = "/".join(parts[:i])
+			if folder not in folders:
+				folders[folder] = set()
+			folders[folder].add(parts[i])
+	tree = {}
+	for folder, names in folders.items():
+		tree[folder] = sorted(names)
+
+	return tree
+
+#responses saved on disk with their validators, one file per url with a json header line followed by the body as downloaded
+class HTTPCache:
+	def __init__(self, directory):
+		self.directory = os.path.abspath(os.path.expanduser(directory))
+		os.makedirs(self.directory, exist_ok=True)
+
+	def get_file(self, url):
+		key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+		return os.path.join(self.directory, key[:2], key)
+
+	#header of a saved response, None if the url was never saved
+	def get_header(self, url):
+		cache_file = self.get_file(url)
+		if not os.path.exists(cache_file):
+			return None
+		with open(cache_file, "rb") as f:
+			header = json.loads(f.readline())
+		#collision or damaged file
+		if header.get("url") != url:
+			return None
+
+		return header
+
+	#file handle positioned at the body of a saved response, None if the url was never saved
+	def open(self, url):
+		cache_file = self.get_file(url)
+		try:
+			f = open(cache_file, "rb")
+		except FileNotFoundError:
+			return None
+		header = json.loads(f.readline())
+		if header.get("url") != url:
+			f.close()
+			return None
+
+		return f
+
+	#write the body chunks in a temporary file and rename it, readers never see a partial response
+	def put(self, url, header, chunks):
+		cache_file = self.get_file(url)
+		os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+		header = dict(header, url=url)
+		file_descriptor, temporary_file = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+		try:
+			with os.fdopen(file_descriptor, "wb") as f:
+				f.write(json.dumps(header).encode("utf-8") + b"\n")
+				for chunk in chunks:
+					f.write(chunk)
+		except BaseException:
+			os.remove(temporary_file)
+			raise
+		os.replace(temporary_file, cache_file)
+
+#size of the chunks written to the http cache
+http_chunk_size = 1024 * 1024
+
+#files served by raw.githubusercontent, folders listed with the GitHub API
+#with a cache directory, responses are kept on disk and revalidated with conditional requests
+class GitHubDataSource(DataSource):
+	type = "github"
+
+	def __init__(self, path, http_session, github_session, cache_directory=None):
+		self.path = path
+		self.http_session = http_session
+		self.github_session = github_session
+		self.http_cache = None
+		if cache_directory is not None:
+			self.http_cache = HTTPCache(cache_directory)
+		match = re.match(r"(.+/.+)/(.+)/", path)
+		self.repo_name = match.group(1)
+		self.branch_name = match.group(2)
+		if self.branch_name == "master":
+			self.branch_name = "main"
+
+	def read(self, file_path):
+		if self.http_cache is None:
+			file_url = "https://raw.githubusercontent.com/" + self.path + file_path
+			response = self.http_session.get(file_url)
+			response.raise_for_status()
+			return response.content
+		with self.open(file_path) as f:
+			return f.read()
+
+	#streamed response, error pages like 404, rate limits or server errors are raised instead of being read or cached as file content
+	def get_response(self, file_url, request_headers=None):
+		response = self.http_session.get(file_url, headers=request_headers, stream=True)
+		if response.status_code >= 400:
+			response.close()
+			response.raise_for_status()
+
+		return response
+
+	#the body is streamed, with the http cache it is written to disk in chunks and read back from the cache file
+	def open(self, file_path):
+		file_url = "https://raw.githubusercontent.com/" + self.path + file_path
+		if self.http_cache is not None:
+			#ask for the body only if it changed
+			header = self.http_cache.get_header(file_url)
+			request_headers = {}
+			if header is not None:
+				if header.get("etag") is not None:
+					request_headers["If-None-Match"] = header["etag"]
+				if header.get("last_modified") is not None:
+					request_headers["If-Modified-Since"] = header["last_modified"]
+			response = self.get_response(file_url, request_headers)
+			if response.status_code == 304:
+				response.close()
+				cached_file = self.http_cache.open(file_url)
+				if cached_file is not None:
+					return cached_file
+				#cache file removed in the meantime
+				response = self.get_response(file_url)
+			if response.status_code == 200:
+				with response:
+					self.http_cache.put(file_url, {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}, response.iter_content(chunk_size=http_chunk_size))
+				cached_file = self.http_cache.open(file_url)
+				if cached_file is not None:
+					return cached_file
+				response = self.get_response(file_url)
+		else:
+			response = self.get_response(file_url)
+		#undo the transfer encoding, gzip files stay compressed
+		response.raw.decode_content = True
+		return response.raw
+
+	def list(self, folder_path):
+		dirs = []
+		repo = self.github_session.get_repo(self.repo_name, lazy=False)
+		contents = repo.get_contents(folder_path, ref=self.branch_name)
+		for folder in contents:
+			dirs.append(folder.name)
+		return dirs
+
+	def tree(self):
+		repo = self.github_session.get_repo(self.repo_name, lazy=False)
+		git_tree = repo.get_git_tree(self.branch_name, recursive=True)
+		#too many files for a single request
+		if git_tree.raw_data.get("truncated", False):
+			return None
+		file_paths = []
+		empty_folders = []
+		for element in git_tree.tree:
+			if element.type == "tree":
+				empty_folders.append(element.path)
+			else:
+				file_paths.append(element.path)
+		tree = build_tree(file_paths)
+		#folders without files
+		for folder in empty_folders:
+			if folder not in tree:
+				tree[folder] = []
+
+		return tree
+
+#local checkout or mirror of an analysis repo
+class LocalDataSource(DataSource):
+	type = "local"
+
+	def __init__(self, directory):
+		self.directory = os.path.abspath(os.path.expanduser(directory))
+
+	def get_full_path(self, file_path):
+		return os.path.join(self.directory, normalize_path(file_path))
+
+	def read(self, file_path):
+		with open(self.get_full_path(file_path), "rb") as f:
+			return f.read()
+
+	def open(self, file_path):
+		return open(self.get_full_path(file_path), "rb")
+
+	def list(self, folder_path):
+		return sorted(os.listdir(self.get_full_path(folder_path)))
+
+	def get_mtime(self, file_path):
+		full_path = self.get_full_path(file_path)
+		if os.path.exists(full_path):
+			return os.path.getmtime(full_path)
+		return None
+
+	#hidden folders and files like .git are not part of the analysis
+	def tree(self):
+		tree = {}
+		for root, dirs, files in os.walk(self.directory):
+			dirs[:] = [name for name in dirs if not name.startswith(".")]
+			folder = normalize_path(os.path.relpath(root, self.directory))
+			tree[folder] = sorted(name for name in dirs + files if not name.startswith("."))
+
+		return tree
+
+#tar or zip archive of an analysis repo, github archives with a single top folder are handled automatically
+class ArchiveDataSource(DataSource):
+	type = "archive"
+
+	def __init__(self, archive_path, prefix=None):
+		self.archive_path = os.path.abspath(os.path.expanduser(archive_path))
+		#archive handles are not thread safe
+		self.lock = threading.Lock()
+		if zipfile.is_zipfile(self.archive_path):
+			self.archive = zipfile.ZipFile(self.archive_path)
+			members = {info.filename.rstrip("/"): info for info in self.archive.infolist() if not info.is_dir()}
+		else:
+			self.archive = tarfile.open(self.archive_path)
+			members = {member.name: member for member in self.archive.getmembers() if member.isfile()}
+		members = {normalize_path(name): member for name, member in members.items()}
+
+		#strip the top folder if all files are inside it
+		if prefix is None:
+			top_folders = set(name.split("/")[0] for name in members)
+			if len(top_folders) == 1 and all("/" in name for name in members):
+				prefix = list(top_folders)[0]
+			else:
+				prefix = ""
+		prefix = normalize_path(prefix)
+		self.members = {}
+		for name, member in members.items():
+			if prefix != "":
+				if not name.startswith(prefix + "/"):
+					continue
+				name = name[len(prefix) + 1:]
+			self.members[name] = member
+
+		#folder content from the member names
+		self.folders = build_tree(self.members.keys())
+
+	def read(self, file_path):
+		member = self.members[normalize_path(file_path)]
+		with self.lock:
+			if isinstance(self.archive, zipfile.ZipFile):
+				return self.archive.read(member)
+			else:
+				return self.archive.extractfile(member).read()
+
+	def list(self, folder_path):
+		folder_path = normalize_path(folder_path)
+		if folder_path not in self.folders:
+			raise FileNotFoundError(folder_path)
+		return list(self.folders[folder_path])
+
+	def tree(self):
+		return self.folders
+
+#S3 compatible object store, endpoint_url can point to a local stand-in such as MinIO
+class S3DataSource(DataSource):
+	type = "s3"
+
+	def __init__(self, bucket, prefix="", endpoint_url=None, region_name=None, access_key=None, secret_key=None):
+		try:
+			import boto3
+		except ImportError:
+			raise ImportError("boto3 is required to use a s3 data source")
+		self.bucket = bucket
+		self.prefix = normalize_path(prefix)
+		self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name, aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+
+	def get_key(self, file_path):
+		file_path = normalize_path(file_path)
+		if self.prefix == "":
+			return file_path
+		elif file_path == "":
+			return self.prefix
+		else:
+			return self.prefix + "/" + file_path
+
+	def read(self, file_path):
+		response = self.client.get_object(Bucket=self.bucket, Key=self.get_key(file_path))
+		return response["Body"].read()
+
+	def open(self, file_path):
+		response = self.client.get_object(Bucket=self.bucket, Key=self.get_key(file_path))
+		return response["Body"]
+
+	def list(self, folder_path):
+		folder_key = self.get_key(folder_path)
+		if folder_key != "":
+			folder_key = folder_key + "/"
+		names = []
+		paginator = self.client.get_paginator("list_objects_v2")
+		for page in paginator.paginate(Bucket=self.bucket, Prefix=folder_key, Delimiter="/"):
+			for common_prefix in page.get("CommonPrefixes", []):
+				names.append(common_prefix["Prefix"][len(folder_key):].rstrip("/"))
+			for content in page.get("Contents", []):
+				names.append(content["Key"][len(folder_key):])
+		return sorted(names)
+
+	def tree(self):
+		folder_key = self.get_key("")
+		if folder_key != "":
+			folder_key = folder_key + "/"
+		file_paths = []
+		paginator = self.client.get_paginator("list_objects_v2")
+		for page in paginator.paginate(Bucket=self.bucket, Prefix=folder_key):
+			for content in page.get("Contents", []):
+				file_paths.append(content["Key"][len(folder_key):])
+
+		return build_tree(file_paths)
+
+#latest snapshot written by build_snapshot.py inside a folder of snapshot versions
+def get_latest_snapshot(directory):
+	versions = []
+	for version in os.listdir(directory):
+		if os.path.isfile(os.path.join(directory, version, "manifest.json")):
+			versions.append(version)
+	if len(versions) == 0:
+		raise FileNotFoundError("No snapshot found in {}".format(directory))
+
+	return os.path.join(directory, max(versions))
+
+#snapshot of an analysis repo written by build_snapshot.py, served without any network access
+class SnapshotDataSource(DataSource):
+	type = "snapshot"
+
+	def __init__(self, directory, version=None):
+		directory = os.path.abspath(os.path.expanduser(directory))
+		if version is not None:
+			directory = os.path.join(directory, version)
+		elif not os.path.isfile(os.path.join(directory, "manifest.json")):
+			directory = get_latest_snapshot(directory)
+		self.directory = directory
+		with open(os.path.join(directory, "manifest.json")) as f:
+			self.manifest = json.load(f)
+		self.tables = set(self.manifest["tables"])
+
+	def get_table_path(self, file_path):
+		return os.path.join(self.directory, "tables", normalize_path(file_path) + ".parquet")
+
+	#tables are also kept as the raw tsv, reads give back the original bytes
+	def read(self, file_path):
+		with self.open(file_path) as f:
+			return f.read()
+
+	def open(self, file_path):
+		return open(os.path.join(self.directory, "files", normalize_path(file_path)), "rb")
+
+	def list(self, folder_path):
+		folder_path = normalize_path(folder_path)
+		if folder_path not in self.manifest["tree"]:
+			raise FileNotFoundError(folder_path)
+		return list(self.manifest["tree"][folder_path])
+
+	def tree(self):
+		return self.manifest["tree"]
+
+	def read_table(self, file_path):
+		file_path = normalize_path(file_path)
+		if file_path not in self.tables:
+			return None
+		table = pd.read_parquet(self.get_table_path(file_path))
+		#parquet gives None for missing text, read_csv gives NaN
+		for column in table.columns:
+			if table[column].dtype == object:
+				table[column] = table[column].fillna(np.nan)
+
+		return table
+
+	def get_counts_store_path(self, expression_dataset):
+		if expression_dataset in self.manifest["counts"]:
+			return os.path.join(self.directory, "counts", expression_dataset)
+		return None
+
+	def read_feature_labels(self, expression_dataset):
+		if expression_dataset in self.manifest.get("feature_labels", []):
+			return pd.read_parquet(os.path.join(self.directory, "feature_labels", expression_dataset + ".parquet"))
+		return None
+
+	def read_manifest(self):
+		return self.manifest
+
+#folder listings of a data source kept in memory and refreshed after ttl seconds
+class TreeIndex:
+	def __init__(self, data_source, ttl):
+		self.data_source = data_source
+		self.ttl = ttl
+		self.folders = None
+		self.built_at = None
+		self.lock = threading.Lock()
+		#only one request rebuilds the index when it expires
+		self.refresh_lock = threading.Lock()
+
+	def refresh(self):
+		folders = self.data_source.tree()
+		#backends without a full tree are listed folder by folder
+		if folders is None:
+			folders = {}
+		with self.lock:
+			self.folders = folders
+			self.built_at = time.time()
+
+	def is_expired(self):
+		return self.built_at is None or time.time() - self.built_at > self.ttl
+
+	def list(self, folder_path):
+		if self.is_expired():
+			with self.refresh_lock:
+				if self.is_expired():
+					self.refresh()
+		folder_path = normalize_path(folder_path)
+		with self.lock:
+			names = self.folders.get(folder_path)
+		if names is None:
+			names = self.data_source.list(folder_path)
+			with self.lock:
+				self.folders[folder_path] = names
+
+		return list(names)
+
+#folders of a dataset which are not stringencies
+dataset_folders = ["counts", "dge", "mds", "gsea"]
+
+#description of an analysis repo built from its folder listings
+def build_manifest(tree_index):
+	manifest = {
+		"folders": tree_index.list(""),
+		"datasets": {},
+		"mofa": [],
+		"deconvolution": []
+	}
+	if "data" in manifest["folders"]:
+		for dataset in tree_index.list("data"):
+			folders = tree_index.list("data/" + dataset)
+			dataset_manifest = {
+				"folders": folders,
+				"mds": [],
+				"contrasts": [],
+				"stringencies": [folder for folder in folders if folder not in dataset_folders],
+				"gsea": "gsea" in folders
+			}
+			if "mds" in folders:
+				dataset_manifest["mds"] = [mds_file.split(".")[0] for mds_file in tree_index.list("data/" + dataset + "/mds")]
+			if "dge" in folders:
+				dataset_manifest["contrasts"] = [dge_file.split("/")[-1].split(".")[0] for dge_file in tree_index.list("data/" + dataset + "/dge")]
+			manifest["datasets"][dataset] = dataset_manifest
+	for folder in ["mofa", "deconvolution"]:
+		if folder in manifest["folders"]:
+			manifest[folder] = tree_index.list(folder)
+
+	return manifest
+
+#manifest of a repo loaded once, from the backend, a manifest.json in the repo or the folder listings
+#it is loaded again after ttl seconds or as soon as a local manifest file changes
+class ManifestIndex:
+	def __init__(self, data_source, tree_index, ttl):
+		self.data_source = data_source
+		self.tree_index = tree_index
+		self.ttl = ttl
+		self.manifest = None
+		self.mtime = None
+		self.built_at = None
+		#incremented every time the manifest is loaded
+		self.version = 0
+		self.lock = threading.Lock()
+
+	def refresh(self):
+		mtime = self.data_source.get_mtime("manifest.json")
+		manifest = self.data_source.read_manifest()
+		if manifest is None:
+			#new listings for the new manifest
+			if self.built_at is not None:
+				self.tree_index.refresh()
+			if "manifest.json" in self.tree_index.list(""):
+				manifest = json.loads(self.data_source.read("manifest.json"))
+			else:
+				manifest = build_manifest(self.tree_index)
+		self.manifest = manifest
+		self.mtime = mtime
+		self.built_at = time.time()
+		self.version += 1
+
+	def is_expired(self):
+		if self.built_at is None or time.time() - self.built_at > self.ttl:
+			return True
+		return self.mtime is not None and self.data_source.get_mtime("manifest.json") != self.mtime
+
+	def get(self):
+		if self.is_expired():
+			with self.lock:
+				if self.is_expired():
+					self.refresh()
+
+		return self.manifest
+
+	#indexes built from the repo files are built again for a new version
+	def get_version(self):
+		self.get()
+
+		return self.version
+
+#create the data source of a repo from its config, github is the default
+def create_data_source(path, source_config, http_session, github_session, http_cache_directory=None):
+	if source_config is None:
+		source_config = {}
+	source_type = source_config.get("type", "github")
+	if source_type == "github":
+		data_source = GitHubDataSource(path, http_session, github_session, http_cache_directory)
+	elif source_type == "local":
+		data_source = LocalDataSource(source_config["directory"])
+	elif source_type == "archive":
+		data_source = ArchiveDataSource(source_config["archive"], source_config.get("prefix"))
+	elif source_type == "snapshot":
+		data_source = SnapshotDataSource(source_config["directory"], source_config.get("version"))
+	elif source_type == "s3":
+		data_source = S3DataSource(source_config["bucket"], source_config.get("prefix", ""), source_config.get("endpoint_url"), source_config.get("region_name"), source_config.get("access_key"), source_config.get("secret_key"))
+	else:
+		raise ValueError("Unknown data source type: {}".format(source_type))
+
+	return data_source
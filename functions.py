@@ -4,13 +4,26 @@ import plotly.graph_objects as go
 import requests
 import re
 import yaml
-from io import StringIO
+from io import BytesIO
 from github import Github
 from dash.dash_table.Format import Format, Scheme
 from dash.exceptions import PreventUpdate
 from dash import html, dcc
 import tempfile
 import gzip
+import threading
+import bisect
+import os
+import shutil
+from functools import reduce
+import scipy.cluster.hierarchy as sch
+from scipy.spatial.distance import pdist
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+from requests.adapters import HTTPAdapter
+import data_sources as data_sources_module
+import projections
 
 #read config file
 config = open("config.yaml")
@@ -41,35 +54,384 @@ github_session = requests.Session()
 github_username = config["github"]["username"]
 github_token = config["github"]["token"]
 github_session.auth = (github_username, github_token)
+#connection pool large enough for concurrent downloads
+github_session.mount("https://", HTTPAdapter(pool_connections=config["download_threads"], pool_maxsize=config["download_threads"]))
 session = Github(github_token)
 
-#function for downloading files from GitHub
-def download_from_github(path, file_url):
-	file_url = "https://raw.githubusercontent.com/" + path + file_url
-	download = github_session.get(file_url).content
+#data source of each repo, github is used when no source is set in the config
+data_sources = {}
+for repo in repos:
+	data_sources[config["repos"][repo]["path"]] = data_sources_module.create_data_source(config["repos"][repo]["path"], config["repos"][repo].get("source"), github_session, session, config["cache"]["http_cache_directory"])
+
+#function for downloading files from the repo data source
+#the file is streamed as bytes and gzip data is decompressed while it is read, pd.read_csv parses it directly
+#builders pass the data source of a local checkout, the app reads from the source of the repo
+def download_from_github(path, file_url, data_source=None):
+	if data_source is None:
+		data_source = data_sources[path]
+	df_downloaded_data = data_source.open(file_url)
 	#decompress gzip data
 	if file_url.split(".")[-1] == "gz":
-		download = gzip.decompress(download)
-	#read the downloaded content and make a pandas dataframe
-	df_downloaded_data = StringIO(download.decode('utf-8'))
+		df_downloaded_data = gzip.GzipFile(fileobj=df_downloaded_data)
 
 	return df_downloaded_data
 
-#function to list GitHub repo content of a folder
+#bounded pool shared by all batched downloads
+download_executor = ThreadPoolExecutor(max_workers=config["download_threads"], thread_name_prefix="download")
+
+#run a function on each file concurrently, results are in the same order of the files
+#files which can not be read are reported all together
+def map_files(function, path, file_urls):
+	futures = [download_executor.submit(function, path, file_url) for file_url in file_urls]
+	results = []
+	errors = []
+	for file_url, future in zip(file_urls, futures):
+		try:
+			results.append(future.result())
+		except Exception as e:
+			errors.append("{}: {}".format(file_url, e))
+	if len(errors) > 0:
+		raise IOError("Could not read {} files from {}\n".format(len(errors), path) + "\n".join(errors))
+
+	return results
+
+#download many files concurrently, each file is read in full by its thread
+def download_many(path, file_urls, data_source=None):
+	return map_files(lambda path, file_url: BytesIO(download_from_github(path, file_url, data_source).read()), path, file_urls)
+
+#folder listings of each repo, built once from the whole repo tree
+tree_indexes = {}
+for path in data_sources:
+	tree_indexes[path] = data_sources_module.TreeIndex(data_sources[path], config["cache"]["tree_index_ttl"])
+
+#function to list repo content of a folder
 def get_content_from_github(path, folder_path):
-	dirs = []
-	match = re.match(r"(.+/.+)/(.+)/", path)
-	github_repo_name = match.group(1)
-	github_branch_name = match.group(2)
-	if github_branch_name == "master":
-		github_branch_name = "main"
-	repo = session.get_repo(github_repo_name, lazy=False)
-	contents = repo.get_contents(folder_path, ref=github_branch_name)
-	for folder in contents:
-		folder = folder.name
-		dirs.append(folder)
+	dirs = tree_indexes[path].list(folder_path)
 	return dirs
 
+#datasets, mds types, contrasts, stringencies, mofa contrasts and deconvolution files of each repo
+manifests = {}
+for path in data_sources:
+	manifests[path] = data_sources_module.ManifestIndex(data_sources[path], tree_indexes[path], config["cache"]["manifest_ttl"])
+
+def get_manifest(path):
+	return manifests[path].get()
+
+#changes every time the manifest of a repo is loaded again, after manifest_ttl seconds or when a local manifest file changes
+def get_manifest_version(path):
+	return manifests[path].get_version()
+
+#lru cache of parsed dataframes and of the indexes built from them, bounded by their memory footprint
+class DataFrameCache:
+	def __init__(self, max_bytes):
+		self.max_bytes = max_bytes
+		self.entries = OrderedDict()
+		self.total_bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.lock = threading.Lock()
+
+	def get(self, key):
+		with self.lock:
+			if key not in self.entries:
+				self.misses += 1
+				return None
+			self.hits += 1
+			self.entries.move_to_end(key)
+			return self.entries[key][0]
+
+	#indexes built from tables are stored with the size of their tables
+	def put(self, key, df, size=None):
+		if size is None:
+			size = int(df.memory_usage(index=True, deep=True).sum())
+		with self.lock:
+			if key in self.entries:
+				self.total_bytes -= self.entries.pop(key)[1]
+			#tables bigger than the whole cache are not stored
+			if size > self.max_bytes:
+				return
+			self.entries[key] = (df, size)
+			self.total_bytes += size
+			#evict least recently used tables
+			while self.total_bytes > self.max_bytes:
+				evicted_key, (evicted_df, evicted_size) = self.entries.popitem(last=False)
+				self.total_bytes -= evicted_size
+				self.evictions += 1
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.total_bytes = 0
+			self.hits = 0
+			self.misses = 0
+			self.evictions = 0
+
+	def stats(self):
+		with self.lock:
+			return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.entries), "bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+dataframe_cache = DataFrameCache(config["cache"]["dataframe_cache_size"] * 1024 * 1024)
+
+#dtypes of the known kinds of tsv files, columns which are not listed are inferred by pandas
+#text columns of tables edited with whole table regular expressions stay object, only their numeric columns are compact
+#metadata.tsv is not listed: its columns are chosen by each analysis and discrete and continuous metadata are told apart by dtype
+#p-values stay float64 because thresholds and exponent formatting need the full precision
+tsv_schemas = [
+	(re.compile(r"^data/[^/]+/dge/[^/]+\.diffexp\.tsv$"), {"baseMean": "float32", "log2FoldChange": "float32", "lfcSE": "float32", "stat": "float32"}),
+	(re.compile(r"^data/[^/]+/[^/]+/[^/]+\.merged_go\.tsv$"), {"DGE": "category"}),
+	(re.compile(r"^data/[^/]+/counts/[^/]+\.tsv$"), {"counts": "float32"}),
+	(re.compile(r"^data/[^/]+/mds/[^/]+\.tsv$"), {"x": "float32", "y": "float32", "UMAP1": "float32", "UMAP2": "float32"}),
+	(re.compile(r"^diversity/[^/]+/[^/]+\.tsv$"), {"Shannon_index": "float32", "Simpson_index": "float32"}),
+	(re.compile(r"^mofa/[^/]+/weights\.tsv$"), {"view": "category", "factor": "category", "value": "float32"}),
+	(re.compile(r"^mofa/[^/]+/factors\.tsv$"), {"value": "float32"}),
+	(re.compile(r"^mofa/[^/]+/data_overview\.tsv$"), {"group": "category", "view": "category"}),
+	(re.compile(r"^deconvolution/[^/]+$"), {"Cell type": "category", "Proportion": "float32"}),
+	(re.compile(r"^sankey\.tsv$"), {"source": "int32", "target": "int32", "n": "int32"})
+]
+
+#tables with a column for each mofa view, all their float columns are float32
+float32_tables = [re.compile(r"^mofa/[^/]+/variance_explained_heatmap\.tsv$")]
+
+#dtypes of a tsv file, None if it is not a known kind
+def get_tsv_schema(file_url):
+	for file_regex, schema in tsv_schemas:
+		if file_regex.match(file_url):
+			return schema
+
+	return None
+
+#float32 columns as float64 rounded to the 7 significant digits float32 keeps, for tables shown or exported with all digits
+def widen_float32_columns(df):
+	columns = [column for column in df.columns if df[column].dtype == np.float32]
+	if len(columns) == 0:
+		return df
+	values = df[columns].to_numpy(dtype=np.float64)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		exponents = np.floor(np.log10(np.abs(values)))
+	scales = 10.0 ** np.where(np.isfinite(exponents), 6 - exponents, 0)
+	values = np.round(values * scales) / scales
+
+	return df.assign(**{column: values[:, i] for i, column in enumerate(columns)})
+
+#cached tables are shared by every request, their arrays are made read only so that writing values in place raises instead of changing the cache
+def set_read_only(df):
+	for array in df._mgr.arrays:
+		#numpy columns, or the numpy arrays inside categorical, string and nullable columns
+		for values in [array, getattr(array, "_ndarray", None), getattr(array, "_data", None), getattr(array, "_mask", None)]:
+			if isinstance(values, np.ndarray):
+				values.flags.writeable = False
+
+	return df
+
+#cache key of a table, tables are read again once the manifest of the repo is loaded again so that changed files are seen
+def get_table_key(path, file_url, read_options, manifest_version):
+	return (path, file_url, repr(sorted(read_options.items())), manifest_version)
+
+#read a tsv from the repo data source, parsed tables are cached and shared between callers
+#callers get a shallow copy of the cached table: assigning columns only changes their copy and writing values in place raises, callers which do it must copy the table first
+def read_tsv(path, file_url, **read_options):
+	key = get_table_key(path, file_url, read_options, get_manifest_version(path))
+	df = dataframe_cache.get(key)
+	if df is None:
+		schema = get_tsv_schema(file_url)
+		#snapshots ship some tables already parsed
+		if len(read_options) == 0:
+			df = data_sources[path].read_table(file_url)
+			if df is not None and schema is not None:
+				df = df.astype({column: dtype for column, dtype in schema.items() if column in df.columns})
+		if df is None:
+			if schema is not None and "dtype" not in read_options:
+				read_options = dict(read_options, dtype=schema)
+			with download_from_github(path, file_url) as f:
+				df = pd.read_csv(f, sep="\t", **read_options)
+		if any(file_regex.match(file_url) for file_regex in float32_tables):
+			df = df.astype({column: "float32" for column in df.columns if df[column].dtype == np.float64})
+		#categories in alphabetical order, so that groupby and sorting behave as with text columns
+		for column in df.columns:
+			if df[column].dtype.name == "category":
+				df[column] = df[column].cat.set_categories(sorted(df[column].cat.categories))
+		dataframe_cache.put(key, set_read_only(df))
+
+	return df.copy(deep=False)
+
+#read many tsv files concurrently, only the files missing from the cache are downloaded, the dataframes are shallow copies as in read_tsv
+def read_tsv_many(path, file_urls, **read_options):
+	dfs = {}
+	missing_file_urls = []
+	manifest_version = get_manifest_version(path)
+	for file_url in file_urls:
+		df = dataframe_cache.get(get_table_key(path, file_url, read_options, manifest_version))
+		if df is not None:
+			dfs[file_url] = df.copy(deep=False)
+		elif file_url not in missing_file_urls:
+			missing_file_urls.append(file_url)
+	if len(missing_file_urls) > 0:
+		for file_url, df in zip(missing_file_urls, map_files(lambda path, file_url: read_tsv(path, file_url, **read_options), path, missing_file_urls)):
+			dfs[file_url] = df
+
+	return [dfs[file_url] for file_url in file_urls]
+
+#file with the list of features of a dataset
+def get_feature_list_file(expression_dataset):
+	if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
+		feature_list_file = "data/" + expression_dataset + "/counts/genes_list.tsv"
+	elif "lipid" in expression_dataset:
+		feature_list_file = "data/" + expression_dataset + "/counts/lipid_list.tsv"
+	else:
+		feature_list_file = "data/" + expression_dataset + "/counts/feature_list.tsv"
+
+	return feature_list_file
+
+#folder of the consolidated counts of a dataset
+def get_counts_store_path(path, expression_dataset):
+	#snapshots ship their own counts
+	store_path = data_sources[path].get_counts_store_path(expression_dataset)
+	if store_path is None:
+		repo_folder = path.strip("/").replace("/", "_")
+		store_path = os.path.join(config["counts_store_directory"], repo_folder, expression_dataset)
+
+	return store_path
+
+#log2 of counts, zero counts are set to 0
+def get_log2_counts(values):
+	with np.errstate(divide="ignore"):
+		log2_values = np.log2(values)
+	log2_values[np.isneginf(log2_values)] = 0
+
+	return log2_values
+
+#z-score of each feature (column) ignoring missing samples, constant features are only centered
+def get_zscore(values):
+	with np.errstate(invalid="ignore"):
+		mean = np.nanmean(values, axis=0)
+		std = np.nanstd(values, axis=0)
+	std[std == 0] = 1
+
+	return (values - mean) / std
+
+#matrices saved in a counts store
+counts_store_layers = ["counts", "log2", "zscore"]
+
+#pack the counts of all features of a dataset in a single samples x features float32 matrix, with log2 and z-scored log2 layers
+def build_counts_store(path, expression_dataset, store_path=None, data_source=None):
+	with download_from_github(path, get_feature_list_file(expression_dataset), data_source) as f:
+		features = pd.read_csv(f, sep="\t", header=None, names=["feature"])
+	features = features["feature"].tolist()
+
+	#single feature files are not kept in the dataframe cache, they are downloaded in batches
+	samples = {}
+	columns = []
+	batch_size = config["download_threads"] * 8
+	for i in range(0, len(features), batch_size):
+		feature_files = ["data/" + expression_dataset + "/counts/" + feature + ".tsv" for feature in features[i:i + batch_size]]
+		for counts in download_many(path, feature_files, data_source):
+			counts = pd.read_csv(counts, sep="\t")
+			for sample in counts["sample"]:
+				if sample not in samples:
+					samples[sample] = len(samples)
+			columns.append((counts["sample"].map(samples).to_numpy(), counts["counts"].to_numpy()))
+
+	#samples missing from a feature file are NaN, column major so that a feature is a contiguous block
+	matrix = np.full((len(samples), len(features)), np.nan, dtype=np.float32, order="F")
+	for i, (rows, values) in enumerate(columns):
+		matrix[rows, i] = values
+
+	#write in a temporary folder and swap it with the old store
+	if store_path is None:
+		store_path = get_counts_store_path(path, expression_dataset)
+	os.makedirs(os.path.dirname(store_path), exist_ok=True)
+	temporary_path = tempfile.mkdtemp(dir=os.path.dirname(store_path))
+	np.save(os.path.join(temporary_path, "counts.npy"), matrix)
+	log2_matrix = get_log2_counts(matrix)
+	np.save(os.path.join(temporary_path, "log2.npy"), log2_matrix)
+	np.save(os.path.join(temporary_path, "zscore.npy"), np.asfortranarray(get_zscore(log2_matrix), dtype=np.float32))
+	pd.Series(list(samples.keys())).to_csv(os.path.join(temporary_path, "samples.tsv"), sep="\t", index=False, header=False)
+	pd.Series(features).to_csv(os.path.join(temporary_path, "features.tsv"), sep="\t", index=False, header=False)
+	if os.path.exists(store_path):
+		shutil.rmtree(store_path)
+	os.rename(temporary_path, store_path)
+
+	return store_path
+
+#memory mapped counts stores, reloaded when the store is rebuilt
+counts_stores = {}
+counts_stores_lock = threading.Lock()
+
+def load_counts_store(path, expression_dataset):
+	store_path = get_counts_store_path(path, expression_dataset)
+	counts_file = os.path.join(store_path, "counts.npy")
+	if not os.path.exists(counts_file):
+		return None
+	modified_time = os.path.getmtime(counts_file)
+	with counts_stores_lock:
+		store = counts_stores.get((path, expression_dataset))
+		if store is None or store["modified_time"] != modified_time:
+			samples = pd.read_csv(os.path.join(store_path, "samples.tsv"), sep="\t", header=None, names=["sample"])
+			features = pd.read_csv(os.path.join(store_path, "features.tsv"), sep="\t", header=None, names=["feature"])
+			features = features["feature"].tolist()
+			store = {
+				"modified_time": modified_time,
+				"samples": samples["sample"].to_numpy(),
+				"feature_index": {feature: i for i, feature in enumerate(features)}
+			}
+			#stores built before the layers were added only have counts
+			for layer in counts_store_layers:
+				layer_file = os.path.join(store_path, layer + ".npy")
+				if os.path.exists(layer_file):
+					store[layer] = np.load(layer_file, mmap_mode="r")
+			counts_stores[(path, expression_dataset)] = store
+
+	return store
+
+#counts of some features as a dataframe with a sample column and a column per feature, only samples with counts for all features are kept
+#layer can be counts, log2 (zero counts set to 0) or zscore (z-score of log2 values of each feature)
+def get_counts(path, expression_dataset, features, layer="counts"):
+	store = load_counts_store(path, expression_dataset)
+	if store is not None and all(feature in store["feature_index"] for feature in features):
+		columns = [store["feature_index"][feature] for feature in features]
+		if layer in store:
+			values = store[layer][:, columns].astype(np.float64)
+		#old store without layers
+		else:
+			values = store["counts"][:, columns].astype(np.float64)
+			if layer in ["log2", "zscore"]:
+				values = get_log2_counts(values)
+		#missing counts are NaN in every layer
+		rows = ~np.isnan(values).any(axis=1)
+		#stored z-scores use all samples of a feature, they are computed again when some samples lack counts for one of the features
+		if layer == "zscore" and (layer not in store or not rows.all()):
+			if "log2" in store:
+				values = store["log2"][:, columns].astype(np.float64)
+			else:
+				values = get_log2_counts(store["counts"][:, columns].astype(np.float64))
+			values[rows] = get_zscore(values[rows])
+		counts = pd.DataFrame(values[rows], columns=features)
+		counts.insert(0, "sample", store["samples"][rows])
+	#no store, use single feature files
+	else:
+		counts_df_list = []
+		feature_files = ["data/" + expression_dataset + "/counts/" + feature + ".tsv" for feature in features]
+		for feature, counts in zip(features, read_tsv_many(path, feature_files)):
+			counts = counts[["sample", "counts"]].rename(columns={"counts": feature})
+			counts_df_list.append(counts)
+		counts = reduce(lambda x, y: pd.merge(x, y, on = "sample"), counts_df_list)
+		counts[features] = counts[features].astype(np.float64)
+		if layer in ["log2", "zscore"]:
+			counts[features] = get_log2_counts(counts[features].to_numpy(dtype=np.float64))
+		if layer == "zscore":
+			counts[features] = get_zscore(counts[features].to_numpy(dtype=np.float64))
+
+	return counts
+
+#counts of each feature in a separate dataframe, as get_counts(path, expression_dataset, [feature], layer) but with the files downloaded concurrently
+def get_counts_many(path, expression_dataset, features, layer="counts"):
+	store = load_counts_store(path, expression_dataset)
+	if store is None or not all(feature in store["feature_index"] for feature in features):
+		read_tsv_many(path, ["data/" + expression_dataset + "/counts/" + feature + ".tsv" for feature in features])
+
+	return [get_counts(path, expression_dataset, [feature], layer) for feature in features]
+
 #get repo name from path
 def get_repo_name_from_path(path, repos):
 	for repo in repos:
@@ -130,45 +492,438 @@ def get_list_label_placeholder_feature_dropdown(path, expression_dataset):
 			placeholder = "Type here to search {}".format(expression_dataset.replace("_", " ").replace("order", "orders").replace("family", "families"))
 			label = expression_dataset.capitalize().replace("_", " by ")
 
-	features = download_from_github(path, features)
-	features = pd.read_csv(features, sep = "\t", header=None, names=["feature"])
-	features = features["feature"].tolist()
+	features = get_feature_index(path, expression_dataset, features)
 	
 	return features, label, placeholder
 
+#dropdown labels of the features of a dataset
+def get_feature_labels(expression_dataset, features):
+	features = pd.Series(features, dtype=object).astype(str)
+	if expression_dataset in ["human", "mouse"]:
+		labels = features.str.replace("€", "/", regex=False)
+	elif "genes" in expression_dataset:
+		labels = features.str.split("@").str[0] + " - " + features.str.split("@").str[1].str.replace("_", " ", regex=False)
+	else:
+		labels = features.str.replace("_", " ", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
+
+	return labels.tolist()
+
+#feature labels of a dataset prepared once for searching
+class FeatureIndex:
+	def __init__(self, expression_dataset, features, labels=None):
+		self.expression_dataset = expression_dataset
+		self.features = features
+		self.feature_ids = {feature: i for i, feature in enumerate(features)}
+
+		#dropdown labels, snapshots ship them already cleaned
+		if labels is None:
+			labels = get_feature_labels(expression_dataset, features)
+		labels = pd.Series(labels, dtype=object)
+		self.labels = labels.tolist()
+		upper_labels = labels.str.upper().tolist()
+
+		#sorted labels for exact and prefix matches
+		self.sorted_ids = sorted(range(len(upper_labels)), key=upper_labels.__getitem__)
+		self.sorted_labels = [upper_labels[i] for i in self.sorted_ids]
+
+		#all labels in a single string for substring matches, offsets give back the feature of a match
+		self.text = "\n".join(upper_labels)
+		self.offsets = np.cumsum([0] + [len(label) + 1 for label in upper_labels])
+
+	#search value cleaned like the labels
+	def clean_search_value(self, search_value):
+		if self.expression_dataset in ["human", "mouse"]:
+			search_value = search_value.replace("€", "/")
+		elif "genes" in self.expression_dataset:
+			if "@" in search_value:
+				search_gene = search_value.split("@")[0]
+				search_beast = search_value.split("@")[1]
+				search_beast = search_beast.replace("_", " ")
+				search_value = search_gene + " - " + search_beast
+		else:
+			search_value = search_value.replace("_", " ").replace("[", "").replace("]", "")
+
+		return search_value.upper()
+
+	#ids of the features matching the search, labels starting with the search come first
+	def search(self, search_value, max_results):
+		search_value = self.clean_search_value(search_value)
+		feature_ids = []
+
+		#exact and prefix matches
+		i = bisect.bisect_left(self.sorted_labels, search_value)
+		while i < len(self.sorted_labels) and len(feature_ids) < max_results and self.sorted_labels[i].startswith(search_value):
+			feature_ids.append(self.sorted_ids[i])
+			i += 1
+
+		#labels containing the search anywhere else
+		found_ids = set(feature_ids)
+		position = self.text.find(search_value)
+		while position != -1 and len(feature_ids) < max_results:
+			feature_id = int(np.searchsorted(self.offsets, position, side="right")) - 1
+			if feature_id not in found_ids:
+				feature_ids.append(feature_id)
+				found_ids.add(feature_id)
+			position = self.text.find(search_value, self.offsets[feature_id + 1])
+
+		return feature_ids
+
+	def get_label(self, feature):
+		if feature in self.feature_ids:
+			return self.labels[self.feature_ids[feature]]
+		else:
+			return feature
+
+	#approximate bytes of the features, the labels, the search text and the lookups
+	def get_size(self):
+		features_size = pd.Series(self.features, dtype=object).memory_usage(deep=True) + pd.Series(self.labels, dtype=object).memory_usage(deep=True)
+
+		return int(features_size) + len(self.text) + self.offsets.nbytes + len(self.features) * 100
+
+#feature indexes are kept in the tables cache, they are built again when the manifest is loaded again
+def get_feature_index(path, expression_dataset, feature_list_file):
+	key = ("feature_index", path, expression_dataset, get_manifest_version(path))
+	feature_index = dataframe_cache.get(key)
+	if feature_index is None:
+		#snapshots ship the features with their cleaned labels
+		feature_labels = data_sources[path].read_feature_labels(expression_dataset)
+		if feature_labels is not None:
+			feature_index = FeatureIndex(expression_dataset, feature_labels["feature"].tolist(), feature_labels["label"].tolist())
+		else:
+			features = read_tsv(path, feature_list_file, header=None, names=["feature"])
+			feature_index = FeatureIndex(expression_dataset, features["feature"].tolist())
+		dataframe_cache.put(key, feature_index, feature_index.get_size())
+
+	return feature_index
+
+#columns never shown in hover labels
+hover_excluded_columns = ["control", "counts", "fq1", "fq2", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]
+
+#columns shown in hover labels and their hovertemplate lines, values are sent once as customdata
+def get_hover_columns(columns):
+	hover_columns = [column for column in columns if column not in hover_excluded_columns]
+	hovertemplate = ""
+	for i, column in enumerate(hover_columns):
+		hovertemplate += "{label}: %{{customdata[{i}]}}<br>".format(label=column.replace("_", " ").capitalize(), i=i)
+
+	return hover_columns, hovertemplate
+
+#customdata and hovertemplate showing every column of a frame
+def get_hover_data(df):
+	hover_columns, hovertemplate = get_hover_columns(df.columns)
+	custom_data = df[hover_columns].fillna("NA").to_numpy()
+
+	return custom_data, hovertemplate + "<extra></extra>"
+
+#metadata of an analysis cleaned once, samples are filtered with boolean masks
+class AnalysisMetadata:
+	#columns not shown in color by and annotation dropdowns
+	excluded_columns = ["sample", "fq1", "fq2", "control", "analysis_path", "host", "metatranscriptomics", "immune_profiling"]
+
+	def __init__(self, metadata, sorted_conditions, condition_list):
+		#shared by every request as the cached tables
+		self.metadata = metadata
+		self.clean = set_read_only(metadata.replace("_", " ", regex=True))
+		self.clean_with_NA = set_read_only(self.clean.fillna("NA"))
+		self.sample_ids = {sample: i for i, sample in enumerate(self.clean["sample"])}
+
+		#discrete and continuous metadata columns
+		self.columns = [column for column in self.clean.columns if column not in self.excluded_columns]
+		self.discrete_columns = [column for column in self.columns if str(self.clean.dtypes[column]) == "object"]
+		self.continuous_columns = [column for column in self.columns if column not in self.discrete_columns]
+
+		#hover data of each sample, values rounded like in boxplots
+		self.hover_columns, self.hovertemplate = get_hover_columns(self.clean_with_NA.columns)
+		self.hover_data = self.clean_with_NA[self.hover_columns].round(2).to_numpy()
+
+		#user defined list of conditions or alphabetical order
+		if sorted_conditions:
+			self.conditions = [condition.replace("_", " ") for condition in condition_list]
+		else:
+			self.conditions = self.clean_with_NA["condition"].unique().tolist()
+			self.conditions.sort()
+
+		#samples of each condition
+		conditions = self.clean_with_NA["condition"].to_numpy()
+		self.condition_masks = {condition: conditions == condition for condition in self.clean_with_NA["condition"].unique()}
+
+	#samples in any of the conditions, conditions are written with spaces
+	def get_condition_mask(self, conditions):
+		mask = np.zeros(len(self.clean), dtype=bool)
+		for condition in conditions:
+			if condition in self.condition_masks:
+				mask |= self.condition_masks[condition]
+
+		return mask
+
+	#samples in the list, in metadata order
+	def get_sample_mask(self, samples):
+		mask = np.zeros(len(self.clean), dtype=bool)
+		mask[[self.sample_ids[sample] for sample in samples if sample in self.sample_ids]] = True
+
+		return mask
+
+	#customdata of the samples and hovertemplate, optionally followed by a line with the y values
+	def get_hover_data(self, samples, value_column=None):
+		custom_data = self.hover_data[[self.sample_ids[sample] for sample in samples]]
+		hovertemplate = self.hovertemplate
+		if value_column is not None:
+			hovertemplate += value_column.replace("_", " ").capitalize() + ": %{y}<br>"
+
+		return custom_data, hovertemplate + "<extra></extra>"
+
+	#samples having any of the values in a column, values are written as in metadata.tsv
+	def get_mask(self, column, values):
+		values = [value.replace("_", " ") for value in values]
+
+		return self.clean[column].isin(values).to_numpy()
+
+	#copy of the cleaned metadata, optionally with missing values as NA and filtered by a mask
+	def get_metadata(self, mask=None, with_NA=False):
+		if with_NA:
+			metadata = self.clean_with_NA
+		else:
+			metadata = self.clean
+		if mask is not None:
+			metadata = metadata[mask]
+
+		return metadata.copy()
+
+	#bytes of the metadata tables and of the hover data
+	def get_size(self):
+		frames_size = sum(df.memory_usage(index=True, deep=True).sum() for df in [self.metadata, self.clean, self.clean_with_NA])
+
+		return int(frames_size) + self.hover_data.nbytes
+
+#analysis metadata are kept in the tables cache, they are built again when the manifest is loaded again
+def get_analysis_metadata(path):
+	key = ("analysis_metadata", path, get_manifest_version(path))
+	analysis_metadata = dataframe_cache.get(key)
+	if analysis_metadata is None:
+		repo = get_repo_name_from_path(path, repos)
+		metadata = read_tsv(path, "metadata.tsv")
+		analysis_metadata = AnalysisMetadata(metadata, config["repos"][repo]["sorted_conditions"], config["repos"][repo]["condition_list"])
+		dataframe_cache.put(key, analysis_metadata, analysis_metadata.get_size())
+
+	return analysis_metadata
+
+#complete linkage clustering of the rows of a matrix, drawn like plotly dendrograms
+class Dendrogram:
+	def __init__(self, matrix, labels, optimal_ordering):
+		self.linkage = sch.linkage(pdist(matrix), "complete", optimal_ordering=optimal_ordering)
+		dendrogram = sch.dendrogram(self.linkage, labels=labels, no_plot=True)
+		self.leaves = dendrogram["leaves"]
+		self.labels = list(dendrogram["ivl"])
+		self.icoord = np.array(dendrogram["icoord"])
+		self.dcoord = np.array(dendrogram["dcoord"])
+		#leaves are 10 units apart
+		self.tickvals = [5.0 + 10.0 * i for i in range(len(self.labels))]
+
+	#a line trace for each link, left dendrograms grow towards negative y like in plotly
+	def get_traces(self, orientation, color, xaxis, yaxis):
+		traces = []
+		for icoord, dcoord in zip(self.icoord, self.dcoord):
+			if orientation == "bottom":
+				x = icoord
+				y = dcoord
+			else:
+				x = dcoord
+				y = -icoord
+			traces.append(go.Scatter(x=x, y=y, mode="lines", marker_color=color, hoverinfo="text", xaxis=xaxis, yaxis=yaxis, showlegend=False))
+
+		return traces
+
+	def get_tickvals(self, orientation):
+		if orientation == "bottom":
+			return self.tickvals
+		else:
+			return [-tickval for tickval in self.tickvals]
+
+#dendrograms of the last clustered heatmaps
+dendrograms = OrderedDict()
+dendrograms_lock = threading.Lock()
+
+#dendrogram of the rows of a dataframe, rows and columns are sorted so that the same features and samples are clustered once
+def get_dendrogram(path, expression_dataset, layer, df):
+	rows = sorted(df.index)
+	columns = sorted(df.columns)
+	key = (path, expression_dataset, layer, tuple(rows), tuple(columns), get_manifest_version(path))
+	with dendrograms_lock:
+		dendrogram = dendrograms.get(key)
+		if dendrogram is not None:
+			dendrograms.move_to_end(key)
+	if dendrogram is None:
+		df = df.reindex(index=rows, columns=columns)
+		dendrogram = Dendrogram(df.values, rows, config["dendrogram_optimal_ordering"])
+		with dendrograms_lock:
+			dendrograms[key] = dendrogram
+			while len(dendrograms) > config["cache"]["dendrogram_cache_size"]:
+				dendrograms.popitem(last=False)
+
+	return dendrogram
+
+#rows ordered by their score on the first principal component, similar rows end up next to each other without clustering every row
+def get_principal_component_order(df):
+	values = np.nan_to_num(df.to_numpy(dtype=np.float64))
+	values = values - values.mean(axis=0)
+	#first eigenvector of the covariance of the columns, the small side of a heatmap with many rows
+	eigenvalues, eigenvectors = np.linalg.eigh(values.T @ values)
+	scores = values @ eigenvectors[:, -1]
+
+	return df.index[np.argsort(scores, kind="stable")].tolist()
+
+#consecutive rows of an ordered heatmap averaged in at most max_rows bins, labelled by their first and last feature
+def bin_heatmap_rows(heat_data, max_rows):
+	bins = np.arange(len(heat_data)) * max_rows // len(heat_data)
+	binned_data = heat_data.groupby(bins).mean()
+	labels = []
+	for features in pd.Series(heat_data.index).groupby(bins):
+		features = features[1].tolist()
+		if len(features) == 1:
+			labels.append(features[0])
+		else:
+			labels.append("{first} ... {last} ({n})".format(first=features[0], last=features[-1], n=len(features)))
+	binned_data.index = labels
+
+	return binned_data
+
 #get options based on user search features dropdown
 def get_options_feature_dropdown(expression_dataset, features, search_value, current_value, dropdown_type):
 	options = []
 	if search_value is not None:
-		for feature in features:
-			#get feature label
-			if expression_dataset in ["human", "mouse"]:
-				feature_label = feature.replace("€", "/")
-				search_value = search_value.replace("€", "/")
-			elif "genes" in expression_dataset:
-				feature_gene = feature.split("@")[0]
-				feature_beast = feature.split("@")[1]
-				feature_beast = feature_beast.replace("_", " ")
-				feature_label = feature_gene + " - " + feature_beast
-				if "@" in search_value:
-					search_gene = search_value.split("@")[0]
-					search_beast = search_value.split("@")[1]
-					search_beast = search_beast.replace("_", " ")
-					search_value = search_gene + " - " + search_beast
-			else:
-				feature_label = feature.replace("_", " ").replace("[", "").replace("]", "")
-				search_value = search_value.replace("_", " ").replace("[", "").replace("]", "")
-
-			#single and multidropdown
-			if dropdown_type == "single":
-				if search_value.upper() in feature_label.upper():
-					options.append({"label": feature_label, "value": feature})
-			elif dropdown_type == "multi":
-				if search_value.upper() in feature_label.upper() or feature in (current_value or []):
-					options.append({"label": feature_label, "value": feature})
+		for feature_id in features.search(search_value, config["max_feature_dropdown_options"]):
+			options.append({"label": features.labels[feature_id], "value": features.features[feature_id]})
+
+		#selected features in multidropdowns are always in the options
+		if dropdown_type == "multi":
+			option_values = [option["value"] for option in options]
+			for feature in current_value or []:
+				if feature not in option_values:
+					options.append({"label": features.get_label(feature), "value": feature})
 		
 	return options
 
+#mds coordinates and metadata of a dataset cleaned once, only sorted and renamed for each plot
+class MDSProjection:
+	def __init__(self, mds_df):
+		self.mds_df = mds_df
+		self.clean = mds_df.replace("_", " ", regex=True)
+
+	#cleaned rows of a slice of mds_df sorted by the original metadata values, with readable column names
+	def get_plot_df(self, mds_df, metadata, label_to_value):
+		order = mds_df.sort_values(by=[metadata]).index
+		mds_df = self.clean.loc[order]
+		mds_df[metadata] = mds_df[metadata].fillna("NA")
+		mds_df = mds_df.rename(columns=label_to_value)
+
+		return mds_df
+
+	def get_size(self):
+		return int(self.mds_df.memory_usage(index=True, deep=True).sum() + self.clean.memory_usage(index=True, deep=True).sum())
+
+#mds projections are kept in the tables cache, they are built again when the manifest is loaded again
+def get_mds_projection(path, mds_dataset, mds_type):
+	key = ("mds_projection", path, mds_dataset, mds_type, get_manifest_version(path))
+	mds_projection = dataframe_cache.get(key)
+	if mds_projection is None:
+		mds_df = read_tsv(path, "data/" + mds_dataset + "/mds/" + mds_type + ".tsv")
+		mds_projection = MDSProjection(mds_df)
+		dataframe_cache.put(key, mds_projection, mds_projection.get_size())
+
+	return mds_projection
+
+#projections computed from the log2 counts store and their coordinate columns
+computed_projection_columns = {"pca": ["PC1", "PC2"], "computed_tsne": ["tSNE1", "tSNE2"]}
+
+#projections run in spawned processes, forking the threaded app is not safe, the processes are started on first use
+projection_executor = None
+projection_executor_lock = threading.Lock()
+
+def get_projection_executor():
+	global projection_executor
+	with projection_executor_lock:
+		if projection_executor is None:
+			projection_executor = ProcessPoolExecutor(max_workers=config["projection"]["processes"], mp_context=multiprocessing.get_context("spawn"))
+
+	return projection_executor
+
+#projections of the last used sample sets and projections still computed by the worker processes
+computed_projections = OrderedDict()
+running_projections = {}
+computed_projections_lock = threading.Lock()
+
+#mds projection of a finished computation, added to the projections of the last used sample sets
+def collect_computed_projection(key, running_projection):
+	future, metadata, samples, columns = running_projection
+	coordinates = future.result()
+	coordinates = pd.DataFrame({"sample": samples, columns[0]: coordinates[:, 0], columns[1]: coordinates[:, 1]})
+	mds_projection = MDSProjection(metadata.merge(coordinates, how="inner", on="sample"))
+	with computed_projections_lock:
+		computed_projections[key] = mds_projection
+		while len(computed_projections) > config["cache"]["projection_cache_size"]:
+			computed_projections.popitem(last=False)
+
+	return mds_projection
+
+#mds projection of the samples of some conditions, or of all samples, computed on the most variable features of the counts store
+#the computation is submitted to the worker processes and None is returned until it is finished, the caller asks again later
+def get_computed_projection(path, expression_dataset, method, conditions=None):
+	store = load_counts_store(path, expression_dataset)
+	#computed projections are only offered for datasets with a counts store
+	if store is None:
+		raise PreventUpdate
+	metadata = get_analysis_metadata(path).metadata
+	if conditions is not None:
+		metadata = metadata[metadata["condition"].isin(conditions)]
+	rows = np.flatnonzero(np.isin(store["samples"], metadata["sample"]))
+	#at least 3 samples are needed for 2 dimensions
+	if len(rows) < 3:
+		raise PreventUpdate
+	top_features = config["projection"]["top_features"]
+	perplexity = config["projection"]["tsne_perplexity"]
+	key = (path, expression_dataset, method, store["modified_time"], tuple(store["samples"][rows]), top_features, perplexity)
+	with computed_projections_lock:
+		mds_projection = computed_projections.get(key)
+		if mds_projection is not None:
+			computed_projections.move_to_end(key)
+			return mds_projection
+		#finished computations are collected by the first request which sees them
+		finished_projections = {running_key: running_projection for running_key, running_projection in running_projections.items() if running_projection[0].done()}
+		for running_key in finished_projections:
+			del running_projections[running_key]
+		running = key in running_projections
+	for finished_key, finished_projection in finished_projections.items():
+		#errors are raised to the request of that projection only
+		if finished_key == key:
+			return collect_computed_projection(key, finished_projection)
+		if finished_projection[0].exception() is None:
+			collect_computed_projection(finished_key, finished_projection)
+	if running:
+		return None
+
+	#log2 values of the selected samples
+	if "log2" in store:
+		values = store["log2"][rows].astype(np.float64)
+	else:
+		values = get_log2_counts(store["counts"][rows].astype(np.float64))
+	#features with values for every sample, most variable first
+	values = values[:, ~np.isnan(values).any(axis=0)]
+	variances = values.var(axis=0)
+	values = values[:, np.sort(np.argsort(variances)[::-1][:top_features])]
+	with computed_projections_lock:
+		if key not in running_projections and key not in computed_projections:
+			future = get_projection_executor().submit(projections.compute_projection, values, method, perplexity)
+			running_projections[key] = (future, metadata, store["samples"][rows], computed_projection_columns[method])
+
+	return None
+
+#svg scatter plots get slow with many points, large mds are drawn with webgl like the ma plot
+def get_mds_scatter(number_of_samples):
+	if number_of_samples > config["mds_webgl_threshold"]:
+		return go.Scattergl
+	else:
+		return go.Scatter
+
 #function for creating a discrete colored mds from tsv file
 def plot_mds_discrete(mds_df, color_mapping, x, y, selected_metadata, mds_discrete_fig, label_to_value, path):
 
@@ -184,6 +939,7 @@ def plot_mds_discrete(mds_df, color_mapping, x, y, selected_metadata, mds_discre
 		marker_size = 6
 	else:
 		marker_size = 8
+	scatter = get_mds_scatter(number_of_samples)
 
 	#get repo
 	repo = get_repo_name_from_path(path, repos)
@@ -215,7 +971,7 @@ def plot_mds_discrete(mds_df, color_mapping, x, y, selected_metadata, mds_discre
 		filtered_mds_df = filtered_mds_df.round(2)
 		custom_data = filtered_mds_df[metadata_columns].fillna("NA")
 		marker_color = get_color(color_mapping, selected_metadata_for_color_mapping, metadata)
-		mds_discrete_fig.add_trace(go.Scatter(x=filtered_mds_df[x], y=filtered_mds_df[y], marker_opacity=1, marker_color=marker_color, marker_size=marker_size, customdata=custom_data, mode="markers", legendgroup=metadata, showlegend=True, hovertemplate=hover_template, name=metadata, visible=True), row=1, col=1)
+		mds_discrete_fig.add_trace(scatter(x=filtered_mds_df[x], y=filtered_mds_df[y], marker_opacity=1, marker_color=marker_color, marker_size=marker_size, customdata=custom_data, mode="markers", legendgroup=metadata, showlegend=True, hovertemplate=hover_template, name=metadata, visible=True), row=1, col=1)
 	
 	#mds_discrete_fig["layout"]["paper_bgcolor"]="LightSteelBlue"
 
@@ -230,6 +986,7 @@ def plot_mds_continuous(mds_df, x, y, variable_to_plot, color, mds_continuous_fi
 		marker_size = 6
 	else:
 		marker_size = 8
+	scatter = get_mds_scatter(number_of_samples)
 	
 	#get hover template and get columns to keep for customdata
 	metadata_columns = []
@@ -250,19 +1007,14 @@ def plot_mds_continuous(mds_df, x, y, variable_to_plot, color, mds_continuous_fi
 		continuous_variable_to_plot = "Log2 expression"
 
 		#download counts
-		counts = download_from_github(path, "data/" + expression_dataset + "/counts/" + feature + ".tsv")
-		counts = pd.read_csv(counts, sep = "\t")
-		counts = counts.rename(columns={"sample": "Sample"})
-		counts = counts.replace("_", " ", regex=True)
+		counts = get_counts(path, expression_dataset, [feature], layer="log2")
+		counts = counts.rename(columns={"sample": "Sample", feature: "Log2 expression"})
+		counts["Sample"] = counts["Sample"].str.replace("_", " ", regex=False)
 
 		#add counts to umap df
 		mds_df = mds_df.merge(counts, how="outer", on="Sample")
 		#filter samples that are not visible
 		mds_df = mds_df[mds_df["Sample"].isin(samples_to_keep)]
-
-		#add log2 counts column to df
-		mds_df["Log2 expression"] = np.log2(mds_df["counts"])
-		mds_df["Log2 expression"].replace(to_replace = -np.inf, value = 0, inplace=True)
 		#labels for graph title
 		if expression_dataset in ["human", "mouse"] or "genes" in expression_dataset:
 			expression_or_abundance = " expression"
@@ -288,7 +1040,7 @@ def plot_mds_continuous(mds_df, x, y, variable_to_plot, color, mds_continuous_fi
 	na_df = mds_df.loc[mds_df[continuous_variable_to_plot] == "NA"]
 	custom_data = na_df[metadata_columns]
 	#add discrete trace for NA values
-	mds_continuous_fig.add_trace(go.Scatter(x=na_df[x], y=na_df[y], marker_color=na_color, marker_size=marker_size, customdata=custom_data, mode="markers", showlegend=False, hovertemplate=hover_template, name="na_continuous_trace", visible=True), row=1, col=subplot_column)
+	mds_continuous_fig.add_trace(scatter(x=na_df[x], y=na_df[y], marker_color=na_color, marker_size=marker_size, customdata=custom_data, mode="markers", showlegend=False, hovertemplate=hover_template, name="na_continuous_trace", visible=True), row=1, col=subplot_column)
 	#select only not NA
 	mds_df = mds_df.loc[mds_df[continuous_variable_to_plot] != "NA"]
 	custom_data = mds_df[metadata_columns]
@@ -298,7 +1050,7 @@ def plot_mds_continuous(mds_df, x, y, variable_to_plot, color, mds_continuous_fi
 		colorscale = color
 	else:
 		colorscale = ["#FFFFFF", color]
-	mds_continuous_fig.add_trace(go.Scatter(x=mds_df[x], y=mds_df[y], name=continuous_variable_to_plot, marker_color=marker_color, marker_colorscale=colorscale, marker_showscale=True, marker_opacity=1, marker_size=marker_size, marker_colorbar_title=colorbar_title, marker_colorbar_title_side="right", marker_colorbar_title_font_size=14, marker_colorbar_thicknessmode="pixels", marker_colorbar_thickness=15, marker_colorbar_len=colorbar_len, marker_colorbar_tickfont={"family": "Arial", "size": 14}, marker_colorbar_x=marker_colorbar_x, marker_colorbar_yanchor="top", marker_colorbar_y=1, mode="markers", customdata=custom_data, hovertemplate=hover_template, showlegend=False, visible=True), row=1, col=subplot_column)
+	mds_continuous_fig.add_trace(scatter(x=mds_df[x], y=mds_df[y], name=continuous_variable_to_plot, marker_color=marker_color, marker_colorscale=colorscale, marker_showscale=True, marker_opacity=1, marker_size=marker_size, marker_colorbar_title=colorbar_title, marker_colorbar_title_side="right", marker_colorbar_title_font_size=14, marker_colorbar_thicknessmode="pixels", marker_colorbar_thickness=15, marker_colorbar_len=colorbar_len, marker_colorbar_tickfont={"family": "Arial", "size": 14}, marker_colorbar_x=marker_colorbar_x, marker_colorbar_yanchor="top", marker_colorbar_y=1, mode="markers", customdata=custom_data, hovertemplate=hover_template, showlegend=False, visible=True), row=1, col=subplot_column)
 	
 	#mds_continuous_fig["layout"]["paper_bgcolor"]="#E5F5F9"
 
@@ -306,35 +1058,31 @@ def plot_mds_continuous(mds_df, x, y, variable_to_plot, color, mds_continuous_fi
 
 #get number of displayed samples in mds
 def get_displayed_samples(figure_data):
-
+	#without a zoom the axes are autoranged around all the points
 	x_range = figure_data["layout"]["xaxis"]["range"]
 	y_range = figure_data["layout"]["yaxis"]["range"]
 	
-	#start of the app: get range for axes
-	if x_range is None or y_range is None:
-		full_fig = figure_data.full_figure_for_development(warn=False)
-		x_range = list(full_fig.layout.xaxis.range)
-		y_range = list(full_fig.layout.yaxis.range)
-	
 	#parse only visible traces
 	n_samples = 0
 	for trace in figure_data["data"]:
 		if trace["visible"] is True and trace["name"] not in ["na_continuous_trace", "Log2 expression", "Log2 abundance"]:
-			#check all points
-			for i in range(0, len(trace["x"])):
-				x = trace["x"][i]
-				y = trace["y"][i]
-				if x != "NA" and y != "NA":
-					if x > x_range[0] and x < x_range[1] and y > y_range[0] and y < y_range[1]:
-						n_samples += 1
+			#NA coordinates are never displayed
+			x = pd.to_numeric(pd.Series(trace["x"], dtype=object), errors="coerce").to_numpy(dtype=float)
+			y = pd.to_numeric(pd.Series(trace["y"], dtype=object), errors="coerce").to_numpy(dtype=float)
+			displayed = ~np.isnan(x) & ~np.isnan(y)
+			if x_range is not None:
+				displayed &= (x > x_range[0]) & (x < x_range[1])
+			if y_range is not None:
+				displayed &= (y > y_range[0]) & (y < y_range[1])
+			n_samples += int(displayed.sum())
 
 	return n_samples
 
 #elements in the x axis in boxplots
 def get_x_axis_elements_boxplots(selected_x, selected_y, feature_dataset, path):
 	#open metadata
-	metadata_df = download_from_github(path, "metadata.tsv")
-	metadata_df = pd.read_csv(metadata_df, sep = "\t")
+	analysis_metadata = get_analysis_metadata(path)
+	metadata_df = analysis_metadata.metadata
 
 	#counts as y need external file with count values
 	if selected_y in ["log2_expression", "log2_abundance"]:
@@ -346,13 +1094,12 @@ def get_x_axis_elements_boxplots(selected_x, selected_y, feature_dataset, path):
 				list = "data/" + feature_dataset + "/counts/lipid_list.tsv"
 			else:
 				list = "data/" + feature_dataset + "/counts/feature_list.tsv"
-		list = download_from_github(path, list)
-		list = pd.read_csv(list, sep = "\t", header=None, names=["gene_species"])
+		list = read_tsv(path, list, header=None, names=["gene_species"])
 		list = list["gene_species"].tolist()
 		feature = list[0]
-		counts = download_from_github(path, "data/" + feature_dataset + "/counts/" + feature + ".tsv")
-		counts = pd.read_csv(counts, sep = "\t")
-		metadata_df = metadata_df.merge(counts, how="inner", on="sample")
+		counts = get_counts(path, feature_dataset, [feature])
+		#sample names are cleaned like in the analysis metadata
+		metadata_df = metadata_df[analysis_metadata.get_sample_mask(counts["sample"].str.replace("_", " ", regex=False))]
 	
 	#get all x
 	x_values = metadata_df[selected_x].unique().tolist()
@@ -400,8 +1147,16 @@ def serach_go(search_value, df, expression_dataset, add_gsea_switch):
 
 #dge table rendering
 def dge_table_operations(table, dataset, stringency, target_prioritization, path):
+	columns, table, style_data_conditional = format_dge_table(table, dataset, stringency, target_prioritization, path)
+	data = table.to_dict("records")
+
+	return columns, data, style_data_conditional
+
+#formatted dge table, its columns and row colors
+def format_dge_table(table, dataset, stringency, target_prioritization, path):
 	pvalue_type = stringency.split("_")[0]
 	pvalue_threshold = stringency.split("_")[1]
+	table = widen_float32_columns(table)
 
 	if target_prioritization:
 		#keep degs and remove useless columns
@@ -411,8 +1166,7 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 		table = table[["Gene", "Gene ID", "log2 FC", "FDR", "id"]]
 
 		#build df from data
-		opentarget_df = download_from_github(path, "opentargets.tsv")
-		opentarget_df = pd.read_csv(opentarget_df, sep="\t")
+		opentarget_df = read_tsv(path, "opentargets.tsv")
 		table = pd.merge(table, opentarget_df, on="Gene ID")
 		table = table.fillna("")
 
@@ -426,7 +1180,7 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 			table = table.drop("DGE", axis=1)
 			table = table.drop("index", axis=1)
 			all_columns = list(table.columns)
-			table["Rank"] = [x + 1 for x in list(table.index)]
+			table["Rank"] = table.index + 1
 			table = table[["Rank"] + all_columns]
 		else:
 			table["Rank"] = []
@@ -496,19 +1250,13 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 				table.loc[table["Gene ID"] == "", "External resources"] = ""
 			elif "genes" in dataset:
 				table = table.rename(columns={"Gene": gene_column_name})
-				clean_gen_column_name = []
-				for x in table[gene_column_name]:
-					gene_x = x.split("@")[0]
-					beast_x = x.split("@")[1]
-					beast_x = beast_x.replace("_", " ")
-					x = gene_x + " - " + beast_x
-					clean_gen_column_name.append(x)
-				table[gene_column_name] = clean_gen_column_name.copy()
-				table["External resources"] = ["[![NCBI](assets/icon_ncbi.png 'NCBI')](https://www.ncbi.nlm.nih.gov/search/all/?term=" + x.replace(" - ", " ").replace(" ", "+") + ")" for x in table[gene_column_name]]
+				gene_and_beast = table[gene_column_name].str.split("@")
+				table[gene_column_name] = gene_and_beast.str[0] + " - " + gene_and_beast.str[1].str.replace("_", " ", regex=False)
+				table["External resources"] = "[![NCBI](assets/icon_ncbi.png 'NCBI')](https://www.ncbi.nlm.nih.gov/search/all/?term=" + table[gene_column_name].str.replace(" - ", " ", regex=False).str.replace(" ", "+", regex=False) + ")"
 			else:
 				table = table.rename(columns={"Gene": gene_column_name})
-				table[gene_column_name] = [x.replace("_", " ").replace("[", "").replace("]", "") for x in table[gene_column_name]]
-				table["External resources"] = ["[![NCBI](assets/icon_ncbi.png 'NCBI')](https://www.ncbi.nlm.nih.gov/genome/?term=" + x.replace(" ", "+") + ")" for x in table[gene_column_name]]
+				table[gene_column_name] = table[gene_column_name].str.replace("_", " ", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
+				table["External resources"] = "[![NCBI](assets/icon_ncbi.png 'NCBI')](https://www.ncbi.nlm.nih.gov/genome/?term=" + table[gene_column_name].str.replace(" ", "+", regex=False) + ")"
 
 		#data carpentry
 		table["id"] = table[gene_column_name]
@@ -516,9 +1264,8 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 			table = table.sort_values(by=["Comparison", pvalue_type])
 		else:
 			table = table.sort_values(by=[pvalue_type])
+		#p-values stay numeric to be filtered and sorted, missing values are shown as NA by get_table_page
 		table = table.rename(columns={"log2FoldChange": "log2 FC", "lfcSE": "log2 FC SE", "pvalue": "P-value", "padj": "FDR", "baseMean": base_mean_label})
-		table["P-value"] = table["P-value"].fillna("NA")
-		table["FDR"] = table["FDR"].fillna("NA")
 
 		#define columns
 		if dataset == "lipid":
@@ -546,9 +1293,6 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 		if "Comparison" in table.columns:
 			columns = [{"name": "Comparison", "id": "Comparison"}] + columns
 
-	#define data
-	data = table.to_dict("records")
-
 	if pvalue_type == "padj":
 		pvalue_column = "{FDR}"
 	else:
@@ -581,10 +1325,195 @@ def dge_table_operations(table, dataset, stringency, target_prioritization, path
 		}
 	]
 
-	return columns, data, style_data_conditional
+	return columns, table, style_data_conditional
+
+#formatted full dge tables of the last used contrasts
+formatted_dge_tables = OrderedDict()
+formatted_dge_tables_lock = threading.Lock()
+
+#full dge table of a contrast as columns, formatted dataframe and row colors, formatting is done once per table and options
+def get_dge_table(path, dataset, contrast, stringency, target_prioritization):
+	key = (path, dataset, contrast, stringency, target_prioritization, get_manifest_version(path))
+	with formatted_dge_tables_lock:
+		dge_table = formatted_dge_tables.get(key)
+		if dge_table is not None:
+			formatted_dge_tables.move_to_end(key)
+	if dge_table is None:
+		table = read_tsv(path, "data/" + dataset + "/dge/" + contrast + ".diffexp.tsv")
+		columns, table, style_data_conditional = format_dge_table(table, dataset, stringency, target_prioritization, path)
+		dge_table = (columns, table, style_data_conditional)
+		with formatted_dge_tables_lock:
+			formatted_dge_tables[key] = dge_table
+			while len(formatted_dge_tables) > config["cache"]["dge_table_cache_size"]:
+				formatted_dge_tables.popitem(last=False)
+
+	return dge_table
+
+#feature names as shown in the plots, used to find the features in dge tables
+def clean_dge_features(expression_dataset, features):
+	if expression_dataset in ["human", "mouse"]:
+		clean_features = features.str.replace("€", "/", regex=False)
+	elif "lipid" in expression_dataset:
+		clean_features = features
+	elif "genes" in expression_dataset:
+		gene_and_beast = features.str.split("@")
+		clean_features = gene_and_beast.str[0] + " - " + gene_and_beast.str[1].str.replace("_", " ", regex=False)
+	else:
+		clean_features = features.str.replace("_", " ", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
+
+	return clean_features
+
+#all dge tables of a dataset in a single long table, the rows of a feature are found without reading every table
+class DGEIndex:
+	def __init__(self, table, contrasts):
+		self.table = table
+		self.contrasts = contrasts
+		#positions of the rows of each feature, in table order
+		self.positions = table.groupby("clean_feature", sort=False).indices
+
+	#bytes of the table and of the positions
+	def get_size(self):
+		return int(self.table.memory_usage(index=True, deep=True).sum()) + sum(positions.nbytes for positions in self.positions.values())
+
+	#rows of the features in the given contrasts, with the contrast as a readable comparison
+	def get_rows(self, features, contrasts):
+		positions = [self.positions[feature] for feature in features if feature in self.positions]
+		if len(positions) > 0:
+			positions = np.unique(np.concatenate(positions))
+		rows = self.table.iloc[positions]
+		rows = rows[rows["contrast"].isin(contrasts)].copy()
+		rows["Comparison"] = rows["contrast"].str.replace("-", " ", regex=False).str.replace("_", " ", regex=False)
+		rows = rows.drop(columns="contrast")
+
+		return rows
+
+#dge indexes are kept in the tables cache, they are built again when the manifest is loaded again
+def get_dge_index(path, expression_dataset):
+	key = ("dge_index", path, expression_dataset, get_manifest_version(path))
+	dge_index = dataframe_cache.get(key)
+	if dge_index is None:
+		contrasts = get_manifest(path)["datasets"][expression_dataset]["contrasts"]
+		dge_tables = read_tsv_many(path, ["data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv" for contrast in contrasts])
+		for i, contrast in enumerate(contrasts):
+			dge_table = dge_tables[i].dropna(subset=["Gene"])
+			dge_tables[i] = dge_table.assign(clean_feature=clean_dge_features(expression_dataset, dge_table["Gene"]), contrast=contrast)
+		dge_index = DGEIndex(set_read_only(pd.concat(dge_tables)), contrasts)
+		dataframe_cache.put(key, dge_index, dge_index.get_size())
+
+	return dge_index
+
+#operators written by the datatable filter row, optionally prefixed by i or s for case insensitive or sensitive matching
+filter_part_regex = re.compile(r"^\s*\{(?P<column>[^}]+)\}\s+(?P<case>[is]?)(?P<operator>contains|datestartswith|eq|ne|lt|le|gt|ge|=|!=|<=|>=|<|>)\s+(?P<value>.+?)\s*$")
+filter_operators = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+#column, operator, value and case sensitivity of a datatable filter expression
+def split_filter_part(filter_part):
+	match = filter_part_regex.match(filter_part)
+	if match is None:
+		return None, None, None, None
+	operator = filter_operators.get(match.group("operator"), match.group("operator"))
+	value = match.group("value")
+	if len(value) > 1 and value[0] == value[-1] and value[0] in ["\"", "'", "`"]:
+		value = value[1:-1].replace("\\" + value[0], value[0])
+	else:
+		try:
+			value = float(value)
+		except ValueError:
+			pass
+	case_sensitive = match.group("case") == "s"
+
+	return match.group("column"), operator, value, case_sensitive
+
+#filter a table with the datatable filter query
+def filter_table(table, filter_query):
+	if filter_query is None or filter_query == "":
+		return table
+	for filter_part in filter_query.split(" && "):
+		column, operator, value, case_sensitive = split_filter_part(filter_part)
+		if column not in table.columns:
+			continue
+		column_values = table[column]
+		#text filters, also used for numbers written as text
+		if operator in ["contains", "datestartswith"] or not pd.api.types.is_numeric_dtype(column_values):
+			column_values = column_values.fillna("").astype(str)
+			#numbers typed in a text column are matched as written
+			if isinstance(value, float) and value.is_integer():
+				value = str(int(value))
+			else:
+				value = str(value)
+			if not case_sensitive:
+				column_values = column_values.str.lower()
+				value = value.lower()
+			if operator == "contains":
+				mask = column_values.str.contains(value, regex=False)
+			elif operator == "datestartswith":
+				mask = column_values.str.startswith(value)
+			elif operator == "=":
+				mask = column_values == value
+			elif operator == "!=":
+				mask = column_values != value
+			elif operator == "<":
+				mask = column_values < value
+			elif operator == "<=":
+				mask = column_values <= value
+			elif operator == ">":
+				mask = column_values > value
+			else:
+				mask = column_values >= value
+		#numeric filters, NA matches missing values and other text values do not match any number
+		else:
+			if isinstance(value, str):
+				if value == "NA" and operator == "=":
+					mask = column_values.isna()
+				elif value == "NA" and operator == "!=":
+					mask = column_values.notna()
+				else:
+					mask = pd.Series(False, index=table.index)
+			elif operator == "=":
+				mask = column_values == value
+			elif operator == "!=":
+				mask = column_values != value
+			elif operator == "<":
+				mask = column_values < value
+			elif operator == "<=":
+				mask = column_values <= value
+			elif operator == ">":
+				mask = column_values > value
+			else:
+				mask = column_values >= value
+		table = table[mask]
+
+	return table
+
+#sort a table with the datatable sort_by
+def sort_table(table, sort_by):
+	if sort_by is None or len(sort_by) == 0:
+		return table
+	sort_by = [sort_column for sort_column in sort_by if sort_column["column_id"] in table.columns]
+	if len(sort_by) == 0:
+		return table
+	table = table.sort_values([sort_column["column_id"] for sort_column in sort_by], ascending=[sort_column["direction"] == "asc" for sort_column in sort_by], kind="mergesort", na_position="last")
+
+	return table
+
+#visible page of a table filtered and sorted server side, with the number of pages, missing values of na_columns are written as NA
+def get_table_page(table, page_current, page_size, sort_by, filter_query, na_columns=None):
+	if na_columns is None:
+		na_columns = []
+	table = filter_table(table, filter_query)
+	table = sort_table(table, sort_by)
+	page_count = max(1, -(-len(table.index) // page_size))
+	if page_current is None or page_current >= page_count:
+		page_current = 0
+	page = table.iloc[page_current * page_size:(page_current + 1) * page_size]
+	page = page.assign(**{column: page[column].astype(object).where(page[column].notna(), "NA") for column in na_columns if column in page.columns})
+	data = page.to_dict("records")
+
+	return data, page_count, page_current
 
 #dge table download
 def dge_table_download_operations(df, dataset, contrast, stringency, filtered):
+	df = widen_float32_columns(df)
 	
 	#define dataset specific variables
 	if dataset in ["human", "mouse"] or "genes" in dataset:
@@ -742,16 +1671,14 @@ def search_genes_in_textarea(trigger_id, go_plot_click, expression_dataset, stri
 
 			#read go table
 			if expression_dataset in ["human", "mouse"]:
-				go_df = download_from_github(path, "data/{}/".format(expression_dataset) + stringency_info + "/" + contrast + ".merged_go.tsv")
+				go_df = read_tsv(path, "data/{}/".format(expression_dataset) + stringency_info + "/" + contrast + ".merged_go.tsv")
 			else:
-				go_df = download_from_github(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
-			go_df = pd.read_csv(go_df, sep = "\t")
+				go_df = read_tsv(path, "data/{}/".format(expression_dataset) + "lo/" + contrast + ".merged_go.tsv")
 			go_df = go_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 			#concatenate gsea results if the switch is true
 			boolean_add_gsea_switch = boolean_switch(add_gsea_switch)
 			if boolean_add_gsea_switch:
-				gsea_df = download_from_github(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv")
-				gsea_df = pd.read_csv(gsea_df, sep = "\t")
+				gsea_df = read_tsv(path, "data/{}/".format(expression_dataset) + "gsea/" + contrast + ".merged_go.tsv").copy()
 				gsea_df["Genes"] = [gene.replace(";", "; ") for gene in gsea_df["Genes"]]
 				gsea_df = gsea_df[["DGE", "Genes", "Process~name", "num_of_Genes", "gene_group", "percentage%", "P-value"]]
 				go_df = pd.concat([go_df, gsea_df])
@@ -801,8 +1728,7 @@ def search_genes_in_textarea(trigger_id, go_plot_click, expression_dataset, stri
 		log_div = []
 		log_hidden_status = True
 		
-		diffexp_df = download_from_github(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv")
-		diffexp_df = pd.read_csv(diffexp_df, sep = "\t")
+		diffexp_df = read_tsv(path, "data/" + expression_dataset + "/dge/" + contrast + ".diffexp.tsv").copy()
 		diffexp_df["Gene"] = diffexp_df["Gene"].fillna("NA")
 		diffexp_df = diffexp_df[diffexp_df["Gene"] != "NA"]
 
@@ -893,8 +1819,7 @@ def search_genes_in_textarea(trigger_id, go_plot_click, expression_dataset, stri
 					list = "data/" + expression_dataset + "/counts/lipid_list.tsv"
 				else:
 					list = "data/" + expression_dataset + "/counts/feature_list.tsv"
-			all_features = download_from_github(path, list)
-			all_features = pd.read_csv(all_features, sep = "\t", header=None, names=["genes"])
+			all_features = read_tsv(path, list, header=None, names=["genes"])
 			all_features = all_features["genes"].replace("€", "/").dropna().tolist()
 
 			#upper for case insensitive search
@@ -27,6 +27,12 @@ main_layout = html.Div([
 		dcc.Store(id="profiling_tab_label_data"),
 		dcc.Store(id="differential_analysis_tab_label_data"),
 		dcc.Store(id="dge_table_click_data"),
+		dcc.Store(id="mds_displayed_samples"),
+		dcc.Store(id="mds_figure_update"),
+		dcc.Store(id="heatmap_figure_update"),
+		dcc.Store(id="multiboxplots_figure_update"),
+		dcc.Store(id="correlation_figure_update"),
+		dcc.Store(id="diversity_figure_update"),
 
 		#main options dropdowns
 		html.Div([
@@ -242,6 +248,8 @@ main_layout = html.Div([
 					size = "md",
 					color = "lightgray"
 				),
+				#redraws the mds while a computed projection is not finished
+				dcc.Interval(id="mds_projection_interval", interval=config["projection"]["poll_interval"], disabled=True),
 				dbc.Tooltip(
 					children=[dcc.Markdown(info_text.info_plot_mds)],
 					target="mds_graph",
@@ -1430,7 +1438,8 @@ dge_tab_layout = html.Div([
 			color="lightgray",
 			children=dash_table.DataTable(
 				id="dge_table_filtered",
-				filter_action="native",
+				filter_action="custom",
+				filter_query="",
 				style_cell={
 					"whiteSpace": "normal",
 					"height": "auto",
@@ -1439,7 +1448,10 @@ dge_tab_layout = html.Div([
 					"textAlign": "center"
 				},
 				page_size=25,
-				sort_action="native",
+				page_action="custom",
+				page_current=0,
+				sort_action="custom",
+				sort_by=[],
 				style_header={
 					"textAlign": "center"
 				},
@@ -1464,7 +1476,8 @@ dge_tab_layout = html.Div([
 			color="lightgray",
 			children=dash_table.DataTable(
 				id="dge_table",
-				filter_action="native",
+				filter_action="custom",
+				filter_query="",
 				style_cell={
 					"whiteSpace": "normal",
 					"height": "auto",
@@ -1473,7 +1486,10 @@ dge_tab_layout = html.Div([
 					"textAlign": "center"
 				},
 				page_size=25,
-				sort_action="native",
+				page_action="custom",
+				page_current=0,
+				sort_action="custom",
+				sort_by=[],
 				style_header={
 					"textAlign": "center"
 				},
@@ -1534,7 +1550,8 @@ go_tab_layout = html.Div([
 			color="lightgray",
 			children=dash_table.DataTable(
 				id="go_table",
-				filter_action="native",
+				filter_action="custom",
+				filter_query="",
 				style_cell={
 					"whiteSpace": "normal",
 					"height": "auto",
@@ -1543,7 +1560,10 @@ go_tab_layout = html.Div([
 					"textAlign": "center"
 				},
 				page_size=10,
-				sort_action="native",
+				page_action="custom",
+				page_current=0,
+				sort_action="custom",
+				sort_by=[],
 				style_header={
 					"textAlign": "center"
 				},
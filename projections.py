@@ -0,0 +1,17 @@
+#import python packages
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.manifold import TSNE
+
+#this module runs in worker processes, it must not import the app modules
+
+#2d coordinates of the rows of a matrix of log2 counts
+def compute_projection(values, method, perplexity):
+	if method == "pca":
+		coordinates = PCA(n_components=2).fit_transform(values)
+	else:
+		#perplexity must be lower than the number of samples
+		perplexity = min(perplexity, values.shape[0] - 1)
+		coordinates = TSNE(n_components=2, perplexity=perplexity, init="pca", learning_rate="auto", random_state=0).fit_transform(values)
+
+	return np.asarray(coordinates, dtype=np.float64)
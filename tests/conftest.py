@@ -0,0 +1,25 @@
+#import python packages
+import os
+import sys
+import pytest
+
+#the app modules read config.yaml from the working directory
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(repo_path)
+sys.path.insert(0, repo_path)
+
+#import modules
+import functions
+import data_sources
+
+#analysis repo in a temporary folder served as /repo/ with empty caches, files are written by the tests before reading them
+@pytest.fixture
+def local_repo(tmp_path, monkeypatch):
+	source = data_sources.LocalDataSource(str(tmp_path))
+	tree_index = data_sources.TreeIndex(source, 600)
+	monkeypatch.setitem(functions.data_sources, "/repo/", source)
+	monkeypatch.setitem(functions.tree_indexes, "/repo/", tree_index)
+	monkeypatch.setitem(functions.manifests, "/repo/", data_sources.ManifestIndex(source, tree_index, 600))
+	monkeypatch.setattr(functions, "dataframe_cache", functions.DataFrameCache(16 * 1024 * 1024))
+
+	return tmp_path
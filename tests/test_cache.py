@@ -0,0 +1,89 @@
+#import python packages
+import threading
+import pandas as pd
+import pytest
+#import modules
+import functions
+
+metadata_tsv = """sample	condition	age
+S_0	EoE	10
+S_1	Control	20
+"""
+
+@pytest.fixture
+def metadata_repo(local_repo):
+	(local_repo / "metadata.tsv").write_text(metadata_tsv)
+
+	return local_repo
+
+def test_read_tsv_is_cached(metadata_repo):
+	functions.read_tsv("/repo/", "metadata.tsv")
+	functions.read_tsv("/repo/", "metadata.tsv")
+	functions.read_tsv_many("/repo/", ["metadata.tsv"])
+	stats = functions.dataframe_cache.stats()
+	assert stats["misses"] == 1
+	assert stats["hits"] == 2
+	assert stats["entries"] == 1
+
+def test_cached_tables_can_not_be_changed(metadata_repo):
+	df = functions.read_tsv("/repo/", "metadata.tsv")
+	#new columns only change the copy of the caller
+	df["condition"] = "other"
+	df["new"] = 1
+	#values written in place raise
+	with pytest.raises(ValueError):
+		df.iloc[0, 2] = 30
+	cached = functions.read_tsv("/repo/", "metadata.tsv")
+	assert cached["condition"].tolist() == ["EoE", "Control"]
+	assert cached["age"].tolist() == [10, 20]
+	assert "new" not in cached.columns
+	#copies can be changed
+	copied = cached.copy()
+	copied.iloc[0, 2] = 30
+	assert functions.read_tsv("/repo/", "metadata.tsv")["age"].tolist() == [10, 20]
+
+def test_clear_resets_counters(metadata_repo):
+	functions.read_tsv("/repo/", "metadata.tsv")
+	functions.read_tsv("/repo/", "metadata.tsv")
+	functions.dataframe_cache.clear()
+	assert functions.dataframe_cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0, "max_bytes": 16 * 1024 * 1024}
+
+def test_cache_evicts_least_recently_used():
+	dfs = {name: pd.DataFrame({"values": range(100)}) for name in ["a", "b", "c"]}
+	size = int(dfs["a"].memory_usage(index=True, deep=True).sum())
+	cache = functions.DataFrameCache(2 * size)
+	cache.put("a", dfs["a"])
+	cache.put("b", dfs["b"])
+	cache.get("a")
+	cache.put("c", dfs["c"])
+	assert cache.get("b") is None
+	assert cache.get("a") is dfs["a"]
+	assert cache.stats()["evictions"] == 1
+
+def test_read_tsv_many_downloads_concurrently(local_repo, monkeypatch):
+	file_urls = ["data/human/counts/GENE{}.tsv".format(i) for i in range(3)]
+	for i, file_url in enumerate(file_urls):
+		(local_repo / file_url).parent.mkdir(parents=True, exist_ok=True)
+		(local_repo / file_url).write_text("sample\tcounts\nS_0\t{}\n".format(i))
+	#each read waits for the others, it only returns if the files are read at the same time
+	barrier = threading.Barrier(len(file_urls), timeout=5)
+	source = functions.data_sources["/repo/"]
+	open_file = source.open
+	opened = []
+	def wait_and_open(file_path):
+		opened.append(file_path)
+		barrier.wait()
+		return open_file(file_path)
+	monkeypatch.setattr(source, "open", wait_and_open)
+	dfs = functions.read_tsv_many("/repo/", file_urls + file_urls[:1])
+	#same order of the files, repeated files are read once
+	assert [df["counts"].tolist() for df in dfs] == [[0], [1], [2], [0]]
+	assert sorted(opened) == file_urls
+
+def test_read_tsv_many_reports_all_missing_files(metadata_repo):
+	with pytest.raises(IOError) as error:
+		functions.read_tsv_many("/repo/", ["metadata.tsv", "missing1.tsv", "missing2.tsv"])
+	assert "Could not read 2 files from /repo/" in str(error.value)
+	assert "missing1.tsv: " in str(error.value) and "missing2.tsv: " in str(error.value)
+	#files read before the error are cached
+	assert functions.dataframe_cache.stats()["entries"] == 1
@@ -0,0 +1,85 @@
+#import python packages
+import os
+import numpy as np
+import pandas as pd
+import pytest
+#import modules
+import functions
+
+#GENE1 has zero counts, GENE2 is constant, GENE3 has no counts for S_3
+feature_counts = {
+	"GENE1": pd.DataFrame({"sample": ["S_0", "S_1", "S_2", "S_3"], "counts": [0, 5, 10, 20]}),
+	"GENE2": pd.DataFrame({"sample": ["S_0", "S_1", "S_2", "S_3"], "counts": [3, 3, 3, 3]}),
+	"GENE3": pd.DataFrame({"sample": ["S_2", "S_0", "S_1"], "counts": [4, 1, 2]})
+}
+
+@pytest.fixture
+def counts_repo(local_repo, monkeypatch):
+	monkeypatch.setitem(functions.config, "counts_store_directory", str(local_repo / "counts_store"))
+	monkeypatch.setattr(functions, "counts_stores", {})
+	counts_folder = local_repo / "data" / "human" / "counts"
+	counts_folder.mkdir(parents=True)
+	(counts_folder / "genes_list.tsv").write_text("\n".join(feature_counts.keys()) + "\n")
+	for feature, counts in feature_counts.items():
+		counts.to_csv(counts_folder / (feature + ".tsv"), sep="\t", index=False)
+
+	return local_repo
+
+#samples in the same order to compare the store and the single feature files
+def sort_samples(counts):
+	return counts.sort_values("sample").reset_index(drop=True)
+
+@pytest.mark.parametrize("layer", functions.counts_store_layers)
+@pytest.mark.parametrize("features", [["GENE1"], ["GENE2"], ["GENE3"], ["GENE1", "GENE2"], ["GENE3", "GENE1"]])
+def test_counts_store_matches_single_feature_files(counts_repo, layer, features):
+	expected = sort_samples(functions.get_counts("/repo/", "human", features, layer))
+	store_path = functions.build_counts_store("/repo/", "human")
+	assert store_path == functions.get_counts_store_path("/repo/", "human")
+	counts = sort_samples(functions.get_counts("/repo/", "human", features, layer))
+	pd.testing.assert_frame_equal(counts, expected, check_dtype=False, atol=1e-5)
+	assert not counts[features].isna().any().any()
+
+def test_counts_store_layers(counts_repo):
+	functions.build_counts_store("/repo/", "human")
+	counts = sort_samples(functions.get_counts("/repo/", "human", ["GENE1", "GENE2", "GENE3"]))
+	#only samples with counts for all features
+	assert counts["sample"].tolist() == ["S_0", "S_1", "S_2"]
+	log2 = sort_samples(functions.get_counts("/repo/", "human", ["GENE1"], "log2"))
+	#zero counts are 0 in log2
+	assert log2["GENE1"].tolist() == pytest.approx([0, np.log2(5), np.log2(10), np.log2(20)])
+	#constant features are only centered
+	zscore = functions.get_counts("/repo/", "human", ["GENE2"], "zscore")
+	assert zscore["GENE2"].tolist() == [0, 0, 0, 0]
+	#missing samples are NaN in the stored z-scores and are left out of the mean
+	store = functions.load_counts_store("/repo/", "human")
+	gene3 = store["zscore"][:, store["feature_index"]["GENE3"]]
+	assert np.isnan(gene3).sum() == 1
+	assert np.nanmean(gene3) == pytest.approx(0, abs=1e-6)
+
+def test_counts_many_match_get_counts(counts_repo):
+	functions.build_counts_store("/repo/", "human")
+	for feature, counts in zip(feature_counts, functions.get_counts_many("/repo/", "human", list(feature_counts), "log2")):
+		pd.testing.assert_frame_equal(counts, functions.get_counts("/repo/", "human", [feature], "log2"))
+
+#stores built before the layers were added only have counts, the layers are computed when reading
+@pytest.mark.parametrize("layer", functions.counts_store_layers)
+def test_counts_store_without_layers(counts_repo, layer):
+	features = ["GENE3", "GENE1"]
+	expected = sort_samples(functions.get_counts("/repo/", "human", features, layer))
+	store_path = functions.build_counts_store("/repo/", "human")
+	for layer_file in ["log2.npy", "zscore.npy"]:
+		(counts_repo / store_path / layer_file).unlink()
+	counts = sort_samples(functions.get_counts("/repo/", "human", features, layer))
+	pd.testing.assert_frame_equal(counts, expected, check_dtype=False, atol=1e-5)
+
+def test_counts_store_is_reloaded_when_built_again(counts_repo):
+	store_path = functions.build_counts_store("/repo/", "human")
+	assert functions.get_counts("/repo/", "human", ["GENE2"])["GENE2"].tolist() == [3, 3, 3, 3]
+	feature_counts["GENE2"].assign(counts=[4, 4, 4, 4]).to_csv(counts_repo / "data/human/counts/GENE2.tsv", sep="\t", index=False)
+	functions.build_counts_store("/repo/", "human")
+	#the new store is a new file, its modification time is moved forward in case the clock did not tick
+	counts_file = counts_repo / store_path / "counts.npy"
+	modified_time = counts_file.stat().st_mtime + 10
+	os.utime(counts_file, (modified_time, modified_time))
+	assert functions.get_counts("/repo/", "human", ["GENE2"])["GENE2"].tolist() == [4, 4, 4, 4]
+	assert sorted(os.listdir(counts_repo / store_path)) == ["counts.npy", "features.tsv", "log2.npy", "samples.tsv", "zscore.npy"]
@@ -0,0 +1,174 @@
+#import python packages
+import io
+import os
+import pytest
+import requests
+import urllib3
+import tarfile
+import zipfile
+#import modules
+import data_sources
+
+body = b"sample\tcondition\n" + b"S_0\tEoE\n" * 1000
+
+#files of a small analysis repo
+repo_files = {
+	"metadata.tsv": body,
+	"data/human/counts/genes_list.tsv": b"GENE1\nGENE2\n",
+	"data/human/counts/GENE1.tsv": b"sample\tcounts\nS_0\t10\n",
+	"data/human/dge/EoE-vs-Control.diffexp.tsv": b"Gene\tlog2FoldChange\nGENE1\t1.5\n"
+}
+
+repo_tree = {
+	"": ["data", "metadata.tsv"],
+	"data": ["human"],
+	"data/human": ["counts", "dge"],
+	"data/human/counts": ["GENE1.tsv", "genes_list.tsv"],
+	"data/human/dge": ["EoE-vs-Control.diffexp.tsv"]
+}
+
+def write_repo(directory):
+	for file_path, content in repo_files.items():
+		full_path = directory / file_path
+		full_path.parent.mkdir(parents=True, exist_ok=True)
+		full_path.write_bytes(content)
+
+#session answering raw.githubusercontent requests with an etag, or with an error status
+class StubSession:
+	def __init__(self, status_code=200):
+		self.status_code = status_code
+		self.requests = []
+
+	def get(self, url, headers=None, stream=False):
+		self.requests.append(dict(headers or {}))
+		response = requests.Response()
+		response.url = url
+		if self.status_code != 200:
+			response.status_code = self.status_code
+			content = b"404: Not Found"
+		elif headers is not None and headers.get("If-None-Match") == "etag1":
+			response.status_code = 304
+			content = b""
+		else:
+			response.status_code = 200
+			response.headers["ETag"] = "etag1"
+			content = body
+		response.raw = urllib3.HTTPResponse(body=io.BytesIO(content), preload_content=False)
+
+		return response
+
+def get_github_source(session, cache_directory=None):
+	return data_sources.GitHubDataSource("owner/repo/master/", session, None, cache_directory)
+
+def test_github_responses_are_cached(tmp_path):
+	session = StubSession()
+	source = get_github_source(session, str(tmp_path))
+	with source.open("metadata.tsv") as f:
+		assert f.read() == body
+	#the second request is conditional and the body comes from the cache file
+	with source.open("metadata.tsv") as f:
+		assert f.read() == body
+	assert source.read("metadata.tsv") == body
+	assert session.requests == [{}, {"If-None-Match": "etag1"}, {"If-None-Match": "etag1"}]
+	#a new source on the same folder uses the saved responses
+	session = StubSession()
+	assert get_github_source(session, str(tmp_path)).read("metadata.tsv") == body
+	assert session.requests == [{"If-None-Match": "etag1"}]
+
+def test_github_response_cached_file_removed(tmp_path):
+	session = StubSession()
+	source = get_github_source(session, str(tmp_path))
+	source.read("metadata.tsv")
+	cache_file = source.http_cache.get_file("https://raw.githubusercontent.com/owner/repo/master/metadata.tsv")
+	header = source.http_cache.get_header("https://raw.githubusercontent.com/owner/repo/master/metadata.tsv")
+	assert header["etag"] == "etag1"
+	#the header is read before the file is removed, the body is downloaded again
+	source.http_cache.get_header = lambda url: header
+	os.remove(cache_file)
+	assert source.read("metadata.tsv") == body
+	assert session.requests == [{}, {"If-None-Match": "etag1"}, {}]
+
+@pytest.mark.parametrize("status_code", [403, 404, 500])
+def test_github_errors_are_raised(tmp_path, status_code):
+	for cache_directory in [None, str(tmp_path)]:
+		source = get_github_source(StubSession(status_code), cache_directory)
+		with pytest.raises(requests.HTTPError):
+			source.open("metadata.tsv")
+		with pytest.raises(requests.HTTPError):
+			source.read("metadata.tsv")
+	#error pages are not cached
+	assert source.http_cache.get_header("https://raw.githubusercontent.com/owner/repo/master/metadata.tsv") is None
+
+def test_github_stream_without_cache():
+	session = StubSession()
+	with get_github_source(session).open("metadata.tsv") as f:
+		assert f.read() == body
+
+def check_repo_source(source):
+	assert source.tree() == repo_tree
+	assert source.list("data/human") == ["counts", "dge"]
+	assert source.list("./data/human/counts/") == ["GENE1.tsv", "genes_list.tsv"]
+	for file_path, content in repo_files.items():
+		assert source.read(file_path) == content
+		with source.open(file_path) as f:
+			assert f.read() == content
+
+def test_local_source(tmp_path):
+	write_repo(tmp_path)
+	#hidden files and folders are not part of the analysis
+	(tmp_path / ".git").mkdir()
+	(tmp_path / ".git" / "HEAD").write_bytes(b"ref: refs/heads/master")
+	(tmp_path / ".hidden.tsv").write_bytes(b"")
+	source = data_sources.create_data_source("/repo/", {"type": "local", "directory": str(tmp_path)}, None, None)
+	check_repo_source(source)
+	assert source.get_mtime("metadata.tsv") == os.path.getmtime(tmp_path / "metadata.tsv")
+	assert source.get_mtime("manifest.json") is None
+	with pytest.raises(FileNotFoundError):
+		source.read("data/mouse/counts/GENE1.tsv")
+
+@pytest.mark.parametrize("archive_type", ["tar", "zip"])
+def test_archive_source(tmp_path, archive_type):
+	#github archives have all files inside a single top folder
+	write_repo(tmp_path / "eoe-meta-analysis-master")
+	archive_path = tmp_path / ("repo." + archive_type)
+	if archive_type == "tar":
+		with tarfile.open(archive_path, "w:gz") as archive:
+			archive.add(tmp_path / "eoe-meta-analysis-master", "eoe-meta-analysis-master")
+	else:
+		with zipfile.ZipFile(archive_path, "w") as archive:
+			for file_path in repo_files:
+				archive.write(tmp_path / "eoe-meta-analysis-master" / file_path, "eoe-meta-analysis-master/" + file_path)
+	source = data_sources.create_data_source("/repo/", {"type": "archive", "archive": str(archive_path)}, None, None)
+	check_repo_source(source)
+	with pytest.raises(FileNotFoundError):
+		source.list("data/mouse")
+
+def test_tree_index_is_refreshed_after_ttl(tmp_path, monkeypatch):
+	write_repo(tmp_path)
+	source = data_sources.LocalDataSource(str(tmp_path))
+	tree_calls = []
+	tree = source.tree
+	monkeypatch.setattr(source, "tree", lambda: tree_calls.append(1) or tree())
+	now = [1000.0]
+	monkeypatch.setattr(data_sources.time, "time", lambda: now[0])
+	tree_index = data_sources.TreeIndex(source, 60)
+	assert tree_index.list("data/human/dge") == ["EoE-vs-Control.diffexp.tsv"]
+	#new files are not seen before the ttl expires
+	(tmp_path / "data/human/dge/Other-vs-Control.diffexp.tsv").write_bytes(b"")
+	now[0] += 30
+	assert tree_index.list("data/human/dge") == ["EoE-vs-Control.diffexp.tsv"]
+	assert len(tree_calls) == 1
+	now[0] += 31
+	assert tree_index.list("data/human/dge") == ["EoE-vs-Control.diffexp.tsv", "Other-vs-Control.diffexp.tsv"]
+	assert len(tree_calls) == 2
+	#returned listings are copies
+	tree_index.list("data").append("mouse")
+	assert tree_index.list("data") == ["human"]
+
+def test_tree_index_lists_folders_of_backends_without_tree(tmp_path):
+	write_repo(tmp_path)
+	source = data_sources.LocalDataSource(str(tmp_path))
+	source.tree = lambda: None
+	tree_index = data_sources.TreeIndex(source, 60)
+	assert tree_index.list("data/human") == ["counts", "dge"]
+	assert tree_index.folders == {"data/human": ["counts", "dge"]}
@@ -0,0 +1,59 @@
+#import python packages
+import pandas as pd
+#import modules
+import functions
+
+#two contrasts of a human dataset, HLA-A€B is written with € in place of /
+dge_tsvs = {
+	"EoE-vs-Control": """Gene	Geneid	baseMean	log2FoldChange	lfcSE	stat	pvalue	padj
+GENE1	ENSG00001	10.5	1.5	0.2	3.1	1e-12	1e-10
+GENE2	ENSG00002	20.5	-0.5	0.1	-2.2	0.001	0.01
+HLA-A€B	ENSG00003	30.5	0.7	0.3	1.9	0.01	0.04
+""",
+	"EoE-vs-Remission": """Gene	Geneid	baseMean	log2FoldChange	lfcSE	stat	pvalue	padj
+GENE2	ENSG00002	21.5	-0.6	0.1	-2.4	0.002	0.02
+GENE1	ENSG00001	11.5	1.1	0.2	2.1	1e-6	1e-5
+	ENSG00004	5.5	0.1	0.2	0.5	0.5	0.9
+"""
+}
+
+def write_dge_tables(local_repo, contrasts):
+	dge_folder = local_repo / "data" / "human" / "dge"
+	dge_folder.mkdir(parents=True, exist_ok=True)
+	for contrast in contrasts:
+		(dge_folder / (contrast + ".diffexp.tsv")).write_text(dge_tsvs[contrast])
+
+#rows of a feature found by reading every table, as the boxplot statistics did before the index
+def get_rows_from_tables(feature, contrasts):
+	rows = []
+	for contrast in contrasts:
+		table = functions.read_tsv("/repo/", "data/human/dge/" + contrast + ".diffexp.tsv")
+		table = table.dropna(subset=["Gene"])
+		table = table[functions.clean_dge_features("human", table["Gene"]) == feature].copy()
+		table["clean_feature"] = feature
+		table["Comparison"] = contrast.replace("-", " ").replace("_", " ")
+		rows.append(table)
+
+	return pd.concat(rows)
+
+def test_dge_index_rows_match_tables(local_repo):
+	write_dge_tables(local_repo, dge_tsvs)
+	dge_index = functions.get_dge_index("/repo/", "human")
+	assert sorted(dge_index.contrasts) == sorted(dge_tsvs)
+	for feature in ["GENE1", "GENE2", "HLA-A/B"]:
+		rows = dge_index.get_rows([feature], dge_index.contrasts)
+		expected = get_rows_from_tables(feature, dge_index.contrasts)
+		pd.testing.assert_frame_equal(rows.reset_index(drop=True), expected[rows.columns].reset_index(drop=True))
+	assert len(dge_index.get_rows(["GENE3"], dge_index.contrasts)) == 0
+
+def test_dge_index_is_cached_until_the_manifest_changes(local_repo):
+	write_dge_tables(local_repo, ["EoE-vs-Control"])
+	dge_index = functions.get_dge_index("/repo/", "human")
+	assert functions.get_dge_index("/repo/", "human") is dge_index
+	assert dge_index.contrasts == ["EoE-vs-Control"]
+	#a new contrast is seen once the manifest is loaded again
+	write_dge_tables(local_repo, ["EoE-vs-Remission"])
+	functions.manifests["/repo/"].built_at = 0
+	dge_index = functions.get_dge_index("/repo/", "human")
+	assert sorted(dge_index.contrasts) == sorted(dge_tsvs)
+	assert set(dge_index.get_rows(["GENE1"], dge_index.contrasts)["Comparison"]) == {"EoE vs Control", "EoE vs Remission"}
@@ -0,0 +1,49 @@
+#import python packages
+import pytest
+#import modules
+import functions
+
+genes = ["IL13RA2", "IL13", "CCL26", "IL1B", "POSTN", "MIR21€IL13OS"]
+
+def get_values(options):
+	return [option["value"] for option in options]
+
+def test_prefix_matches_come_before_substring_matches():
+	feature_index = functions.FeatureIndex("human", genes)
+	#exact and prefix matches in alphabetical order, then labels containing the search
+	assert [genes[i] for i in feature_index.search("il13", 10)] == ["IL13", "IL13RA2", "MIR21€IL13OS"]
+	assert [genes[i] for i in feature_index.search("IL1", 10)] == ["IL13", "IL13RA2", "IL1B", "MIR21€IL13OS"]
+	assert [genes[i] for i in feature_index.search("il1", 2)] == ["IL13", "IL13RA2"]
+	assert feature_index.search("CXCL", 10) == []
+
+def test_search_values_are_cleaned_like_labels():
+	feature_index = functions.FeatureIndex("human", genes)
+	assert feature_index.get_label("MIR21€IL13OS") == "MIR21/IL13OS"
+	assert [genes[i] for i in feature_index.search("21/il", 10)] == ["MIR21€IL13OS"]
+	assert [genes[i] for i in feature_index.search("21€IL", 10)] == ["MIR21€IL13OS"]
+	feature_index = functions.FeatureIndex("genes_species", ["IL13@Homo_sapiens", "IL13@Mus_musculus"])
+	assert feature_index.labels == ["IL13 - Homo sapiens", "IL13 - Mus musculus"]
+	assert feature_index.search("IL13@Mus_mus", 10) == [1]
+	feature_index = functions.FeatureIndex("species", ["[Clostridium]_scindens", "Prevotella_copri"])
+	assert feature_index.labels == ["Clostridium scindens", "Prevotella copri"]
+	assert feature_index.search("clostridium_sc", 10) == [0]
+
+#labels shipped by a snapshot give the same index
+def test_feature_index_from_labels():
+	feature_index = functions.FeatureIndex("human", genes)
+	from_labels = functions.FeatureIndex("human", genes, feature_index.labels)
+	assert from_labels.labels == feature_index.labels
+	assert from_labels.search("il1", 10) == feature_index.search("il1", 10)
+
+@pytest.mark.parametrize("dropdown_type", ["single", "multi"])
+def test_options_keep_selected_features(monkeypatch, dropdown_type):
+	monkeypatch.setitem(functions.config, "max_feature_dropdown_options", 2)
+	feature_index = functions.FeatureIndex("human", genes)
+	options = functions.get_options_feature_dropdown("human", feature_index, "il1", ["POSTN", "IL13"], dropdown_type)
+	if dropdown_type == "multi":
+		assert get_values(options) == ["IL13", "IL13RA2", "POSTN"]
+	else:
+		assert get_values(options) == ["IL13", "IL13RA2"]
+	assert options[0] == {"label": "IL13", "value": "IL13"}
+	#no options before typing
+	assert functions.get_options_feature_dropdown("human", feature_index, None, ["POSTN"], dropdown_type) == []
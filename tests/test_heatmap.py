@@ -0,0 +1,62 @@
+#import python packages
+import numpy as np
+import pandas as pd
+import plotly.figure_factory as ff
+import pytest
+#import modules
+import functions
+
+#two groups of features with opposite patterns across samples, shuffled
+def get_grouped_features():
+	rng = np.random.default_rng(0)
+	pattern = np.linspace(-2, 2, 12)
+	up = pattern + rng.normal(scale=0.1, size=(30, 12))
+	down = -pattern + rng.normal(scale=0.1, size=(30, 12))
+	df = pd.DataFrame(np.vstack([up, down]), index=["up" + str(i) for i in range(30)] + ["down" + str(i) for i in range(30)])
+
+	return df.sample(frac=1, random_state=0)
+
+def test_principal_component_order_groups_similar_rows():
+	order = functions.get_principal_component_order(get_grouped_features())
+	assert sorted(order) == sorted(get_grouped_features().index)
+	groups = [feature.rstrip("0123456789") for feature in order]
+	#a single change from one group to the other
+	assert sum(groups[i] != groups[i + 1] for i in range(len(groups) - 1)) == 1
+
+def test_binned_rows_keep_the_order():
+	df = get_grouped_features()
+	df = df.reindex(index=functions.get_principal_component_order(df))
+	binned = functions.bin_heatmap_rows(df, 4)
+	assert len(binned) == 4
+	assert binned.index[0].startswith(df.index[0] + " ... ")
+	assert binned.index[0].endswith("(15)")
+	np.testing.assert_allclose(binned.iloc[0].to_numpy(), df.iloc[:15].mean().to_numpy())
+
+@pytest.mark.parametrize("orientation", ["bottom", "left"])
+def test_dendrogram_matches_plotly(orientation):
+	df = get_grouped_features().iloc[:20]
+	labels = df.index.tolist()
+	fig = ff.create_dendrogram(df.values, orientation=orientation, labels=labels)
+	dendrogram = functions.Dendrogram(df.values, labels, False)
+	if orientation == "bottom":
+		axis = fig.layout.xaxis
+	else:
+		axis = fig.layout.yaxis
+	assert dendrogram.labels == list(axis.ticktext)
+	assert dendrogram.get_tickvals(orientation) == list(axis.tickvals)
+	#same links, plotly colors them by cluster
+	links = sorted((tuple(trace.x), tuple(trace.y)) for trace in fig.data)
+	traces = dendrogram.get_traces(orientation, "black", "x", "y")
+	np.testing.assert_allclose(sorted((tuple(trace.x), tuple(trace.y)) for trace in traces), links)
+
+def test_dendrogram_is_cached_for_the_same_features_and_samples(local_repo, monkeypatch):
+	monkeypatch.setattr(functions, "dendrograms", functions.OrderedDict())
+	df = get_grouped_features().iloc[:20]
+	dendrogram = functions.get_dendrogram("/repo/", "human", "zscore", df)
+	#rows and columns in another order give the same clustering
+	shuffled = df.sample(frac=1, random_state=1)[df.columns[::-1]]
+	assert functions.get_dendrogram("/repo/", "human", "zscore", shuffled) is dendrogram
+	assert functions.get_dendrogram("/repo/", "human", "zscore", df.iloc[:10]) is not dendrogram
+	#a new manifest clusters again
+	functions.manifests["/repo/"].built_at = 0
+	assert functions.get_dendrogram("/repo/", "human", "zscore", df) is not dendrogram
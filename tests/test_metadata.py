@@ -0,0 +1,32 @@
+#import python packages
+import pandas as pd
+#import modules
+import functions
+
+#sample names with underscores, S_2 has no counts
+metadata = pd.DataFrame({
+	"sample": ["S_0", "S_1", "S_2"],
+	"condition": ["EoE", "Control", "Other_condition"]
+})
+
+def test_boxplots_x_axis_keeps_samples_with_underscores(monkeypatch):
+	analysis_metadata = functions.AnalysisMetadata(metadata, False, [])
+	monkeypatch.setattr(functions, "get_analysis_metadata", lambda path: analysis_metadata)
+	monkeypatch.setattr(functions, "read_tsv", lambda path, file_path, **kwargs: pd.DataFrame({"gene_species": ["GENE1"]}))
+	monkeypatch.setattr(functions, "get_counts", lambda path, dataset, features: pd.DataFrame({"sample": ["S_0", "S_1"], "GENE1": [1.0, 2.0]}))
+	options, x_values = functions.get_x_axis_elements_boxplots("condition", "log2_expression", "human", "/repo/")
+	assert x_values == ["EoE", "Control"]
+	assert options[1] == {"label": "Control", "value": "Control"}
+
+def test_analysis_metadata_is_built_again_with_a_new_manifest(local_repo, monkeypatch):
+	monkeypatch.setitem(functions.config["repos"], "Test", {"path": "/repo/", "sorted_conditions": False, "condition_list": []})
+	monkeypatch.setattr(functions, "repos", ["Test"])
+	metadata.to_csv(local_repo / "metadata.tsv", sep="\t", index=False)
+	analysis_metadata = functions.get_analysis_metadata("/repo/")
+	assert functions.get_analysis_metadata("/repo/") is analysis_metadata
+	assert analysis_metadata.conditions == ["Control", "EoE", "Other condition"]
+	#an updated metadata.tsv is read once the manifest is loaded again
+	metadata.assign(condition=["EoE", "EoE", "Control"]).to_csv(local_repo / "metadata.tsv", sep="\t", index=False)
+	assert functions.get_analysis_metadata("/repo/") is analysis_metadata
+	functions.manifests["/repo/"].built_at = 0
+	assert functions.get_analysis_metadata("/repo/").conditions == ["Control", "EoE"]
@@ -0,0 +1,94 @@
+#import python packages
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor, wait
+from dash.exceptions import PreventUpdate
+#import modules
+import functions
+
+mds_tsv = """sample	x	y	condition
+S_0	0.1	0.2	Other_condition
+S_1	0.3	0.4	EoE
+S_2	0.5	0.6
+S_3	0.7	0.8	Control
+"""
+
+def test_mds_projection_is_cached_until_a_new_manifest(local_repo):
+	(local_repo / "data/human/mds").mkdir(parents=True)
+	(local_repo / "data/human/mds/umap.tsv").write_text(mds_tsv)
+	mds_projection = functions.get_mds_projection("/repo/", "human", "umap")
+	assert functions.get_mds_projection("/repo/", "human", "umap") is mds_projection
+	functions.manifests["/repo/"].built_at = 0
+	assert functions.get_mds_projection("/repo/", "human", "umap") is not mds_projection
+
+def test_mds_plot_df_is_sorted_and_cleaned(local_repo):
+	(local_repo / "data/human/mds").mkdir(parents=True)
+	(local_repo / "data/human/mds/umap.tsv").write_text(mds_tsv)
+	mds_projection = functions.get_mds_projection("/repo/", "human", "umap")
+	mds_df = mds_projection.mds_df[mds_projection.mds_df["x"] > 0.2]
+	plot_df = mds_projection.get_plot_df(mds_df, "condition", {"condition": "Condition"})
+	#sorted by the original values, missing values last and written as NA
+	assert plot_df["sample"].tolist() == ["S 3", "S 1", "S 2"]
+	assert plot_df["Condition"].tolist() == ["Control", "EoE", "NA"]
+	assert plot_df["x"].tolist() == pytest.approx([0.7, 0.3, 0.5])
+	#the cached projection is not changed by the plots
+	assert mds_projection.clean["condition"].isna().sum() == 1
+	assert mds_projection.clean["condition"].tolist()[0] == "Other condition"
+
+#analysis with a counts store of 6 samples and 5 features, projections run in threads instead of worker processes
+@pytest.fixture
+def projection_repo(local_repo, monkeypatch):
+	monkeypatch.setitem(functions.config["repos"], "Test", {"path": "/repo/", "sorted_conditions": False, "condition_list": []})
+	monkeypatch.setattr(functions, "repos", ["Test"])
+	monkeypatch.setitem(functions.config, "counts_store_directory", str(local_repo / "counts_store"))
+	monkeypatch.setattr(functions, "counts_stores", {})
+	monkeypatch.setattr(functions, "computed_projections", functions.OrderedDict())
+	monkeypatch.setattr(functions, "running_projections", {})
+	executor = ThreadPoolExecutor(max_workers=1)
+	monkeypatch.setattr(functions, "get_projection_executor", lambda: executor)
+	samples = ["S_{}".format(i) for i in range(6)]
+	pd.DataFrame({"sample": samples, "condition": ["EoE"] * 4 + ["Control"] * 2}).to_csv(local_repo / "metadata.tsv", sep="\t", index=False)
+	counts_folder = local_repo / "data/human/counts"
+	counts_folder.mkdir(parents=True)
+	features = ["GENE{}".format(i) for i in range(5)]
+	(counts_folder / "genes_list.tsv").write_text("\n".join(features) + "\n")
+	rng = np.random.default_rng(0)
+	for feature in features:
+		pd.DataFrame({"sample": samples, "counts": rng.integers(1, 1000, len(samples))}).to_csv(counts_folder / (feature + ".tsv"), sep="\t", index=False)
+	functions.build_counts_store("/repo/", "human")
+	yield local_repo
+	executor.shutdown()
+
+#first request submits the projection, later requests get it once it is finished
+def get_finished_projection(*args):
+	assert functions.get_computed_projection(*args) is None
+	assert len(functions.running_projections) == 1
+	wait([list(functions.running_projections.values())[0][0]])
+
+	return functions.get_computed_projection(*args)
+
+def test_computed_projection_is_polled(projection_repo):
+	mds_projection = get_finished_projection("/repo/", "human", "pca", ["EoE"])
+	assert mds_projection.mds_df["sample"].tolist() == ["S_0", "S_1", "S_2", "S_3"]
+	assert {"PC1", "PC2", "condition"}.issubset(mds_projection.mds_df.columns)
+	assert functions.running_projections == {}
+	#cached for the same samples
+	assert functions.get_computed_projection("/repo/", "human", "pca", ["EoE"]) is mds_projection
+	#other samples are computed again
+	assert get_finished_projection("/repo/", "human", "pca", None).mds_df["sample"].tolist() == ["S_{}".format(i) for i in range(6)]
+
+def test_computed_projection_errors_are_raised_to_their_request(projection_repo, monkeypatch):
+	def fail(values, method, perplexity):
+		raise ValueError("projection failed")
+	monkeypatch.setattr(functions.projections, "compute_projection", fail)
+	with pytest.raises(ValueError):
+		get_finished_projection("/repo/", "human", "pca", ["EoE"])
+	assert functions.running_projections == {}
+
+def test_computed_projection_needs_a_store_and_3_samples(projection_repo):
+	with pytest.raises(PreventUpdate):
+		functions.get_computed_projection("/repo/", "mouse", "pca")
+	with pytest.raises(PreventUpdate):
+		functions.get_computed_projection("/repo/", "human", "pca", ["Control"])
+	assert functions.running_projections == {}
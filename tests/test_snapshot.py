@@ -0,0 +1,80 @@
+#import python packages
+import sys
+import json
+import pandas as pd
+import pytest
+#import modules
+import functions
+import data_sources
+import build_snapshot
+
+repo_files = {
+	"metadata.tsv": "sample\tcondition\nS_0\tEoE\nS_1\tControl\nS_2\tEoE\n",
+	"data/human/counts/genes_list.tsv": "GENE1\nMIR21€IL13OS\n",
+	"data/human/counts/GENE1.tsv": "sample\tcounts\nS_0\t0\nS_1\t5\nS_2\t10\n",
+	"data/human/counts/MIR21€IL13OS.tsv": "sample\tcounts\nS_0\t3\nS_1\t7\nS_2\t1\n",
+	"data/human/dge/EoE-vs-Control.diffexp.tsv": "Gene\tGene_id\tbaseMean\tlog2FoldChange\tlfcSE\tpvalue\tpadj\nGENE1\tENSG1\t5.0\t1.5\t0.2\t0.001\t\n",
+	"data/human/mds/metadata.tsv": "sample\tx\ty\nS_0\t0.1\t0.2\nS_1\t0.3\t0.4\nS_2\t0.5\t0.6\n",
+	".git/HEAD": "ref: refs/heads/master\n",
+	"README.md": "analysis\n"
+}
+
+def write_repo(directory):
+	for file_path, content in repo_files.items():
+		full_path = directory / file_path
+		full_path.parent.mkdir(parents=True, exist_ok=True)
+		full_path.write_text(content)
+
+#the snapshot is built from a checkout and read back as the /repo/ data source
+@pytest.fixture
+def snapshot_source(tmp_path, local_repo, monkeypatch):
+	write_repo(local_repo)
+	monkeypatch.setitem(functions.config["repos"], "Test", {"path": "/repo/"})
+	monkeypatch.setattr(build_snapshot, "repos", ["Test"])
+	monkeypatch.setattr(sys, "argv", ["build_snapshot.py", "Test", str(local_repo), "--output", str(tmp_path / "snapshots"), "--version", "v1"])
+	build_snapshot.main()
+
+	return data_sources.create_data_source("/repo/", {"type": "snapshot", "directory": str(tmp_path / "snapshots" / "repo")}, None, None)
+
+def use_source(monkeypatch, source):
+	tree_index = data_sources.TreeIndex(source, 600)
+	monkeypatch.setitem(functions.data_sources, "/repo/", source)
+	monkeypatch.setitem(functions.tree_indexes, "/repo/", tree_index)
+	monkeypatch.setitem(functions.manifests, "/repo/", data_sources.ManifestIndex(source, tree_index, 600))
+	monkeypatch.setattr(functions, "dataframe_cache", functions.DataFrameCache(16 * 1024 * 1024))
+	monkeypatch.setattr(functions, "counts_stores", {})
+
+def test_snapshot_round_trip(local_repo, snapshot_source, monkeypatch):
+	assert snapshot_source.manifest["version"] == "v1"
+	assert snapshot_source.manifest["counts"] == ["human"]
+	assert snapshot_source.manifest["datasets"]["human"]["contrasts"] == ["EoE-vs-Control"]
+	#hidden folders, other files and single feature counts are left out
+	assert snapshot_source.list("") == ["data", "metadata.tsv"]
+	assert snapshot_source.list("data/human/counts") == ["genes_list.tsv"]
+
+	#files and tables give back the original bytes
+	for file_path in ["metadata.tsv", "data/human/mds/metadata.tsv", "data/human/dge/EoE-vs-Control.diffexp.tsv"]:
+		assert snapshot_source.read(file_path) == (local_repo / file_path).read_bytes()
+	assert snapshot_source.read_table("metadata.tsv") is None
+
+	#the app reads the same tables, counts and feature labels from the checkout and from the snapshot
+	use_source(monkeypatch, data_sources.LocalDataSource(str(local_repo)))
+	monkeypatch.setitem(functions.config, "counts_store_directory", str(local_repo / "counts_store"))
+	dge_file = "data/human/dge/EoE-vs-Control.diffexp.tsv"
+	expected_dge = functions.read_tsv("/repo/", dge_file)
+	expected_counts = functions.get_counts("/repo/", "human", ["GENE1", "MIR21€IL13OS"], "zscore")
+	expected_labels = functions.get_feature_index("/repo/", "human", functions.get_feature_list_file("human")).labels
+
+	use_source(monkeypatch, snapshot_source)
+	pd.testing.assert_frame_equal(functions.read_tsv("/repo/", dge_file), expected_dge)
+	pd.testing.assert_frame_equal(functions.get_counts("/repo/", "human", ["GENE1", "MIR21€IL13OS"], "zscore"), expected_counts, check_dtype=False, atol=1e-5)
+	feature_index = functions.get_feature_index("/repo/", "human", functions.get_feature_list_file("human"))
+	assert feature_index.labels == expected_labels == ["GENE1", "MIR21/IL13OS"]
+	assert feature_index.search("il13", 10) == [1]
+
+def test_existing_snapshot_is_not_overwritten(tmp_path, snapshot_source, capsys):
+	with pytest.raises(SystemExit):
+		build_snapshot.main()
+	assert "already exists" in capsys.readouterr().err
+	with open(tmp_path / "snapshots" / "repo" / "v1" / "manifest.json") as f:
+		assert json.load(f)["version"] == "v1"
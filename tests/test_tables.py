@@ -0,0 +1,78 @@
+#import python packages
+import io
+import numpy as np
+import pandas as pd
+#import modules
+import functions
+
+#dge table of a human contrast as read from the repo, with a missing FDR
+diffexp_tsv = """Gene	Geneid	baseMean	log2FoldChange	lfcSE	stat	pvalue	padj
+GENE1	ENSG00001	10.5	1.5	0.2	3.1	1e-12	1e-10
+GENE2	ENSG00002	20.5	-0.5	0.1	-2.2	0.001	0.01
+GENE3	ENSG00003	30.5	0.7	0.3	1.9	0.01	0.04
+GENE4	ENSG00004	40.5	0.1	0.2	0.5	0.5	0.9
+GENE5	ENSG00005	50.5	0.2	0.4	0.4	0.6	
+"""
+
+def get_formatted_dge_table():
+	schema = functions.get_tsv_schema("data/human/dge/EoE-vs-Control.diffexp.tsv")
+	table = pd.read_csv(io.StringIO(diffexp_tsv), sep="\t", dtype=schema)
+	columns, table, style_data_conditional = functions.format_dge_table(table, "human", "padj_0.05", False, None)
+
+	return table
+
+def test_formatted_dge_table_keeps_numeric_pvalues():
+	table = get_formatted_dge_table()
+	assert pd.api.types.is_numeric_dtype(table["P-value"])
+	assert pd.api.types.is_numeric_dtype(table["FDR"])
+
+def test_sort_dge_table_by_fdr():
+	table = get_formatted_dge_table()
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, [{"column_id": "FDR", "direction": "asc"}], "", ["P-value", "FDR"])
+	assert [row["Gene"] for row in data] == ["GENE1", "GENE2", "GENE3", "GENE4", "GENE5"]
+	assert data[-1]["FDR"] == "NA"
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, [{"column_id": "FDR", "direction": "desc"}], "", ["P-value", "FDR"])
+	assert [row["Gene"] for row in data] == ["GENE4", "GENE3", "GENE2", "GENE1", "GENE5"]
+
+def test_sort_dge_table_by_pvalue():
+	table = get_formatted_dge_table()
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, [{"column_id": "P-value", "direction": "desc"}], "", ["P-value", "FDR"])
+	assert [row["Gene"] for row in data] == ["GENE5", "GENE4", "GENE3", "GENE2", "GENE1"]
+
+def test_filter_dge_table_by_fdr():
+	table = get_formatted_dge_table()
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, None, "{FDR} < 0.05", ["P-value", "FDR"])
+	assert sorted(row["Gene"] for row in data) == ["GENE1", "GENE2", "GENE3"]
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, None, "{FDR} ge 0.01 && {log2 FC} < 0", ["P-value", "FDR"])
+	assert [row["Gene"] for row in data] == ["GENE2"]
+
+def test_filter_dge_table_by_missing_fdr():
+	table = get_formatted_dge_table()
+	data, page_count, page_current = functions.get_table_page(table, 0, 10, None, "{FDR} = \"NA\"", ["P-value", "FDR"])
+	assert [row["Gene"] for row in data] == ["GENE5"]
+	assert data[0]["FDR"] == "NA"
+	assert not np.isnan(data[0]["P-value"])
+
+def test_table_pages():
+	table = get_formatted_dge_table()
+	data, page_count, page_current = functions.get_table_page(table, 2, 2, [{"column_id": "FDR", "direction": "asc"}], "", ["P-value", "FDR"])
+	assert page_count == 3
+	assert page_current == 2
+	assert [row["Gene"] for row in data] == ["GENE5"]
+
+def test_widen_float32_columns_keeps_short_decimals():
+	values_tsv = "baseMean\tlog2FoldChange\tlfcSE\tstat\n10.5\t1.5\t0.2\t3.1\n1234.567\t-0.000123456\t0.1234567\t-12.34\n98765.43\t3.141593\t\t0.05\n"
+	table = pd.read_csv(io.StringIO(values_tsv), sep="\t")
+	float32_table = pd.read_csv(io.StringIO(values_tsv), sep="\t", dtype=functions.get_tsv_schema("data/human/dge/EoE-vs-Control.diffexp.tsv"))
+	assert (float32_table.dtypes == np.float32).all()
+	pd.testing.assert_frame_equal(functions.widen_float32_columns(float32_table), table)
+
+def test_mofa_variance_views_are_float32(local_repo):
+	variance_tsv = "factor\tgroup\thuman\tmicrobiome\nFactor1\tEoE\t12.5\t0.25\nFactor2\tControl\t3.75\t\n"
+	(local_repo / "mofa" / "EoE-vs-Control").mkdir(parents=True)
+	(local_repo / "mofa" / "EoE-vs-Control" / "variance_explained_heatmap.tsv").write_text(variance_tsv)
+	table = functions.read_tsv("/repo/", "mofa/EoE-vs-Control/variance_explained_heatmap.tsv")
+	assert table.dtypes.astype(str).tolist() == ["object", "object", "float32", "float32"]
+	#regular expression replaces leave the numeric columns as they are
+	assert table.replace("_", " ", regex=True).dtypes.astype(str).tolist() == ["object", "object", "float32", "float32"]
+	pd.testing.assert_frame_equal(functions.widen_float32_columns(table), pd.read_csv(io.StringIO(variance_tsv), sep="\t"))